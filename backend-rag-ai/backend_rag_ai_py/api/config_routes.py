@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, FastAPI
 
 from backend_rag_ai_py.services.agent_services.coordinator import AgentCoordinator
 from backend_rag_ai_py.services.embedding_services.vector_store import VectorStore
+from backend_rag_ai_py.services.llm_services.context_packer import ContextPacker
 
 # Importações diretas dos serviços
 from backend_rag_ai_py.services.llm_services.providers.gemini import GeminiProvider
@@ -154,8 +155,11 @@ async def get_suggestions(
         vector_store = get_vector_store()
         similar_content = await vector_store.search_similar(query)
 
+        # Só os trechos mais similares que cabem no orçamento do prompt
+        packed = ContextPacker().pack(similar_content, reserved=query)
+
         result = await coordinator.process_task(
-            {"type": "suggestion", "query": query, "similar_content": similar_content}
+            {"type": "suggestion", "query": query, "similar_content": packed.chunks}
         )
 
         return {"status": "success", "suggestions": result}
@@ -2,12 +2,17 @@
 Rotas para o sistema multi-agente.
 """
 
+import json
+from collections.abc import AsyncIterator
 from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from backend_rag_ai_py.services.agent_services.coordinator import AgentCoordinator
+from backend_rag_ai_py.services.agent_services.multi_agent import MultiAgentSystem
 from backend_rag_ai_py.services.llm_services.providers.gemini import GeminiProvider
+from backend_rag_ai_py.services.llm_services.rate_limiter import Priority, get_llm_scheduler
 
 router = APIRouter()
 
@@ -15,12 +20,22 @@ router = APIRouter()
 def get_coordinator():
     """Retorna uma instância do coordenador de agentes."""
     try:
-        provider = GeminiProvider()
+        provider = GeminiProvider(priority=Priority.INTERACTIVE)
         return AgentCoordinator(provider=provider)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao inicializar coordenador: {str(e)}")
 
 
+def get_multiagent_system():
+    """Retorna uma instância do sistema multiagente."""
+    try:
+        return MultiAgentSystem(priority=Priority.INTERACTIVE)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erro ao inicializar sistema multiagente: {str(e)}"
+        )
+
+
 @router.post("/process")
 async def process_task(
     task: dict[str, Any],
@@ -40,4 +55,48 @@ async def process_task(
         result = await coordinator.process(task)
         return {"status": "success", "result": result}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro no processamento: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erro no processamento: {str(e)}")
+
+
+@router.post("/process/stream")
+async def process_task_stream(
+    task: dict[str, Any],
+    system: MultiAgentSystem = Depends(get_multiagent_system),
+):
+    """
+    Processa uma tarefa transmitindo o progresso como Server-Sent Events.
+
+    Eventos: ``step`` (etapa intermediária concluída), ``delta`` (trecho da
+    resposta final), ``done`` e ``error``.
+
+    Args:
+        task: Tarefa a ser processada (chave ``task`` ou ``prompt``)
+        system: Sistema multiagente
+
+    Returns:
+        StreamingResponse: Fluxo ``text/event-stream``
+    """
+    prompt = task.get("task") or task.get("prompt")
+    if not prompt:
+        raise HTTPException(status_code=422, detail="Informe 'task' ou 'prompt'")
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event in system.stream_task(prompt, task.get("context")):
+            yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/scheduler/stats")
+async def scheduler_stats():
+    """
+    Retorna as métricas do agendador de chamadas de LLM.
+
+    Returns:
+        dict: Profundidade de fila, espera e respostas 429 por provider/chave
+    """
+    return {"status": "success", "result": get_llm_scheduler().get_stats()}
@@ -26,14 +26,42 @@ class EmbateEvent:
         """Converte o evento para dicionário."""
         return {"tipo": self.tipo, "dados": self.dados, "timestamp": self.timestamp.isoformat()}
 
+    @classmethod
+    def from_dict(cls, evento: dict[str, Any]) -> "EmbateEvent":
+        """
+        Cria o evento a partir de um dicionário.
+
+        Aceita tanto o formato deste módulo (``tipo``/``dados``) quanto o do
+        ``EventManager`` de ``embates.events`` (``type``/``data``), que
+        compartilham o mesmo barramento.
+
+        Args:
+            evento: Evento serializado
+
+        Returns:
+            Evento reconstruído
+        """
+        timestamp = evento.get("timestamp")
+        return cls(
+            evento.get("tipo", evento.get("type")),
+            evento.get("dados", evento.get("data")) or {},
+            datetime.fromisoformat(timestamp) if timestamp else None,
+        )
+
 
 class EmbateEventManager:
     """Gerencia eventos do sistema de embates."""
 
-    def __init__(self):
-        """Inicializa o gerenciador de eventos."""
+    def __init__(self, backend: Any | None = None):
+        """
+        Inicializa o gerenciador de eventos.
+
+        Args:
+            backend: Barramento distribuído opcional (ex.: RedisStreamEventBus)
+        """
         self.handlers: dict[str, list[Callable]] = {}
         self.eventos: list[EmbateEvent] = []
+        self.backend = backend
 
     def register_handler(self, tipo: str, handler: Callable) -> None:
         """
@@ -69,6 +97,8 @@ class EmbateEventManager:
         """
         # Registra evento
         self.eventos.append(evento)
+        if self.backend:
+            self.backend.append(evento.to_dict(), evento.tipo, evento.dados.get("embate_id"))
 
         # Chama handlers
         if evento.tipo in self.handlers:
@@ -108,6 +138,29 @@ class EmbateEventManager:
 
         return eventos
 
+    async def get_eventos_distribuidos(
+        self, tipo: str | None = None, embate_id: str | None = None, limit: int | None = None
+    ) -> list[EmbateEvent]:
+        """
+        Retorna eventos registrados por todos os workers no barramento.
+
+        Args:
+            tipo: Tipo opcional para filtrar
+            embate_id: ID opcional do embate
+            limit: Número máximo de eventos
+
+        Returns:
+            Lista de eventos; sem backend, usa os eventos locais
+        """
+        if not self.backend:
+            eventos = self.get_eventos(tipo)
+            if embate_id:
+                eventos = [e for e in eventos if e.dados.get("embate_id") == embate_id]
+            return eventos[-limit:] if limit else eventos
+
+        historico = await self.backend.get_history(event_type=tipo, topic=embate_id, limit=limit)
+        return [EmbateEvent.from_dict(e) for e in historico]
+
     def clear_eventos(self) -> None:
         """Limpa lista de eventos."""
         self.eventos = []
@@ -2,13 +2,20 @@
 Gerenciador de embates.
 """
 
+import asyncio
+import hashlib
 import json
+import time
+from collections.abc import AsyncIterator
 from datetime import datetime
+from functools import partial
 from typing import Any, Dict, List, Optional
 
 from ....core.refactoring_limits_checker import RefactoringLimitsChecker
 
 from .models import Embate
+from .search_index import InvertedIndex
+from .similarity_index import MinHashLSHIndex, palavras
 from .storage import SupabaseStorage
 
 
@@ -45,9 +52,10 @@ class ConflictResolver:
 
     def _contexto_similar(self, ctx1: str, ctx2: str) -> bool:
         """Verifica se dois contextos são similares."""
-        # Implementação simples por enquanto
-        palavras1 = set(ctx1.lower().split())
-        palavras2 = set(ctx2.lower().split())
+        palavras1 = palavras(ctx1)
+        palavras2 = palavras(ctx2)
+        if not palavras1 or not palavras2:
+            return False
         intersecao = palavras1.intersection(palavras2)
         return len(intersecao) / max(len(palavras1), len(palavras2)) > 0.7
 
@@ -55,15 +63,103 @@ class ConflictResolver:
 class EmbateManager:
     """Gerencia embates."""
 
-    def __init__(self, storage: SupabaseStorage | None = None):
+    def __init__(
+        self,
+        storage: SupabaseStorage | None = None,
+        similarity_index: MinHashLSHIndex | None = None,
+        search_index: InvertedIndex | None = None,
+        refresh_interval: float | None = 60.0,
+    ):
         """
         Inicializa o gerenciador.
 
+        Com um storage que aceita ``subscribe`` (ex.: MemoryStorage), os
+        índices acompanham cada save e delete, venham de onde vierem. Nos
+        demais, que podem ser alterados por outros processos, os índices são
+        recarregados quando ficam mais velhos que ``refresh_interval``.
+
         Args:
             storage: Storage opcional para persistência
+            similarity_index: Índice de contextos usado na detecção de conflitos
+            search_index: Índice invertido usado na busca textual
+            refresh_interval: Idade máxima dos índices, em segundos, para
+                storages sem ``subscribe`` (None para nunca recarregar)
         """
         self.storage = storage
         self.resolver = ConflictResolver()
+        self.similarity_index = similarity_index or MinHashLSHIndex()
+        self.search_index = search_index or InvertedIndex()
+        self.refresh_interval = refresh_interval
+        self._embates: dict[str, Embate] = {}
+        self._index_ready = False
+        self._indexed_at = 0.0
+        self._subscribed = hasattr(storage, "subscribe")
+        if self._subscribed:
+            storage.subscribe(self._on_storage_change)
+
+    async def close(self) -> None:
+        """Encerra o storage, gravando o que ele ainda tiver pendente."""
+        close = getattr(self.storage, "close", None)
+        if close is not None:
+            await close()
+
+    def _on_storage_change(self, embate_id: str, embate: Embate | None) -> None:
+        """Aplica nos índices um save ou delete feito no storage."""
+        if not self._index_ready:
+            return
+        if embate is not None:
+            self._index_embate(embate_id, embate)
+            return
+        self._embates.pop(embate_id, None)
+        self.similarity_index.remove(embate_id)
+        self.search_index.remove(embate_id)
+
+    async def _ensure_index(self) -> None:
+        """Carrega os embates do storage no índice, recarregando se expirado."""
+        if not self.storage:
+            return
+        if self._index_ready:
+            if self._subscribed or self.refresh_interval is None:
+                return
+            if time.monotonic() - self._indexed_at < self.refresh_interval:
+                return
+            self._clear_index()
+        for position, embate in enumerate(await self.storage.list()):
+            self._index_embate(getattr(embate, "id", None) or f"stored-{position}", embate)
+        self._index_ready = True
+        self._indexed_at = time.monotonic()
+
+    def _clear_index(self) -> None:
+        """Esvazia os índices; o próximo uso recarrega do storage."""
+        self._embates.clear()
+        self.similarity_index.clear()
+        self.search_index.clear()
+        self._index_ready = False
+
+    def _index_embate(self, embate_id: str, embate: Embate) -> None:
+        """Adiciona ou atualiza um embate nos índices."""
+        self._embates[embate_id] = embate
+        self.similarity_index.add(embate_id, embate.tipo, embate.contexto)
+        argumentos = [self._texto_argumento(arg) for arg in embate.argumentos]
+        self.search_index.add(
+            embate_id,
+            {
+                "titulo": embate.titulo,
+                "contexto": embate.contexto,
+                "argumentos": "\n".join(argumentos),
+            },
+        )
+
+    @staticmethod
+    def _texto_argumento(arg: Any) -> str:
+        """Texto de um argumento, seja modelo ou dicionário."""
+        data = arg if isinstance(arg, dict) else vars(arg)
+        return str(data.get("conteudo") or data.get("valor") or "")
+
+    async def rebuild_index(self) -> None:
+        """Descarta os índices e recarrega os embates do storage."""
+        self._clear_index()
+        await self._ensure_index()
 
     async def create_embate(self, embate: Embate) -> dict:
         """
@@ -76,18 +172,30 @@ class EmbateManager:
             Dados do embate criado com status
         """
         try:
-            # Verifica conflitos
+            # Verifica conflitos só entre candidatos do índice
+            existente_id = None
             if self.storage:
-                embates = await self.storage.list()
-                for e in embates:
+                await self._ensure_index()
+                candidatos = self.similarity_index.candidates(embate.contexto, embate.tipo)
+                for candidato_id in candidatos:
+                    e = self._embates[candidato_id]
                     if self.resolver.detectar_conflito(embate, e):
                         self.resolver.registrar_conflito(embate, e)
                         embate = self.resolver.resolver_conflito(embate, e)
+                        if embate is e:
+                            existente_id = candidato_id
+
+            # Se o embate já armazenado prevaleceu, não há o que salvar
+            if existente_id is not None:
+                return {"status": "success", "id": existente_id}
 
             # Salva embate
             if self.storage:
                 result = await self.storage.save(embate)
-                return {"status": "success", "id": result["data"]["id"]}
+                embate_id = result["data"]["id"]
+                if not self._subscribed:
+                    self._index_embate(embate_id, embate)
+                return {"status": "success", "id": embate_id}
 
             return {"status": "success", "id": "local-" + datetime.now().isoformat()}
         except Exception as e:
@@ -118,26 +226,43 @@ class EmbateManager:
             return await self.storage.list()
         return []
 
-    async def search_embates(self, query: str) -> list[Embate]:
+    async def search(self, query: str, page: int = 1, page_size: int = 20) -> dict[str, Any]:
+        """
+        Busca embates por texto com ranking, destaques e paginação.
+
+        Args:
+            query: Texto para buscar (sem diferenciar acentos; aceita prefixos)
+            page: Página a retornar, começando em 1
+            page_size: Resultados por página
+
+        Returns:
+            Dicionário com total, página e resultados ({id, score, highlights, embate})
+        """
+        await self._ensure_index()
+        found = self.search_index.search(
+            query, limit=page_size, offset=(max(page, 1) - 1) * page_size
+        )
+        for result in found["results"]:
+            result["embate"] = self._embates[result["id"]]
+        return {"page": max(page, 1), "page_size": page_size, **found}
+
+    async def search_embates(
+        self, query: str, limit: int | None = None, offset: int = 0
+    ) -> list[Embate]:
         """
         Busca embates por texto.
 
         Args:
             query: Texto para buscar
+            limit: Máximo de resultados
+            offset: Resultados a pular
 
         Returns:
-            Lista de embates encontrados
+            Lista de embates encontrados, do mais relevante ao menos relevante
         """
-        embates = await self.list_embates()
-        query = query.lower()
-
-        return [
-            e
-            for e in embates
-            if query in e.titulo.lower()
-            or query in e.contexto.lower()
-            or any(query in arg.conteudo.lower() for arg in e.argumentos)
-        ]
+        await self._ensure_index()
+        found = self.search_index.search(query, limit=limit, offset=offset)
+        return [self._embates[result["id"]] for result in found["results"]]
 
     async def update_embate(self, id: str, updates: dict) -> dict:
         """
@@ -163,6 +288,8 @@ class EmbateManager:
             # Salva alterações
             if self.storage:
                 await self.storage.save(embate)
+                if self._index_ready and not self._subscribed:
+                    self._index_embate(id, embate)
 
             # Atualiza objeto local também
             embate.status = updates.get("status", embate.status)
@@ -173,53 +300,147 @@ class EmbateManager:
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    async def export_embates(self, filters: dict = None) -> list[dict]:
+    async def stream_embates(
+        self, filters: dict | None = None, columns: list[str] | None = None
+    ) -> AsyncIterator[dict]:
+        """
+        Percorre os embates exportados sem carregar todos na memória.
+
+        Com um storage que suporta ``iter_embates`` (ex.: SupabaseStorage),
+        filtros, projeção e paginação são feitos no banco; nos demais, os
+        mesmos filtros são aplicados em memória.
+
+        Args:
+            filters: Filtros a aplicar (ver ``SupabaseStorage._apply_filters``)
+            columns: Campos a exportar (todos por padrão)
+
+        Yields:
+            Embates exportados como dicionários
+        """
+        if self.storage and hasattr(self.storage, "iter_embates"):
+            async for row in self.storage.iter_embates(filters, columns):
+                yield row
+            return
+
+        for e in await self.list_embates():
+            if not SupabaseStorage.matches_filters(e.model_dump(), filters):
+                continue
+            data = e.model_dump(mode="json")
+            yield {key: data.get(key) for key in columns} if columns else data
+
+    async def export_embates(
+        self, filters: dict | None = None, columns: list[str] | None = None
+    ) -> list[dict]:
         """
         Exporta embates com filtros.
 
         Args:
             filters: Filtros a aplicar
+            columns: Campos a exportar (todos por padrão)
 
         Returns:
             Lista de embates exportados
         """
-        embates = await self.list_embates()
+        return [row async for row in self.stream_embates(filters, columns)]
 
-        if filters:
-            # Aplica filtros
-            for key, value in filters.items():
-                embates = [e for e in embates if hasattr(e, key) and getattr(e, key) == value]
+    async def find_related_embates(self, titulo: str, limit: int = 10) -> list[Embate]:
+        """
+        Busca embates com título ou conteúdo relacionado.
 
-        # Converte para dicionários
-        return [
-            {
-                "id": e.id,
-                "titulo": e.titulo,
-                "tipo": e.tipo,
-                "contexto": e.contexto,
-                "status": e.status,
-                "criado_em": e.criado_em.isoformat(),
-                "argumentos": [
-                    {
-                        "autor": a.autor,
-                        "conteudo": a.conteudo,
-                        "tipo": a.tipo,
-                        "data": a.data.isoformat(),
-                    }
-                    for a in e.argumentos
-                ],
-                "decisao": e.decisao,
-                "razao": e.razao,
-            }
-            for e in embates
+        Args:
+            titulo: Título de referência
+            limit: Máximo de embates retornados
+
+        Returns:
+            Embates relacionados, do mais relevante ao menos relevante
+        """
+        await self._ensure_index()
+        found = self.search_index.search(titulo, limit=limit, match_all=False)
+        return [self._embates[result["id"]] for result in found["results"]]
+
+    def _check_consistencia(self, embate: Embate, indicators: dict[str, Any]) -> None:
+        """Estágio 1: datas e status do próprio embate."""
+        inicio = getattr(embate, "data_inicio", None) or getattr(embate, "criado_em", None)
+        resolucao = getattr(embate, "data_resolucao", None)
+
+        if embate.status == "resolvido" and not resolucao:
+            indicators["inconsistencias"].append("Status resolvido sem data de resolução")
+            indicators["score"] += 0.3
+
+        if resolucao and inicio and resolucao < inicio:
+            indicators["inconsistencias"].append("Data de resolução anterior à data de início")
+            indicators["score"] += 0.5
+
+        # Verifica contexto vs título
+        if len(embate.contexto.split()) < 10:
+            indicators["inconsistencias"].append("Contexto muito curto/vago")
+            indicators["score"] += 0.2
+
+        # Verifica metadados
+        if "is_trigger_embate" in embate.metadata:
+            indicators["score"] += 0.1
+
+    def _check_argumentos(self, embate: Embate, indicators: dict[str, Any]) -> None:
+        """Estágio 2: argumentos duplicados (por hash) e datas dos argumentos."""
+        inicio = getattr(embate, "data_inicio", None) or getattr(embate, "criado_em", None)
+        vistos: set[str] = set()
+        for arg in embate.argumentos:
+            texto = self._texto_argumento(arg)
+            digest = hashlib.sha256(" ".join(texto.lower().split()).encode()).hexdigest()
+            if digest in vistos:
+                indicators["duplicidades"].append(f"Argumento duplicado: {texto[:100]}...")
+                indicators["score"] += 0.2
+            vistos.add(digest)
+
+            data = arg.get("data") if isinstance(arg, dict) else getattr(arg, "data", None)
+            if data and inicio and data < inicio:
+                indicators["inconsistencias"].append(
+                    "Argumento com data anterior ao início do embate"
+                )
+                indicators["score"] += 0.3
+
+    async def _check_similares(
+        self, embate: Embate, indicators: dict[str, Any], threshold: float
+    ) -> None:
+        """Estágio 3: embates com contexto similar, via índice de similaridade."""
+        await self._ensure_index()
+        candidatos = self.similarity_index.candidates(
+            embate.contexto, None, exclude=getattr(embate, "id", None)
+        )
+        for candidato_id in candidatos:
+            e = self._embates[candidato_id]
+            if e is embate or not self.resolver._contexto_similar(e.contexto, embate.contexto):
+                continue
+            indicators["duplicidades"].append(f"Embate similar existente: {e.titulo}")
+            indicators["score"] += 0.4
+            if indicators["score"] > threshold:
+                return
+
+    async def _check_relacionados(self, embate: Embate, indicators: dict[str, Any]) -> None:
+        """Estágio 4: embates relacionados ainda não implementados."""
+        related_embates = await self.find_related_embates(embate.titulo)
+        pending_implementations = [
+            e
+            for e in related_embates
+            if e is not embate and not e.metadata.get("implementado", False)
         ]
 
-    async def detect_hallucination(self, embate: Embate) -> dict[str, Any]:
+        if len(pending_implementations) > 2:
+            indicators["loop_indicators"].append(
+                "Múltiplos embates relacionados pendentes de implementação"
+            )
+            indicators["score"] += 0.4
+
+    async def detect_hallucination(self, embate: Embate, threshold: float = 0.7) -> dict[str, Any]:
         """
         Detecta possíveis alucinações em um embate.
 
+        As verificações rodam em estágios, das mais baratas (locais) às que
+        consultam os índices, e param assim que o score passa do limiar.
+
         Args:
             embate: Embate a ser analisado
+            threshold: Score acima do qual o embate é considerado alucinação
 
         Returns:
             Dicionário com resultado da análise
@@ -231,71 +452,32 @@ class EmbateManager:
             "loop_indicators": [],
         }
 
-        try:
-            # Verifica inconsistências internas
-            if embate.status == "resolvido" and not embate.data_resolucao:
-                hallucination_indicators["inconsistencias"].append(
-                    "Status resolvido sem data de resolução"
-                )
-                hallucination_indicators["score"] += 0.3
+        # Verificações locais primeiro; as que consultam os índices exigem storage
+        stages = [
+            ("consistencia", self._check_consistencia),
+            ("argumentos", self._check_argumentos),
+        ]
+        if self.storage:
+            stages += [
+                ("similares", partial(self._check_similares, threshold=threshold)),
+                ("relacionados", self._check_relacionados),
+            ]
 
-            if embate.data_resolucao and embate.data_resolucao < embate.data_inicio:
-                hallucination_indicators["inconsistencias"].append(
-                    "Data de resolução anterior à data de início"
-                )
-                hallucination_indicators["score"] += 0.5
-
-            # Verifica argumentos
-            argumentos_unicos = set()
-            for arg in embate.argumentos:
-                # Verifica duplicidade de conteúdo
-                if arg.conteudo in argumentos_unicos:
-                    hallucination_indicators["duplicidades"].append(
-                        f"Argumento duplicado: {arg.conteudo[:100]}..."
-                    )
-                    hallucination_indicators["score"] += 0.2
-                argumentos_unicos.add(arg.conteudo)
-
-                # Verifica datas dos argumentos
-                if arg.data < embate.data_inicio:
-                    hallucination_indicators["inconsistencias"].append(
-                        "Argumento com data anterior ao início do embate"
-                    )
-                    hallucination_indicators["score"] += 0.3
-
-            # Verifica contexto vs título
-            if len(embate.contexto.split()) < 10:
-                hallucination_indicators["inconsistencias"].append("Contexto muito curto/vago")
-                hallucination_indicators["score"] += 0.2
-
-            # Verifica metadados
-            if "is_trigger_embate" in embate.metadata:
-                hallucination_indicators["score"] += 0.1
-
-            # Busca embates similares
-            if self.storage:
-                embates = await self.storage.list()
-                for e in embates:
-                    if e != embate and self.resolver._contexto_similar(e.contexto, embate.contexto):
-                        hallucination_indicators["duplicidades"].append(
-                            f"Embate similar existente: {e.titulo}"
-                        )
-                        hallucination_indicators["score"] += 0.4
-
-            # Verificar embates relacionados não implementados
-            related_embates = await self.find_related_embates(embate.titulo)
-            pending_implementations = [e for e in related_embates if not e.implementado]
-
-            if len(pending_implementations) > 2:
-                hallucination_indicators["loop_indicators"].append(
-                    "Múltiplos embates relacionados pendentes de implementação"
-                )
-                hallucination_indicators["score"] += 0.4
+        try:
+            stages_run = []
+            for name, stage in stages:
+                result = stage(embate, hallucination_indicators)
+                if asyncio.iscoroutine(result):
+                    await result
+                stages_run.append(name)
+                if hallucination_indicators["score"] > threshold:
+                    break
 
             return {
                 "status": "success",
                 "indicators": hallucination_indicators,
-                "is_hallucination": hallucination_indicators["score"] > 0.7,
+                "is_hallucination": hallucination_indicators["score"] > threshold,
+                "stages": stages_run,
             }
 
         except Exception as e:
@@ -0,0 +1,202 @@
+"""
+Índice invertido para busca textual de embates.
+
+Os textos são tokenizados sem acentos e em minúsculas (``ação`` casa com
+``acao``), cada termo guarda a frequência por campo e um vocabulário
+ordenado permite buscar por prefixo. Resultados são ranqueados por TF-IDF
+ponderado pelo campo e trazem trechos com os termos destacados.
+"""
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any
+
+_TOKEN = re.compile(r"\w+")
+
+# Palavras muito comuns em pt-BR que não ajudam a ranquear
+STOPWORDS = frozenset(
+    "a ao aos as com da das de do dos e em na nas no nos o os ou para por que se um uma".split()
+)
+
+# Peso de cada campo no ranking
+FIELD_WEIGHTS = {"titulo": 3.0, "contexto": 1.5, "argumentos": 1.0}
+
+# Peso de um termo encontrado só por prefixo, relativo ao termo exato
+PREFIX_WEIGHT = 0.6
+
+
+@lru_cache(maxsize=None)
+def _fold_char(char: str) -> str:
+    """Caractere sem acento e em minúscula."""
+    base = unicodedata.normalize("NFKD", char)[:1] or char
+    return base.lower()[:1] or char
+
+
+def fold(texto: str) -> str:
+    """
+    Remove acentos e passa para minúsculas, preservando o comprimento.
+
+    Cada caractere vira exatamente um caractere, então posições no texto
+    dobrado valem no texto original (usado nos destaques).
+    """
+    return "".join(map(_fold_char, texto))
+
+
+def tokenize(texto: str) -> list[str]:
+    """Tokens dobrados do texto, sem stopwords."""
+    return [token for token in _TOKEN.findall(fold(texto)) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """Índice invertido incremental de embates."""
+
+    def __init__(self, min_prefix: int = 2, snippet_size: int = 80):
+        """
+        Inicializa o índice.
+
+        Args:
+            min_prefix: Tamanho mínimo de um termo para buscar por prefixo
+            snippet_size: Tamanho aproximado dos trechos destacados
+        """
+        self.min_prefix = min_prefix
+        self.snippet_size = snippet_size
+        self._postings: dict[str, dict[str, dict[str, int]]] = defaultdict(dict)
+        self._vocabulary: list[str] = []
+        self._docs: dict[str, dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: str, fields: dict[str, str]) -> None:
+        """
+        Indexa (ou reindexa) um documento.
+
+        Args:
+            doc_id: Identificador do documento
+            fields: Texto de cada campo (chaves de ``FIELD_WEIGHTS``)
+        """
+        self.remove(doc_id)
+        self._docs[doc_id] = fields
+        for field, texto in fields.items():
+            for token, freq in Counter(tokenize(texto)).items():
+                postings = self._postings[token]
+                if not postings:
+                    insort(self._vocabulary, token)
+                postings.setdefault(doc_id, {})[field] = freq
+
+    def remove(self, doc_id: str) -> None:
+        """Remove um documento do índice."""
+        fields = self._docs.pop(doc_id, None)
+        if fields is None:
+            return
+        for token in {token for texto in fields.values() for token in tokenize(texto)}:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                position = bisect_left(self._vocabulary, token)
+                if position < len(self._vocabulary) and self._vocabulary[position] == token:
+                    del self._vocabulary[position]
+
+    def clear(self) -> None:
+        """Esvazia o índice."""
+        self._postings.clear()
+        self._vocabulary.clear()
+        self._docs.clear()
+
+    def _expand(self, term: str) -> dict[str, float]:
+        """Termos do vocabulário que casam com o termo da busca, com seu peso."""
+        matches = {term: 1.0} if term in self._postings else {}
+        if len(term) >= self.min_prefix:
+            position = bisect_left(self._vocabulary, term)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+                matches.setdefault(self._vocabulary[position], PREFIX_WEIGHT)
+                position += 1
+        return matches
+
+    def _score(self, terms: list[str], match_all: bool = True) -> dict[str, float]:
+        """Pontua os documentos que contêm todos os termos (ou algum, sem ``match_all``)."""
+        total = len(self._docs)
+        scores: dict[str, float] | None = None
+        for term in terms:
+            term_scores: dict[str, float] = defaultdict(float)
+            for token, weight in self._expand(term).items():
+                postings = self._postings[token]
+                idf = math.log(1 + total / len(postings))
+                for doc_id, freqs in postings.items():
+                    tf = sum(FIELD_WEIGHTS.get(f, 1.0) * n / (n + 1.2) for f, n in freqs.items())
+                    term_scores[doc_id] = max(term_scores[doc_id], weight * idf * tf)
+            if scores is None:
+                scores = dict(term_scores)
+            elif match_all:
+                scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+            else:
+                for doc_id, score in term_scores.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+            if not scores and match_all:
+                return {}
+        return scores or {}
+
+    def _highlight(self, texto: str, terms: list[str], tags: tuple[str, str]) -> str | None:
+        """Trecho do texto em volta do primeiro termo encontrado, com os termos marcados."""
+        pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")\w*")
+        folded = fold(texto)
+        first = pattern.search(folded)
+        if not first:
+            return None
+
+        start = max(0, first.start() - self.snippet_size // 2)
+        end = min(len(texto), start + self.snippet_size)
+        parts = ["..." if start else ""]
+        cursor = start
+        for match in pattern.finditer(folded, start, end):
+            parts += [texto[cursor : match.start()], tags[0], texto[match.start() : match.end()]]
+            parts.append(tags[1])
+            cursor = match.end()
+        parts += [texto[cursor:end], "..." if end < len(texto) else ""]
+        return " ".join("".join(parts).split())
+
+    def search(
+        self,
+        query: str,
+        limit: int | None = 20,
+        offset: int = 0,
+        highlight_tags: tuple[str, str] = ("<mark>", "</mark>"),
+        match_all: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Busca documentos por texto.
+
+        Args:
+            query: Texto da busca
+            limit: Tamanho da página (None para todos)
+            offset: Resultados a pular
+            highlight_tags: Marcadores de abertura e fechamento dos destaques
+            match_all: Exige todos os termos; sem ele, basta algum termo
+
+        Returns:
+            Dicionário com ``total`` e ``results`` ({id, score, highlights})
+        """
+        terms = tokenize(query)
+        if not terms:
+            return {"total": 0, "results": []}
+
+        ranked = sorted(self._score(terms, match_all).items(), key=lambda item: (-item[1], item[0]))
+        page = ranked[offset:] if limit is None else ranked[offset : offset + limit]
+
+        results = []
+        for doc_id, score in page:
+            highlights = {}
+            for field, texto in self._docs[doc_id].items():
+                snippet = self._highlight(texto, terms, highlight_tags)
+                if snippet:
+                    highlights[field] = snippet
+            results.append({"id": doc_id, "score": round(score, 4), "highlights": highlights})
+
+        return {"total": len(ranked), "results": results}
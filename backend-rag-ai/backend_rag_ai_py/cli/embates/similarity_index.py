@@ -0,0 +1,180 @@
+"""
+Índice MinHash/LSH de contextos de embates.
+
+Cada contexto vira uma assinatura MinHash dividida em bandas; embates cujas
+bandas coincidem caem no mesmo bucket (separado por tipo). Uma consulta só
+olha os buckets da própria assinatura, então o custo não depende do número
+de embates indexados, e apenas os candidatos passam pela verificação exata.
+"""
+
+import hashlib
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from functools import lru_cache
+
+import numpy as np
+
+# Primo de Mersenne 2^31 - 1: (hash de 32 bits) * a + b cabe em uint64
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+@lru_cache(maxsize=4096)
+def palavras(texto: str) -> frozenset[str]:
+    """Conjunto de palavras de um texto, em minúsculas."""
+    return frozenset(texto.lower().split())
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Similaridade de Jaccard entre dois conjuntos."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSHIndex:
+    """Índice incremental de similaridade entre contextos."""
+
+    def __init__(self, num_perm: int = 126, bands: int = 42, seed: int = 1):
+        """
+        Inicializa o índice.
+
+        Com 42 bandas de 3 linhas, pares com Jaccard acima de ~0.5 viram
+        candidatos com probabilidade acima de 99%.
+
+        Args:
+            num_perm: Número de permutações da assinatura
+            bands: Número de bandas do LSH (divide num_perm)
+            seed: Semente das permutações
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser múltiplo de bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+        self._buckets: dict[tuple[str, int, bytes], set[str]] = defaultdict(set)
+        self._docs: dict[str, tuple[str, frozenset[str], list[bytes]]] = {}
+        self._order: dict[str, int] = {}
+        self._tipos: Counter[str] = Counter()
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        """Calcula a assinatura MinHash de um conjunto de tokens."""
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(t.encode(), digest_size=4).digest(), "little")
+                for t in tokens
+            ),
+            dtype=np.uint64,
+        )
+        if not hashes.size:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def _band_keys(self, tokens: frozenset[str]) -> list[bytes]:
+        """Divide a assinatura em chaves de banda."""
+        if not tokens:
+            return []
+        sig = self.signature(tokens)
+        return [sig[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, doc_id: str, tipo: str, texto: str) -> None:
+        """
+        Indexa (ou reindexa) um documento.
+
+        Args:
+            doc_id: Identificador do documento
+            tipo: Tipo do embate; só documentos do mesmo tipo são comparados
+            texto: Contexto a indexar
+        """
+        self.remove(doc_id)
+        tokens = palavras(texto)
+        keys = self._band_keys(tokens)
+        for band, key in enumerate(keys):
+            self._buckets[(tipo, band, key)].add(doc_id)
+        self._docs[doc_id] = (tipo, tokens, keys)
+        self._tipos[tipo] += 1
+        self._order[doc_id] = self._seq
+        self._seq += 1
+
+    def remove(self, doc_id: str) -> None:
+        """Remove um documento do índice."""
+        entry = self._docs.pop(doc_id, None)
+        if entry is None:
+            return
+        tipo, _, keys = entry
+        for band, key in enumerate(keys):
+            bucket = self._buckets.get((tipo, band, key))
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[(tipo, band, key)]
+        del self._order[doc_id]
+        self._tipos[tipo] -= 1
+        if not self._tipos[tipo]:
+            del self._tipos[tipo]
+
+    def clear(self) -> None:
+        """Esvazia o índice."""
+        self._buckets.clear()
+        self._docs.clear()
+        self._order.clear()
+        self._tipos.clear()
+
+    def candidates(
+        self, texto: str, tipo: str | None, exclude: str | None = None
+    ) -> list[str]:
+        """
+        Documentos do mesmo tipo que compartilham alguma banda com o texto.
+
+        Args:
+            texto: Contexto consultado
+            tipo: Tipo do embate (None para todos os tipos)
+            exclude: ID a ignorar (ex.: o próprio documento)
+
+        Returns:
+            IDs candidatos, na ordem de indexação
+        """
+        tipos = list(self._tipos) if tipo is None else [tipo]
+        found: set[str] = set()
+        for band, key in enumerate(self._band_keys(palavras(texto))):
+            for bucket_tipo in tipos:
+                found.update(self._buckets.get((bucket_tipo, band, key), ()))
+        found.discard(exclude)
+        return sorted(found, key=self._order.__getitem__)
+
+    def query(
+        self, texto: str, tipo: str | None, threshold: float = 0.5, exclude: str | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        Candidatos com Jaccard exato acima do limiar.
+
+        Args:
+            texto: Contexto consultado
+            tipo: Tipo do embate (None para todos os tipos)
+            threshold: Jaccard mínimo
+            exclude: ID a ignorar
+
+        Returns:
+            Pares (id, jaccard) em ordem decrescente de similaridade
+        """
+        tokens = palavras(texto)
+        scored = [
+            (doc_id, jaccard(tokens, self._docs[doc_id][1]))
+            for doc_id in self.candidates(texto, tipo, exclude)
+        ]
+        return sorted(
+            [(doc_id, score) for doc_id, score in scored if score >= threshold],
+            key=lambda item: item[1],
+            reverse=True,
+        )
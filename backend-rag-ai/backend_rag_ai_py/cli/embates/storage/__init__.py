@@ -2,13 +2,32 @@
 Armazenamento de embates no Supabase.
 """
 
+import asyncio
+import base64
+import json
+import operator
+import re
+import weakref
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from supabase import Client, create_client
 
 from ..models import Embate
 
+# Tamanho padrão das páginas lidas do banco
+PAGE_SIZE = 500
+
+# Colunas de data aceitas nos filtros por intervalo
+DATE_COLUMNS = ("criado_em", "atualizado_em")
+
+# Operadores dos filtros por intervalo, para aplicar em memória
+_DATE_OPERATORS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+# Chaves aceitas em ``metadata_keys``: entram sem escape no caminho JSON da query
+_META_KEY = re.compile(r"\w+")
+
 
 class SupabaseStorage:
     """Gerencia armazenamento de embates no Supabase."""
@@ -55,29 +74,234 @@ class SupabaseStorage:
         if not response.data:
             return None
 
-        data = response.data[0]
+        return self._to_embate(response.data[0])
+
+    @staticmethod
+    def _to_embate(data: dict) -> Embate:
+        """Converte uma linha completa da tabela em Embate."""
         data["criado_em"] = datetime.fromisoformat(data["criado_em"])
         data["atualizado_em"] = datetime.fromisoformat(data["atualizado_em"])
-
         return Embate(**data)
 
-    async def list(self) -> list[Embate]:
+    @staticmethod
+    def _apply_filters(query: Any, filters: dict[str, Any] | None) -> Any:
+        """
+        Aplica os filtros na query do PostgREST.
+
+        Filtros suportados:
+            status, tipo, id: valor exato ou lista de valores
+            criado_em, atualizado_em: dicionário com gt/gte/lt/lte
+            metadata: dicionário que o JSONB deve conter (operador @>)
+            metadata_keys: chaves que precisam existir no JSONB (mesmo com valor null)
+
+        Args:
+            query: Query do cliente Supabase
+            filters: Filtros a aplicar
+
+        Returns:
+            Query filtrada
+        """
+        for key, value in (filters or {}).items():
+            if key in ("status", "tipo", "id"):
+                if isinstance(value, (list, tuple, set)):
+                    query = query.in_(key, list(value))
+                else:
+                    query = query.eq(key, value)
+            elif key in DATE_COLUMNS:
+                for name, bound in value.items():
+                    if name not in _DATE_OPERATORS:
+                        raise ValueError(f"Operador de data inválido: {name}")
+                    if isinstance(bound, datetime):
+                        bound = bound.isoformat()
+                    query = getattr(query, name)(key, bound)
+            elif key == "metadata":
+                query = query.contains("metadata", value)
+            elif key == "metadata_keys":
+                # ``metadata->k`` só é NULL em SQL quando a chave não existe (um
+                # valor JSON null vira o jsonb 'null'), então equivale a ``?``,
+                # que o PostgREST não expõe
+                for meta_key in SupabaseStorage._meta_keys(value):
+                    query = query.not_.is_(f"metadata->{meta_key}", "null")
+            else:
+                raise ValueError(f"Filtro não suportado: {key}")
+        return query
+
+    @staticmethod
+    def _meta_keys(keys: Any) -> list[str]:
+        """Valida as chaves de ``metadata_keys`` (letras, dígitos e ``_``)."""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        for meta_key in keys:
+            if not isinstance(meta_key, str) or not _META_KEY.fullmatch(meta_key):
+                raise ValueError(f"Chave de metadata inválida: {meta_key!r}")
+        return keys
+
+    @staticmethod
+    def _contains(document: Any, subset: Any) -> bool:
+        """Containment do JSONB (``@>``): dicts por chave, listas por elemento."""
+        if isinstance(subset, dict):
+            return isinstance(document, dict) and all(
+                key in document and SupabaseStorage._contains(document[key], value)
+                for key, value in subset.items()
+            )
+        if isinstance(subset, list):
+            return isinstance(document, list) and all(
+                any(SupabaseStorage._contains(item, value) for item in document)
+                for value in subset
+            )
+        return document == subset
+
+    @staticmethod
+    def matches_filters(data: dict[str, Any], filters: dict[str, Any] | None) -> bool:
+        """
+        Aplica em memória os mesmos filtros de ``_apply_filters``.
+
+        Usado quando o storage não filtra no banco, para que os filtros
+        tenham o mesmo significado em qualquer storage.
+
+        Args:
+            data: Embate como dicionário (datas como ``datetime`` ou ISO)
+            filters: Filtros a aplicar
+
+        Returns:
+            True se o embate passa em todos os filtros
         """
-        Lista todos os embates.
+        for key, value in (filters or {}).items():
+            if key in ("status", "tipo", "id"):
+                allowed = list(value) if isinstance(value, (list, tuple, set)) else [value]
+                if data.get(key) not in allowed:
+                    return False
+            elif key in DATE_COLUMNS:
+                current = data.get(key)
+                if isinstance(current, str):
+                    current = datetime.fromisoformat(current)
+                for name, bound in value.items():
+                    if name not in _DATE_OPERATORS:
+                        raise ValueError(f"Operador de data inválido: {name}")
+                    if isinstance(bound, str):
+                        bound = datetime.fromisoformat(bound)
+                    if current is None or not _DATE_OPERATORS[name](current, bound):
+                        return False
+            elif key == "metadata":
+                if not SupabaseStorage._contains(data.get("metadata") or {}, value):
+                    return False
+            elif key == "metadata_keys":
+                metadata = data.get("metadata") or {}
+                if any(meta_key not in metadata for meta_key in SupabaseStorage._meta_keys(value)):
+                    return False
+            else:
+                raise ValueError(f"Filtro não suportado: {key}")
+        return True
+
+    @staticmethod
+    def _encode_cursor(row: dict) -> str:
+        """Gera o cursor opaco a partir da última linha da página."""
+        key = json.dumps([row["criado_em"], row["id"]])
+        return base64.urlsafe_b64encode(key.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[str, str]:
+        """Recupera (criado_em, id) de um cursor."""
+        criado_em, embate_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return criado_em, embate_id
+
+    async def list_page(
+        self,
+        filters: dict[str, Any] | None = None,
+        columns: list[str] | None = None,
+        page_size: int = PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Busca uma página de embates com paginação por cursor (keyset).
+
+        As páginas são ordenadas por (criado_em, id), então o custo de cada
+        página não cresce com a posição, ao contrário de OFFSET.
+
+        Args:
+            filters: Filtros aplicados no banco (ver ``_apply_filters``)
+            columns: Colunas a retornar (todas por padrão)
+            page_size: Linhas por página
+            cursor: Cursor retornado pela página anterior
+
+        Returns:
+            Dicionário com ``data`` (linhas) e ``next_cursor`` (None na última página)
+        """
+        selected = "*"
+        if columns:
+            selected = ",".join(dict.fromkeys(["id", "criado_em", *columns]))
+
+        query = self.client.table("rag.embates").select(selected)
+        query = self._apply_filters(query, filters)
+        if cursor:
+            criado_em, embate_id = self._decode_cursor(cursor)
+            query = query.or_(
+                f'criado_em.gt."{criado_em}",'
+                f'and(criado_em.eq."{criado_em}",id.gt."{embate_id}")'
+            )
+
+        response = await query.order("criado_em").order("id").limit(page_size).execute()
+        rows = response.data or []
+
+        next_cursor = None
+        if len(rows) == page_size:
+            next_cursor = self._encode_cursor(rows[-1])
+        if columns:
+            # id e criado_em só foram pedidos para o cursor
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        return {"data": rows, "next_cursor": next_cursor}
+
+    async def iter_embates(
+        self,
+        filters: dict[str, Any] | None = None,
+        columns: list[str] | None = None,
+        page_size: int = PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        """
+        Percorre os embates página a página, sem carregar tudo na memória.
+
+        Args:
+            filters: Filtros aplicados no banco (ver ``_apply_filters``)
+            columns: Colunas a retornar
+            page_size: Linhas por página
+
+        Yields:
+            Linhas da tabela como dicionários
+        """
+        cursor = None
+        while True:
+            page = await self.list_page(filters, columns, page_size, cursor)
+            for row in page["data"]:
+                yield row
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
+    async def list(self, filters: dict[str, Any] | None = None) -> list[Embate]:
+        """
+        Lista os embates.
+
+        Args:
+            filters: Filtros aplicados no banco (ver ``_apply_filters``)
 
         Returns:
             Lista de embates
         """
-        response = await self.client.table("rag.embates").select("*").execute()
+        return [self._to_embate(data) async for data in self.iter_embates(filters)]
 
-        embates = []
-        for data in response.data:
-            data["criado_em"] = datetime.fromisoformat(data["criado_em"])
-            data["atualizado_em"] = datetime.fromisoformat(data["atualizado_em"])
-            embates.append(Embate(**data))
+    async def export_embates(
+        self, filters: dict[str, Any] | None = None, columns: List[str] | None = None
+    ) -> List[dict]:
+        """
+        Exporta embates como dicionários, filtrando e projetando no banco.
 
-        return embates
+        Args:
+            filters: Filtros aplicados no banco (ver ``_apply_filters``)
+            columns: Colunas a exportar (todas por padrão)
 
+        Returns:
+            Lista de embates exportados
+        """
+        return [row async for row in self.iter_embates(filters, columns)]
 
 """Storage para embates."""
 
@@ -86,12 +310,70 @@ from ..models import Embate
 
 
 class MemoryStorage:
-    """Storage em memória para testes."""
+    """
+    Storage em memória para testes.
+
+    O commit dos ciclos de embates é feito em segundo plano (write-behind):
+    ``save`` só atualiza a memória e marca o embate como pendente; uma tarefa
+    de fundo agrupa os pendentes e roda o git quando o intervalo expira ou
+    quando o número de pendentes atinge o limite.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 30.0,
+        flush_threshold: int = 20,
+        push: bool = True,
+        repo_dir: str | None = None,
+    ):
+        """
+        Inicializa o storage.
 
-    def __init__(self):
+        Args:
+            flush_interval: Segundos entre flushes do buffer
+            flush_threshold: Pendentes que disparam um flush imediato
+            push: Faz push após cada commit (False só faz o commit local)
+            repo_dir: Diretório do repositório git (padrão: diretório atual)
+        """
         self.embates: dict[str, Embate] = {}
         self._call_count = 0
         self._last_call = None
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.push = push
+        self.repo_dir = repo_dir
+        self._pending: dict[str, Embate] = {}
+        self._commit_requested = False
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self._wake: asyncio.Event | None = None
+        self._listeners: list[Callable[[], Callable | None]] = []
+
+    def subscribe(self, callback: Callable[[str, Embate | None], None]) -> None:
+        """
+        Registra um callback chamado a cada alteração.
+
+        O callback recebe ``(id, embate)`` em cada ``save`` (inclusive dos
+        embates de trigger) e ``(id, None)`` em cada ``delete``. Métodos são
+        guardados por referência fraca, então o assinante pode ser coletado.
+
+        Args:
+            callback: Função ou método a chamar
+        """
+        if hasattr(callback, "__self__"):
+            self._listeners.append(weakref.WeakMethod(callback))
+        else:
+            self._listeners.append(lambda: callback)
+
+    def _notify(self, embate_id: str, embate: Embate | None) -> None:
+        """Avisa os assinantes de uma alteração, descartando os coletados."""
+        alive = []
+        for ref in self._listeners:
+            callback = ref()
+            if callback is not None:
+                alive.append(ref)
+                callback(embate_id, embate)
+        self._listeners = alive
 
     def _check_embate_trigger(self) -> list[Embate]:
         """Verifica se deve iniciar embates."""
@@ -1431,6 +1713,8 @@ class MemoryStorage:
             embate.id = f"local-{datetime.now().isoformat()}"
 
         self.embates[embate.id] = embate
+        self._pending[embate.id] = embate
+        self._notify(embate.id, embate)
 
         # Incrementa contador apenas se não for um embate de trigger
         if not embate.metadata.get("is_trigger_embate"):
@@ -1446,9 +1730,10 @@ class MemoryStorage:
                 if not trigger_exists:
                     for trigger_embate in trigger_embates:
                         await self.save(trigger_embate)
-                    # Faz commit e push após criar os embates técnicos
-                    await self._commit_and_push()
+                    # Agenda o commit do ciclo em segundo plano
+                    self._commit_requested = True
 
+        self._schedule_flush()
         return {"data": {"id": embate.id}}
 
     async def get(self, id: str) -> Embate | None:
@@ -1464,42 +1749,104 @@ class MemoryStorage:
         if id in self.embates:
             embate = self.embates[id]
             del self.embates[id]
+            self._notify(id, None)
 
             # Se for um embate de trigger, reseta o contador
             if embate.metadata.get("is_trigger_embate"):
                 self._call_count = 0
                 self._last_call = None
 
-    async def _commit_and_push(self) -> None:
-        """Executa commit e push das alterações do ciclo de embates."""
+    def _schedule_flush(self) -> None:
+        """Garante a tarefa de flush e a acorda se o buffer estiver cheio."""
+        if not self._commit_requested:
+            return
+        if self._wake is None:
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        if len(self._pending) >= self.flush_threshold:
+            self._wake.set()
+
+    async def _flush_loop(self) -> None:
+        """Faz flush periodicamente enquanto houver commit pendente."""
+        try:
+            while self._commit_requested:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                await self.flush()
+        except asyncio.CancelledError:
+            # asyncio.run cancela as tarefas pendentes ao encerrar o loop:
+            # grava o ciclo antes de sair para não perder o commit
+            await self.flush()
+            raise
+
+    async def flush(self) -> None:
+        """Grava agora os pendentes, fazendo o commit do ciclo se solicitado."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._commit_requested:
+                self._pending.clear()
+                return
+            count = len(self._pending)
+            self._pending.clear()
+            self._commit_requested = False
+            await self._commit_and_push(count)
+
+    async def close(self) -> None:
+        """Faz o flush final e encerra a tarefa de fundo."""
+        await self.flush()
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _git(self, *args: str) -> tuple[int, str]:
+        """Executa um comando git sem bloquear o event loop."""
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            cwd=self.repo_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+        return process.returncode, (stdout or stderr).decode()
+
+    async def _commit_and_push(self, count: int = 0) -> None:
+        """Executa commit (e push, se habilitado) das alterações do ciclo de embates."""
         try:
-            import subprocess
-            from datetime import datetime
-
             # Verifica se há alterações para commitar
-            status = subprocess.run(
-                ["git", "status", "--porcelain"], capture_output=True, text=True, check=True
-            )
+            code, output = await self._git("status", "--porcelain")
+            if code != 0:
+                raise RuntimeError(output)
 
-            if status.stdout.strip():
+            if output.strip():
                 # Há alterações para commitar
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                message = f"✨ Ciclo de embates {timestamp}: Melhorias automáticas ({count} embates)"
 
-                subprocess.run(["git", "add", "."], check=True)
-                subprocess.run(
-                    [
-                        "git",
-                        "commit",
-                        "-m",
-                        f"✨ Ciclo de embates {timestamp}: Melhorias automáticas",
-                    ],
-                    check=True,
-                )
+                for args in (("add", "."), ("commit", "-m", message)):
+                    code, output = await self._git(*args)
+                    if code != 0:
+                        raise RuntimeError(output)
+
+                if not self.push:
+                    print(f"\n✅ Commit do ciclo {timestamp} realizado com sucesso!")
+                    return
 
                 # Push para o repositório remoto
-                subprocess.run(["git", "push"], check=True)
+                code, output = await self._git("push")
+                if code != 0:
+                    raise RuntimeError(output)
                 print(f"\n✅ Commit e push do ciclo {timestamp} realizados com sucesso!")
             else:
                 print("\n⏭️  Ciclo sem alterações para commitar")
-        except subprocess.CalledProcessError as e:
+        except (OSError, RuntimeError) as e:
             print(f"\n❌ Erro ao executar git: {e}")
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, TypeVar, Generic
+from typing import Dict, Any, List, Optional, TypeVar, Generic
 from datetime import datetime, timedelta
 import json
 import asyncio
@@ -159,6 +159,28 @@ class CacheManager(Generic[T]):
         else:
             return await self._get_from_memory(key)
             
+    async def get_many(self, keys: List[str]) -> Dict[str, Optional[T]]:
+        """Recupera vários valores com uma única consulta (MGET no Redis)"""
+        if not keys:
+            return {}
+            
+        if self.strategy == CacheStrategy.REDIS and self._redis:
+            try:
+                raw_values = await self._redis.mget([f"cache:{key}" for key in keys])
+                values: Dict[str, Optional[T]] = {}
+                for key, data in zip(keys, raw_values):
+                    entry = CacheEntry.from_dict(json.loads(data)) if data else None
+                    if entry is not None and entry.is_expired():
+                        await self.delete(key)
+                        entry = None
+                    values[key] = entry.value if entry is not None else None
+                return values
+                
+            except Exception as e:
+                logger.error(f"Erro ao recuperar do Redis: {e}")
+                
+        return {key: await self._get_from_memory(key) for key in keys}
+        
     async def _get_from_memory(self, key: str) -> Optional[T]:
         """Recupera valor do cache em memória"""
         entry = self._cache.get(key)
@@ -377,6 +399,20 @@ class EmbateCache:
             
         return result
         
+    async def get_results(
+        self,
+        context_hashes: List[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Recupera vários resultados de embates numa única consulta"""
+        results = await self.cache.get_many(context_hashes)
+        hits = sum(1 for result in results.values() if result)
+        logger.info(
+            "Cache multi-get",
+            extra={"requested": len(context_hashes), "hits": hits, "metadata": metadata}
+        )
+        return results
+        
     async def store_result(
         self,
         context_hash: str,
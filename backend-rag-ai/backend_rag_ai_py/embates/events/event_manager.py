@@ -1,10 +1,16 @@
-from typing import Dict, Any, Optional, List, Callable, Awaitable
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, field
 from datetime import datetime
 import asyncio
 import json
 import logging
+import random
+import time
 from enum import Enum
 
+if TYPE_CHECKING:
+    from .redis_event_bus import RedisStreamEventBus
+
 logger = logging.getLogger(__name__)
 
 class EventType(Enum):
@@ -21,38 +27,182 @@ class EventType(Enum):
     SYSTEM_ERROR = "system_error"
 
 EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+TopicKey = Tuple[EventType, str]
+
+# Eventos ligados ao ciclo de vida de um embate específico
+EMBATE_EVENT_TYPES = (
+    EventType.EMBATE_STARTED,
+    EventType.EMBATE_COMPLETED,
+    EventType.EMBATE_FAILED,
+    EventType.AGENT_STARTED,
+    EventType.AGENT_COMPLETED,
+    EventType.AGENT_FAILED
+)
+
+class OverflowPolicy(Enum):
+    """Política aplicada quando a fila de despacho está cheia"""
+    DROP_OLDEST = "drop_oldest"  # Descarta o evento mais antigo da fila
+    BLOCK = "block"              # Aguarda espaço na fila (backpressure)
+    SAMPLE = "sample"            # Aceita apenas uma amostra dos novos eventos
+
+@dataclass
+class DispatchConfig:
+    """Configuração do despacho assíncrono de eventos"""
+    
+    queue_size: int = 1000
+    workers: int = 4
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    sample_rate: float = 0.1
+    handler_timeout: Optional[float] = 5.0
+    # Quando False, publish aguarda os handlers (comportamento síncrono)
+    async_dispatch: bool = True
+
+@dataclass
+class HandlerLatency:
+    """Latência agregada de um handler"""
+    
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    
+    def record(self, duration: float):
+        self.calls += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "avg_time": self.total_time / self.calls if self.calls else 0.0,
+            "max_time": self.max_time
+        }
+
+@dataclass
+class DispatchMetrics:
+    """Métricas da fila de despacho de eventos"""
+    
+    published: int = 0
+    dispatched: int = 0
+    dropped: int = 0
+    handler_errors: int = 0
+    handler_timeouts: int = 0
+    max_queue_depth: int = 0
+    handler_latency: Dict[str, HandlerLatency] = field(default_factory=dict)
 
 class EventManager:
-    """Gerenciador de eventos para comunicação assíncrona"""
+    """Gerenciador de eventos para comunicação assíncrona.
+    
+    Por padrão ``publish`` apenas registra o evento no histórico e o
+    enfileira numa fila limitada; um pool de workers executa os handlers
+    fora do caminho crítico de quem publica.
     
-    def __init__(self):
+    Com um ``backend`` (ex.: ``RedisStreamEventBus``) os eventos também
+    são enviados em lote a um barramento compartilhado, e o histórico
+    passa a refletir todos os workers.
+    """
+    
+    def __init__(
+        self,
+        dispatch_config: Optional[DispatchConfig] = None,
+        backend: Optional["RedisStreamEventBus"] = None
+    ):
+        self._dispatch_config = dispatch_config or DispatchConfig()
+        self._backend = backend
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._dispatch_metrics = DispatchMetrics()
         self._subscribers: Dict[EventType, List[EventHandler]] = {
             event_type: [] for event_type in EventType
         }
+        # Handlers roteados por tópico: (tipo de evento, tópico) -> handlers
+        self._topic_subscribers: Dict[TopicKey, List[EventHandler]] = {}
         self._event_history: List[Dict[str, Any]] = []
         self._max_history = 1000
         self._lock = asyncio.Lock()
         
-    async def subscribe(self, event_type: EventType, handler: EventHandler):
-        """Registra um handler para um tipo de evento"""
+    @property
+    def backend(self) -> Optional["RedisStreamEventBus"]:
+        """Barramento distribuído configurado, se houver"""
+        return self._backend
+        
+    async def start(self):
+        """Inicia o backend distribuído, se configurado"""
+        if self._backend:
+            await self._backend.start(remote_handler=self._deliver_remote)
+            
+    async def stop(self):
+        """Drena a fila local e encerra o backend distribuído"""
+        await self.shutdown()
+        if self._backend:
+            await self._backend.stop()
+            
+    async def subscribe(
+        self,
+        event_type: EventType,
+        handler: EventHandler,
+        topic: Optional[str] = None
+    ):
+        """Registra um handler para um tipo de evento, opcionalmente restrito a um tópico"""
         async with self._lock:
-            self._subscribers[event_type].append(handler)
+            if topic is None:
+                self._subscribers[event_type].append(handler)
+            else:
+                self._topic_subscribers.setdefault(
+                    (event_type, topic), []
+                ).append(handler)
             logger.debug(f"Handler registrado para evento {event_type.value}")
             
-    async def unsubscribe(self, event_type: EventType, handler: EventHandler):
+    async def unsubscribe(
+        self,
+        event_type: EventType,
+        handler: EventHandler,
+        topic: Optional[str] = None
+    ):
         """Remove um handler de um tipo de evento"""
         async with self._lock:
-            if handler in self._subscribers[event_type]:
-                self._subscribers[event_type].remove(handler)
+            if topic is None:
+                handlers = self._subscribers[event_type]
+            else:
+                handlers = self._topic_subscribers.get((event_type, topic), [])
+            if handler in handlers:
+                handlers.remove(handler)
                 logger.debug(f"Handler removido do evento {event_type.value}")
+            if topic is not None and not handlers:
+                self._topic_subscribers.pop((event_type, topic), None)
+                
+    async def unsubscribe_topic(self, topic: str) -> int:
+        """Remove todos os handlers de um tópico e retorna quantos foram removidos"""
+        async with self._lock:
+            removed = 0
+            for event_type in EventType:
+                handlers = self._topic_subscribers.pop((event_type, topic), None)
+                if handlers:
+                    removed += len(handlers)
+            if removed:
+                logger.debug(f"{removed} handlers removidos do tópico {topic}")
+            return removed
+            
+    def topic_subscriber_count(self, topic: Optional[str] = None) -> int:
+        """Retorna o número de handlers por tópico (ou de todos os tópicos)"""
+        return sum(
+            len(handlers)
+            for (_, key_topic), handlers in self._topic_subscribers.items()
+            if topic is None or key_topic == topic
+        )
                 
     async def publish(
         self,
         event_type: EventType,
         data: Dict[str, Any],
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        topic: Optional[str] = None
     ):
-        """Publica um evento para todos os subscribers"""
+        """Publica um evento para os subscribers globais e os do tópico.
+        
+        Os handlers de tópico são localizados por lookup direto em
+        ``(event_type, topic)``, então o custo de publicação não cresce
+        com o número de tópicos registrados.
+        """
         event = {
             "type": event_type.value,
             "timestamp": datetime.utcnow().isoformat(),
@@ -66,30 +216,165 @@ class EventManager:
             if len(self._event_history) > self._max_history:
                 self._event_history.pop(0)
                 
-        # Notifica subscribers
-        handlers = self._subscribers[event_type]
+        # Apenas bufferiza; o envio ao barramento é feito em lote
+        if self._backend:
+            self._backend.append(event, event_type.value, topic)
+            
+        # Notifica subscribers globais e do tópico
+        handlers = self._handlers_for(event_type, topic)
         if handlers:
-            tasks = [
-                asyncio.create_task(self._notify_handler(handler, event))
-                for handler in handlers
-            ]
-            await asyncio.gather(*tasks, return_exceptions=True)
+            self._dispatch_metrics.published += 1
+            if self._dispatch_config.async_dispatch:
+                await self._enqueue(handlers, event)
+            else:
+                await self._dispatch(handlers, event)
             
         logger.debug(
             f"Evento {event_type.value} publicado",
             extra={"event": event}
         )
         
+    def _handlers_for(
+        self,
+        event_type: EventType,
+        topic: Optional[str] = None
+    ) -> List[EventHandler]:
+        """Retorna handlers globais e do tópico para um evento"""
+        handlers = list(self._subscribers[event_type])
+        if topic is not None:
+            handlers.extend(self._topic_subscribers.get((event_type, topic), ()))
+        return handlers
+        
+    async def _deliver_remote(self, event: Dict[str, Any], topic: Optional[str]):
+        """Entrega aos handlers locais um evento publicado por outro worker"""
+        try:
+            event_type = EventType(event["type"])
+        except (KeyError, ValueError):
+            logger.warning("Evento remoto com tipo desconhecido", extra={"event": event})
+            return
+            
+        handlers = self._handlers_for(event_type, topic)
+        if handlers:
+            await self._enqueue(handlers, event)
+        
+    async def _enqueue(self, handlers: List[EventHandler], event: Dict[str, Any]):
+        """Enfileira um evento aplicando a política de overflow"""
+        self._ensure_workers()
+        config = self._dispatch_config
+        item = (handlers, event)
+        
+        if self._queue.full():
+            if config.overflow_policy == OverflowPolicy.BLOCK:
+                await self._queue.put(item)
+                self._update_queue_depth()
+                return
+                
+            if (
+                config.overflow_policy == OverflowPolicy.SAMPLE
+                and random.random() >= config.sample_rate
+            ):
+                self._dispatch_metrics.dropped += 1
+                return
+                
+            # DROP_OLDEST (ou evento amostrado): abre espaço descartando o mais antigo
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._dispatch_metrics.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+                
+        self._queue.put_nowait(item)
+        self._update_queue_depth()
+        
+    def _update_queue_depth(self):
+        """Atualiza o pico de profundidade da fila"""
+        depth = self._queue.qsize()
+        if depth > self._dispatch_metrics.max_queue_depth:
+            self._dispatch_metrics.max_queue_depth = depth
+            
+    def _ensure_workers(self):
+        """Cria a fila e o pool de workers na primeira publicação"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._dispatch_config.queue_size)
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self._dispatch_config.workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+            
+    async def _worker(self):
+        """Consome eventos da fila e notifica os handlers"""
+        while True:
+            handlers, event = await self._queue.get()
+            try:
+                await self._dispatch(handlers, event)
+            finally:
+                self._queue.task_done()
+                
+    async def _dispatch(self, handlers: List[EventHandler], event: Dict[str, Any]):
+        """Notifica handlers de um evento concorrentemente"""
+        await asyncio.gather(
+            *(self._notify_handler(handler, event) for handler in handlers),
+            return_exceptions=True
+        )
+        self._dispatch_metrics.dispatched += 1
+        
     async def _notify_handler(self, handler: EventHandler, event: Dict[str, Any]):
         """Notifica um handler específico sobre um evento"""
+        name = getattr(handler, "__qualname__", repr(handler))
+        start = time.perf_counter()
         try:
-            await handler(event)
+            await asyncio.wait_for(
+                handler(event),
+                timeout=self._dispatch_config.handler_timeout
+            )
+        except asyncio.TimeoutError:
+            self._dispatch_metrics.handler_timeouts += 1
+            logger.warning(
+                f"Handler {name} excedeu o timeout",
+                extra={"event": event}
+            )
         except Exception as e:
+            self._dispatch_metrics.handler_errors += 1
             logger.error(
                 f"Erro ao notificar handler: {e}",
                 extra={"event": event},
                 exc_info=True
             )
+        finally:
+            self._dispatch_metrics.handler_latency.setdefault(
+                name, HandlerLatency()
+            ).record(time.perf_counter() - start)
+            
+    async def drain(self):
+        """Aguarda o processamento de todos os eventos enfileirados"""
+        if self._queue is not None:
+            await self._queue.join()
+            
+    async def shutdown(self, drain: bool = True):
+        """Encerra o pool de workers, opcionalmente drenando a fila"""
+        if drain:
+            await self.drain()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        
+    def get_dispatch_metrics(self) -> Dict[str, Any]:
+        """Retorna métricas da fila de despacho e latência dos handlers"""
+        metrics = self._dispatch_metrics
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": metrics.max_queue_depth,
+            "published": metrics.published,
+            "dispatched": metrics.dispatched,
+            "dropped": metrics.dropped,
+            "handler_errors": metrics.handler_errors,
+            "handler_timeouts": metrics.handler_timeouts,
+            "handler_latency": {
+                name: latency.to_dict()
+                for name, latency in metrics.handler_latency.items()
+            }
+        }
             
     async def get_history(
         self,
@@ -97,6 +382,12 @@ class EventManager:
         limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Retorna histórico de eventos"""
+        if self._backend:
+            return await self._backend.get_history(
+                event_type=event_type.value if event_type else None,
+                limit=limit
+            )
+            
         async with self._lock:
             history = self._event_history
             if event_type:
@@ -116,8 +407,15 @@ class EventManager:
 class EmbateEventManager:
     """Gerenciador de eventos específico para embates"""
     
-    def __init__(self):
-        self.event_manager = EventManager()
+    def __init__(
+        self,
+        auto_unsubscribe: bool = True,
+        dispatch_config: Optional[DispatchConfig] = None,
+        backend: Optional["RedisStreamEventBus"] = None
+    ):
+        self.event_manager = EventManager(dispatch_config, backend)
+        # Remove handlers do embate quando ele é concluído ou falha
+        self.auto_unsubscribe = auto_unsubscribe
         
     async def on_embate_started(
         self,
@@ -132,7 +430,8 @@ class EmbateEventManager:
                 "embate_id": embate_id,
                 "context": context
             },
-            metadata
+            metadata,
+            topic=embate_id
         )
         
     async def on_embate_completed(
@@ -148,8 +447,10 @@ class EmbateEventManager:
                 "embate_id": embate_id,
                 "result": result
             },
-            metadata
+            metadata,
+            topic=embate_id
         )
+        await self._release_embate(embate_id)
         
     async def on_embate_failed(
         self,
@@ -165,8 +466,10 @@ class EmbateEventManager:
                 "error": str(error),
                 "error_type": error.__class__.__name__
             },
-            metadata
+            metadata,
+            topic=embate_id
         )
+        await self._release_embate(embate_id)
         
     async def on_agent_started(
         self,
@@ -181,7 +484,8 @@ class EmbateEventManager:
                 "agent_id": agent_id,
                 "embate_id": embate_id
             },
-            metadata
+            metadata,
+            topic=embate_id
         )
         
     async def on_agent_completed(
@@ -199,7 +503,8 @@ class EmbateEventManager:
                 "embate_id": embate_id,
                 "result": result
             },
-            metadata
+            metadata,
+            topic=embate_id
         )
         
     async def on_agent_failed(
@@ -218,7 +523,8 @@ class EmbateEventManager:
                 "error": str(error),
                 "error_type": error.__class__.__name__
             },
-            metadata
+            metadata,
+            topic=embate_id
         )
         
     async def subscribe_to_embate(
@@ -227,19 +533,33 @@ class EmbateEventManager:
         handler: EventHandler
     ):
         """Registra handler para eventos de um embate específico"""
-        async def filtered_handler(event: Dict[str, Any]):
-            if event["data"].get("embate_id") == embate_id:
-                await handler(event)
-                
-        for event_type in [
-            EventType.EMBATE_STARTED,
-            EventType.EMBATE_COMPLETED,
-            EventType.EMBATE_FAILED,
-            EventType.AGENT_STARTED,
-            EventType.AGENT_COMPLETED,
-            EventType.AGENT_FAILED
-        ]:
-            await self.event_manager.subscribe(event_type, filtered_handler)
+        for event_type in EMBATE_EVENT_TYPES:
+            await self.event_manager.subscribe(
+                event_type,
+                handler,
+                topic=embate_id
+            )
+            
+    async def unsubscribe_from_embate(
+        self,
+        embate_id: str,
+        handler: Optional[EventHandler] = None
+    ):
+        """Remove um handler (ou todos) dos eventos de um embate"""
+        if handler is None:
+            await self.event_manager.unsubscribe_topic(embate_id)
+            return
+        for event_type in EMBATE_EVENT_TYPES:
+            await self.event_manager.unsubscribe(
+                event_type,
+                handler,
+                topic=embate_id
+            )
+            
+    async def _release_embate(self, embate_id: str):
+        """Libera os handlers de um embate encerrado"""
+        if self.auto_unsubscribe:
+            await self.event_manager.unsubscribe_topic(embate_id)
             
     async def get_embate_history(
         self,
@@ -247,6 +567,11 @@ class EmbateEventManager:
         limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Retorna histórico de eventos de um embate específico"""
+        backend = self.event_manager.backend
+        if backend:
+            # Stream por embate: não depende do worker que publicou
+            return await backend.get_history(topic=embate_id, limit=limit)
+            
         history = await self.event_manager.get_history()
         filtered_history = [
             event for event in history
@@ -0,0 +1,292 @@
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+import asyncio
+import json
+import logging
+import os
+import socket
+
+try:
+    import aioredis
+except (ImportError, TypeError):
+    # aioredis 2.x não importa no Python 3.11+; redis.asyncio é o sucessor
+    from redis import asyncio as aioredis
+
+Redis = aioredis.Redis
+
+from ...config.redis_config import RedisConfig
+
+logger = logging.getLogger(__name__)
+
+RemoteEventHandler = Callable[[Dict[str, Any], Optional[str]], Awaitable[None]]
+
+class RedisStreamEventBus:
+    """Barramento de eventos distribuído baseado em Redis Streams.
+
+    ``append`` apenas bufferiza o evento; uma task de flush envia os
+    eventos em lote (``XADD`` via pipeline) e outra task consome o stream
+    com ``XREADGROUP``, entregando aos handlers locais os eventos
+    publicados por outros workers. Por padrão cada worker usa um grupo
+    próprio (``f"{group}:{consumer}"``), então todo worker recebe todos os
+    eventos e só ignora os que ele mesmo publicou. Com ``shared_group``
+    os workers dividem a entrega de um único grupo, e um evento lido pelo
+    próprio worker que o publicou não é entregue a nenhum outro.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        stream: str = "embates:events",
+        group: str = "embates",
+        consumer: Optional[str] = None,
+        shared_group: bool = False,
+        maxlen: int = 10000,
+        topic_maxlen: int = 500,
+        topic_ttl: int = 86400,
+        batch_size: int = 100,
+        flush_interval: float = 0.1,
+        max_buffer: int = 10000,
+        read_count: int = 100,
+        block_ms: int = 1000
+    ):
+        self._redis_url = redis_url or RedisConfig.get_redis_url()
+        self.stream = stream
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.shared_group = shared_group
+        self.group = group if shared_group else f"{group}:{self.consumer}"
+        self.maxlen = maxlen
+        self.topic_maxlen = topic_maxlen
+        self.topic_ttl = topic_ttl
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.read_count = read_count
+        self.block_ms = block_ms
+
+        self._redis: Optional[Redis] = None
+        self._buffer: List[Dict[str, str]] = []
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._running = False
+        self._remote_handler: Optional[RemoteEventHandler] = None
+        self._stats = {
+            "appended": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "consumed": 0,
+            "flush_errors": 0
+        }
+
+    async def start(
+        self,
+        remote_handler: Optional[RemoteEventHandler] = None,
+        redis: Optional[Redis] = None
+    ):
+        """Conecta ao Redis, cria o grupo de consumo e inicia as tasks"""
+        self._redis = redis or await aioredis.from_url(
+            self._redis_url,
+            encoding="utf-8",
+            decode_responses=True
+        )
+        self._remote_handler = remote_handler
+        self._running = True
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        try:
+            await self._redis.xgroup_create(
+                self.stream,
+                self.group,
+                id="$",
+                mkstream=True
+            )
+        except Exception as e:
+            # Grupo já existente
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        if remote_handler:
+            self._consumer_task = asyncio.create_task(self._consume_loop())
+        logger.info(
+            f"Barramento de eventos iniciado no stream {self.stream}",
+            extra={"group": self.group, "consumer": self.consumer}
+        )
+
+    async def stop(self):
+        """Envia eventos pendentes e encerra as tasks"""
+        # O cliente Redis pode engolir o cancelamento de um XREADGROUP
+        # bloqueante; a flag garante a saída ao fim da leitura em curso
+        self._running = False
+        for task in (self._consumer_task, self._flush_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._consumer_task = None
+        self._flush_task = None
+
+        await self.flush()
+        if self._redis:
+            if not self.shared_group:
+                # O grupo é exclusivo deste worker; não deixa lixo no stream
+                try:
+                    await self._redis.xgroup_destroy(self.stream, self.group)
+                except Exception as e:
+                    logger.warning(f"Erro ao remover grupo {self.group}: {e}")
+            await self._redis.close()
+            self._redis = None
+        logger.info("Barramento de eventos parado")
+
+    def append(
+        self,
+        event: Dict[str, Any],
+        event_type: str,
+        topic: Optional[str] = None
+    ):
+        """Bufferiza um evento para envio em lote (não faz I/O)"""
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.pop(0)
+            self._stats["dropped"] += 1
+
+        self._buffer.append({
+            "type": event_type,
+            "topic": topic or "",
+            "origin": self.consumer,
+            "event": json.dumps(event, default=str)
+        })
+        self._stats["appended"] += 1
+
+        if self._flush_event and len(self._buffer) >= self.batch_size:
+            self._flush_event.set()
+
+    async def flush(self):
+        """Envia os eventos bufferizados com um único pipeline"""
+        if not self._redis or not self._buffer:
+            return
+
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for fields in batch:
+                    pipe.xadd(
+                        self.stream,
+                        fields,
+                        maxlen=self.maxlen,
+                        approximate=True
+                    )
+                    if fields["topic"]:
+                        topic_stream = self._topic_stream(fields["topic"])
+                        pipe.xadd(
+                            topic_stream,
+                            fields,
+                            maxlen=self.topic_maxlen,
+                            approximate=True
+                        )
+                        pipe.expire(topic_stream, self.topic_ttl)
+                await pipe.execute()
+                self._stats["flushed"] += len(batch)
+            except Exception as e:
+                self._stats["flush_errors"] += 1
+                logger.error(f"Erro ao enviar eventos ao Redis: {e}")
+                # Devolve o lote ao buffer respeitando o limite
+                room = max(self.max_buffer - len(self._buffer), 0)
+                self._stats["dropped"] += max(len(batch) - room, 0)
+                self._buffer = batch[-room:] + self._buffer if room else self._buffer
+
+    async def get_history(
+        self,
+        event_type: Optional[str] = None,
+        topic: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Retorna o histórico compartilhado entre workers (mais antigo primeiro)"""
+        if not self._redis:
+            return []
+
+        await self.flush()
+        stream = self._topic_stream(topic) if topic else self.stream
+        count = self.topic_maxlen if topic else self.maxlen
+
+        entries = await self._redis.xrevrange(stream, max="+", min="-", count=count)
+
+        history = []
+        for _, fields in entries:
+            if event_type and fields.get("type") != event_type:
+                continue
+            history.append(json.loads(fields["event"]))
+            if limit and len(history) >= limit:
+                break
+
+        history.reverse()
+        return history
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do barramento"""
+        return {
+            **self._stats,
+            "buffered": len(self._buffer),
+            "stream": self.stream,
+            "group": self.group,
+            "consumer": self.consumer
+        }
+
+    def _topic_stream(self, topic: str) -> str:
+        """Nome do stream secundário de um tópico"""
+        return f"{self.stream}:topic:{topic}"
+
+    async def _flush_loop(self):
+        """Envia lotes por tamanho ou intervalo"""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(
+                        self._flush_event.wait(),
+                        timeout=self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Erro no loop de flush de eventos: {e}")
+
+    async def _consume_loop(self):
+        """Consome eventos de outros workers e entrega aos handlers locais"""
+        while self._running:
+            try:
+                response = await self._redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    streams={self.stream: ">"},
+                    count=self.read_count,
+                    block=self.block_ms
+                )
+                for _, entries in response or []:
+                    ids = []
+                    for entry_id, fields in entries:
+                        ids.append(entry_id)
+                        # Eventos deste worker já foram entregues localmente
+                        if fields.get("origin") == self.consumer:
+                            continue
+                        self._stats["consumed"] += 1
+                        await self._remote_handler(
+                            json.loads(fields["event"]),
+                            fields.get("topic") or None
+                        )
+                    if ids:
+                        await self._redis.xack(self.stream, self.group, *ids)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Erro ao consumir eventos do Redis: {e}")
+                await asyncio.sleep(self.flush_interval)
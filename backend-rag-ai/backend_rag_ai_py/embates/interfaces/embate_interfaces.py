@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import asyncio
 from typing import Dict, Any, Optional, List, Protocol, runtime_checkable
 from datetime import datetime
 
@@ -82,6 +83,17 @@ class IEmbateCache(ABC):
     async def invalidate_result(self, context_hash: str):
         """Invalida resultado no cache"""
         pass
+        
+    async def get_results(
+        self,
+        context_hashes: List[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Recupera vários resultados; implementações devem usar uma única consulta"""
+        values = await asyncio.gather(
+            *(self.get_result(context_hash, metadata) for context_hash in context_hashes)
+        )
+        return dict(zip(context_hashes, values))
 
 class IEmbateEvents(ABC):
     """Interface para eventos de embates"""
@@ -206,6 +218,20 @@ class IEmbateMetrics(ABC):
     ):
         """Registra falha"""
         pass
+        
+    async def record_stage_timings(
+        self,
+        embate_id: str,
+        timings: Dict[str, float],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Registra a duração de cada etapa
+        
+        Por padrão não faz nada: as etapas não entram na série de
+        ``record_processing_time``, que mede o embate inteiro. Implementações
+        que quiserem as etapas sobrescrevem este método.
+        """
+        pass
 
 class IEmbateLogger(ABC):
     """Interface para logging de embates"""
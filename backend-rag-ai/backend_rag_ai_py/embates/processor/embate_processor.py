@@ -1,5 +1,8 @@
 from typing import Dict, Any, Optional, List
+from contextlib import contextmanager
+import asyncio
 import logging
+import time
 from ..interfaces.embate_interfaces import (
     IEmbateProcessor,
     IEmbateStrategy,
@@ -11,6 +14,7 @@ from ..interfaces.embate_interfaces import (
     IEmbateLogger
 )
 from ..models.embate_models import DefaultEmbateResult
+from ...utils.content_hash import UncacheableValueError, embate_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +26,13 @@ class EmbateProcessor(IEmbateProcessor):
         cache: IEmbateCache,
         events: IEmbateEvents,
         metrics: IEmbateMetrics,
-        logger: IEmbateLogger
+        logger: IEmbateLogger,
+        model_config: Optional[Dict[str, Any]] = None,
+        max_concurrency: int = 5
     ):
         self._cache = cache
+        self._model_config = model_config or {}
+        self._max_concurrency = max_concurrency
         self._events = events
         self._metrics = metrics
         self._logger = logger
@@ -36,119 +44,364 @@ class EmbateProcessor(IEmbateProcessor):
         strategy: Optional[str] = None
     ) -> EmbateResult:
         """Processa um embate usando a estratégia especificada"""
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
         try:
             # Registra início do processamento
-            start_time = context.created_at
-            await self._events.on_embate_started(
-                context.embate_id,
-                context.parameters,
-                context.metadata
-            )
+            with self._stage(timings, "events"):
+                await self._events.on_embate_started(
+                    context.embate_id,
+                    context.parameters,
+                    context.metadata
+                )
             
-            # Tenta recuperar do cache
-            cache_result = await self._cache.get_result(
-                context.embate_id,
-                context.metadata
-            )
+            # Seleciona estratégia
+            strategy_impl = self._get_strategy(strategy)
+            if not strategy_impl:
+                raise ValueError(f"Estratégia não encontrada: {strategy}")
+                
+            # Tenta recuperar do cache (chave derivada do conteúdo, não do ID)
+            cache_key = self._cache_key_or_none(context, strategy_impl)
+            cache_result = None
+            if cache_key is not None:
+                with self._stage(timings, "cache_lookup"):
+                    cache_result = await self._cache.get_result(
+                        cache_key,
+                        context.metadata
+                    )
             
             if cache_result:
                 self._logger.info(
                     "Resultado recuperado do cache",
-                    {"embate_id": context.embate_id}
-                )
-                return DefaultEmbateResult(
-                    _embate_id=context.embate_id,
-                    _success=True,
-                    _data=cache_result,
-                    _metrics={"cache_hit": 1.0},
-                    _errors=[]
+                    {"embate_id": context.embate_id, "cache_key": cache_key}
                 )
+                return await self._finish_cached(context, cache_result, start, timings)
                 
-            # Seleciona estratégia
-            strategy_impl = self._get_strategy(strategy)
-            if not strategy_impl:
-                raise ValueError(f"Estratégia não encontrada: {strategy}")
+            return await self._execute(context, strategy_impl, cache_key, start, timings)
+            
+        except Exception as e:
+            return await self._handle_failure(context, e, start, timings)
+            
+    async def process_many(
+        self,
+        contexts: List[EmbateContext],
+        strategy: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ) -> List[EmbateResult]:
+        """
+        Processa vários embates de uma vez.
+        
+        Contextos com o mesmo conteúdo (mesma chave de cache) são executados
+        uma única vez; os acertos de cache são buscados numa só consulta e as
+        falhas de cache rodam em paralelo, limitadas por ``max_concurrency``.
+        
+        Returns:
+            Resultados na mesma ordem de ``contexts``
+        """
+        if not contexts:
+            return []
+            
+        start = time.perf_counter()
+        strategy_impl = self._get_strategy(strategy)
+        if not strategy_impl:
+            error = ValueError(f"Estratégia não encontrada: {strategy}")
+            return [
+                await self._handle_failure(context, error, start, {})
+                for context in contexts
+            ]
+            
+        # Notifica início; como em process_embate, uma falha aqui invalida
+        # apenas o próprio embate, não o lote
+        shared: Dict[str, float] = {}
+        with self._stage(shared, "events"):
+            started = await asyncio.gather(
+                *(
+                    self._events.on_embate_started(
+                        context.embate_id,
+                        context.parameters,
+                        context.metadata
+                    )
+                    for context in contexts
+                ),
+                return_exceptions=True
+            )
+            
+        # Agrupa contextos idênticos; os sem chave estável rodam sozinhos e sem cache
+        results: List[Optional[EmbateResult]] = [None] * len(contexts)
+        groups: Dict[str, List[int]] = {}
+        uncacheable = set()
+        for index, (context, outcome) in enumerate(zip(contexts, started)):
+            if isinstance(outcome, BaseException):
+                results[index] = await self._handle_failure(
+                    context, outcome, start, dict(shared)
+                )
+                continue
+            cache_key = self._cache_key_or_none(context, strategy_impl)
+            if cache_key is None:
+                cache_key = f"uncacheable:{index}"
+                uncacheable.add(cache_key)
+            groups.setdefault(cache_key, []).append(index)
+            
+        with self._stage(shared, "cache_lookup"):
+            cached = await self._lookup_many({
+                cache_key: contexts[indexes[0]].metadata
+                for cache_key, indexes in groups.items()
+                if cache_key not in uncacheable
+            })
+            
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self._max_concurrency))
+        
+        async def run_group(cache_key: str, indexes: List[int]):
+            leader, *followers = [contexts[index] for index in indexes]
+            timings = dict(shared)
+            
+            if cached.get(cache_key):
+                for index in indexes:
+                    try:
+                        results[index] = await self._finish_cached(
+                            contexts[index], cached[cache_key], start, dict(shared)
+                        )
+                    except Exception as e:
+                        results[index] = await self._handle_failure(
+                            contexts[index], e, start, dict(shared)
+                        )
+                return
                 
-            # Valida contexto
-            if not await strategy_impl.validate(context):
-                raise ValueError("Contexto inválido para a estratégia")
+            async with semaphore:
+                try:
+                    result = await self._execute(
+                        leader,
+                        strategy_impl,
+                        None if cache_key in uncacheable else cache_key,
+                        start,
+                        timings
+                    )
+                except Exception as e:
+                    result = await self._handle_failure(leader, e, start, timings)
+            results[indexes[0]] = result
+            
+            # Contextos duplicados reaproveitam o resultado do primeiro
+            for index, context in zip(indexes[1:], followers):
+                results[index] = await self._finish_duplicate(context, result, start, timings)
                 
-            # Processa embate
+        await asyncio.gather(*(
+            run_group(cache_key, indexes) for cache_key, indexes in groups.items()
+        ))
+        return results
+        
+    async def _lookup_many(
+        self,
+        keys: Dict[str, Optional[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Busca várias chaves numa consulta; se ela falhar, busca uma a uma
+        
+        Chaves cuja busca individual também falha contam como falta de cache.
+        
+        Args:
+            keys: Metadata de cada chave, repassado a ``get_result``
+        """
+        if not keys:
+            return {}
+        try:
+            return await self._cache.get_results(list(keys))
+        except Exception as e:
+            self._logger.warning(
+                "Falha na consulta em lote ao cache; buscando chave a chave",
+                {"keys": len(keys), "error": str(e)}
+            )
+            
+        found = await asyncio.gather(
+            *(self._cache.get_result(key, metadata) for key, metadata in keys.items()),
+            return_exceptions=True
+        )
+        return {
+            key: value
+            for key, value in zip(keys, found)
+            if not isinstance(value, BaseException)
+        }
+        
+    async def _execute(
+        self,
+        context: EmbateContext,
+        strategy_impl: IEmbateStrategy,
+        cache_key: Optional[str],
+        start: float,
+        timings: Dict[str, float]
+    ) -> EmbateResult:
+        """Valida, executa a estratégia, armazena em cache (se houver chave) e notifica"""
+        # Valida contexto
+        with self._stage(timings, "validate"):
+            valid = await strategy_impl.validate(context)
+        if not valid:
+            raise ValueError("Contexto inválido para a estratégia")
+            
+        # Processa embate
+        with self._stage(timings, "strategy"):
             result = await strategy_impl.process(
                 context,
                 self._cache,
                 self._events
             )
-            
-            # Registra métricas
-            processing_time = (context.created_at - start_time).total_seconds()
-            await self._metrics.record_processing_time(
+        
+        if result.success:
+            await self._metrics.record_success(
                 context.embate_id,
-                processing_time,
                 context.metadata
             )
             
-            if result.success:
-                await self._metrics.record_success(
-                    context.embate_id,
-                    context.metadata
-                )
-                
-                # Armazena em cache
-                await self._cache.store_result(
-                    context.embate_id,
-                    result.data,
-                    metadata=context.metadata
-                )
-                
-                # Notifica conclusão
+            # Armazena em cache
+            if cache_key is not None:
+                with self._stage(timings, "cache_store"):
+                    await self._cache.store_result(
+                        cache_key,
+                        result.data,
+                        metadata=context.metadata
+                    )
+            
+            # Notifica conclusão
+            with self._stage(timings, "events"):
                 await self._events.on_embate_completed(
                     context.embate_id,
                     result.data,
                     context.metadata
                 )
-            else:
-                # Registra falha
-                if result.errors:
-                    error = Exception(result.errors[0]["message"])
-                    await self._metrics.record_failure(
-                        context.embate_id,
-                        error,
-                        context.metadata
-                    )
-                    await self._events.on_embate_failed(
-                        context.embate_id,
-                        error,
-                        context.metadata
-                    )
-                    
-            return result
-            
-        except Exception as e:
-            self._logger.error(
-                "Erro no processamento do embate",
-                error=e,
-                context={"embate_id": context.embate_id}
-            )
-            
+        elif result.errors:
             # Registra falha
+            error = Exception(result.errors[0]["message"])
             await self._metrics.record_failure(
                 context.embate_id,
-                e,
+                error,
                 context.metadata
             )
-            
-            # Notifica falha
+            with self._stage(timings, "events"):
+                await self._events.on_embate_failed(
+                    context.embate_id,
+                    error,
+                    context.metadata
+                )
+                
+        await self._record_timings(context, start, timings)
+        return result
+        
+    async def _finish_duplicate(
+        self,
+        context: EmbateContext,
+        source: EmbateResult,
+        start: float,
+        timings: Dict[str, float]
+    ) -> EmbateResult:
+        """Replica o resultado de um contexto idêntico, com as notificações próprias"""
+        result = DefaultEmbateResult(
+            _embate_id=context.embate_id,
+            _success=source.success,
+            _data=source.data,
+            _metrics={**source.metrics, "deduplicated": 1.0},
+            _errors=list(source.errors)
+        )
+        if result.success:
+            await self._metrics.record_success(context.embate_id, context.metadata)
+            await self._events.on_embate_completed(
+                context.embate_id,
+                result.data,
+                context.metadata
+            )
+        elif result.errors:
+            error = Exception(result.errors[0]["message"])
+            await self._metrics.record_failure(context.embate_id, error, context.metadata)
+            await self._events.on_embate_failed(context.embate_id, error, context.metadata)
+        await self._record_timings(context, start, dict(timings))
+        return result
+        
+    async def _handle_failure(
+        self,
+        context: EmbateContext,
+        error: Exception,
+        start: float,
+        timings: Dict[str, float]
+    ) -> EmbateResult:
+        """Registra e notifica uma falha de processamento"""
+        self._logger.error(
+            "Erro no processamento do embate",
+            error=error,
+            context={"embate_id": context.embate_id}
+        )
+        
+        # Registra falha
+        await self._metrics.record_failure(
+            context.embate_id,
+            error,
+            context.metadata
+        )
+        
+        # Notifica falha
+        with self._stage(timings, "events"):
             await self._events.on_embate_failed(
                 context.embate_id,
-                e,
+                error,
                 context.metadata
             )
             
-            return DefaultEmbateResult.error_result(
+        await self._record_timings(context, start, timings)
+        return DefaultEmbateResult.error_result(
+            context.embate_id,
+            error
+        )
+        
+    async def _finish_cached(
+        self,
+        context: EmbateContext,
+        data: Dict[str, Any],
+        start: float,
+        timings: Dict[str, float]
+    ) -> EmbateResult:
+        """Monta o resultado de um acerto de cache e notifica a conclusão
+        
+        A chave vem do conteúdo, então o acerto pode ser de outro embate; a
+        conclusão é publicada (marcada como ``cache_hit``) para que os
+        assinantes do tópico deste embate sejam avisados e liberados.
+        """
+        with self._stage(timings, "events"):
+            await self._events.on_embate_completed(
                 context.embate_id,
-                e
+                data,
+                {**(context.metadata or {}), "cache_hit": True}
             )
+        await self._record_timings(context, start, timings)
+        return DefaultEmbateResult(
+            _embate_id=context.embate_id,
+            _success=True,
+            _data=data,
+            _metrics={"cache_hit": 1.0},
+            _errors=[]
+        )
+        
+    async def _record_timings(
+        self,
+        context: EmbateContext,
+        start: float,
+        timings: Dict[str, float]
+    ):
+        """Registra o tempo total (relógio monotônico) e o tempo de cada etapa"""
+        await self._metrics.record_processing_time(
+            context.embate_id,
+            time.perf_counter() - start,
+            context.metadata
+        )
+        await self._metrics.record_stage_timings(
+            context.embate_id,
+            timings,
+            context.metadata
+        )
+        
+    @staticmethod
+    @contextmanager
+    def _stage(timings: Dict[str, float], name: str):
+        """Acumula a duração de uma etapa em ``timings``"""
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - stage_start
             
     async def register_strategy(self, strategy: IEmbateStrategy):
         """Registra uma nova estratégia"""
@@ -157,6 +410,26 @@ class EmbateProcessor(IEmbateProcessor):
             f"Estratégia registrada: {strategy.strategy_name}"
         )
         
+    def cache_key(self, context: EmbateContext, strategy: IEmbateStrategy) -> str:
+        """Chave de cache: estratégia, parâmetros (sem campos voláteis) e modelo"""
+        model_config = context.parameters.get("model_config", self._model_config)
+        return embate_cache_key(strategy.strategy_name, context.parameters, model_config)
+        
+    def _cache_key_or_none(
+        self,
+        context: EmbateContext,
+        strategy: IEmbateStrategy
+    ) -> Optional[str]:
+        """Chave de cache, ou None se os parâmetros não têm identidade estável"""
+        try:
+            return self.cache_key(context, strategy)
+        except UncacheableValueError as e:
+            self._logger.warning(
+                "Embate processado sem cache",
+                {"embate_id": context.embate_id, "reason": str(e)}
+            )
+            return None
+        
     def get_available_strategies(self) -> List[str]:
         """Retorna estratégias disponíveis"""
         return list(self._strategies.keys())
@@ -1,5 +1,8 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import json
 import logging
+import numpy as np
 from ..interfaces.embate_interfaces import (
     IEmbateStrategy,
     EmbateContext,
@@ -11,9 +14,26 @@ from ..models.embate_models import DefaultEmbateResult
 
 logger = logging.getLogger(__name__)
 
+# Modos de pontuação das opções
+SCORING_SEQUENTIAL = "sequential"  # Uma chamada por opção, em série
+SCORING_CONCURRENT = "concurrent"  # Uma chamada por opção, em paralelo (limitado)
+SCORING_BATCH = "batch"            # Todas as opções num único prompt com resposta JSON
+
 class ComparativeStrategy(IEmbateStrategy):
     """Estratégia para comparar múltiplas opções e escolher a melhor"""
     
+    def __init__(self, scoring_mode: str = SCORING_CONCURRENT, max_concurrency: int = 5):
+        """
+        Inicializa a estratégia.
+        
+        Args:
+            scoring_mode: Modo padrão de pontuação (sequential, concurrent, batch);
+                pode ser sobrescrito por ``parameters["scoring_mode"]``
+            max_concurrency: Máximo de chamadas simultâneas no modo concurrent
+        """
+        self.scoring_mode = scoring_mode
+        self.max_concurrency = max_concurrency
+        
     @property
     def strategy_name(self) -> str:
         return "comparative"
@@ -41,8 +61,6 @@ class ComparativeStrategy(IEmbateStrategy):
             options = context.parameters["options"]
             criteria = context.parameters["criteria"]
             weights = context.parameters["weights"]
-            agent = context.parameters["agent"]
-            prompt_template = context.parameters["prompt_template"]
             
             # Inicializa resultado
             result = DefaultEmbateResult(
@@ -53,58 +71,25 @@ class ComparativeStrategy(IEmbateStrategy):
                 _errors=[]
             )
             
-            # Análise individual de cada opção
-            individual_scores = {}
-            for option in options:
-                try:
-                    # Notifica análise da opção
-                    await events.on_agent_started(
-                        agent_id="comparative_analyzer",
-                        embate_id=context.embate_id,
-                        metadata={"option": option}
-                    )
-                    
-                    # Prepara prompt para análise individual
-                    prompt = self._prepare_individual_prompt(
-                        prompt_template,
-                        option,
-                        criteria
-                    )
-                    
-                    # Executa análise
-                    analysis = await self._execute_agent(
-                        agent,
-                        prompt,
-                        context.parameters
-                    )
-                    
-                    # Valida e normaliza scores
-                    scores = self._normalize_scores(
-                        analysis.get("scores", {}),
-                        criteria
-                    )
-                    
-                    individual_scores[option] = {
-                        "scores": scores,
-                        "analysis": analysis.get("analysis", {})
-                    }
-                    
-                    # Notifica conclusão da análise
-                    await events.on_agent_completed(
-                        agent_id="comparative_analyzer",
-                        embate_id=context.embate_id,
-                        result={"option": option, "scores": scores},
-                        metadata={"phase": "individual_analysis"}
-                    )
-                    
-                except Exception as e:
-                    result.add_error(e)
-                    await events.on_agent_failed(
-                        agent_id="comparative_analyzer",
-                        embate_id=context.embate_id,
-                        error=e,
-                        metadata={"option": option}
+            # Análise das opções (falhas individuais não interrompem as demais)
+            scoring_mode = context.parameters.get("scoring_mode", self.scoring_mode)
+            if scoring_mode == SCORING_BATCH:
+                individual_scores, failures = await self._score_batch(
+                    context, options, criteria, events
+                )
+            else:
+                individual_scores, failures = await self._score_individually(
+                    context,
+                    options,
+                    criteria,
+                    events,
+                    concurrency=(
+                        1 if scoring_mode == SCORING_SEQUENTIAL
+                        else context.parameters.get("max_concurrency", self.max_concurrency)
                     )
+                )
+            for error in failures:
+                result.add_error(error)
                     
             # Calcula scores finais ponderados
             final_scores = self._calculate_weighted_scores(
@@ -130,7 +115,8 @@ class ComparativeStrategy(IEmbateStrategy):
             })
             
             # Adiciona métricas
-            result.add_metric("options_analyzed", len(options))
+            result.add_metric("options_analyzed", len(individual_scores))
+            result.add_metric("options_failed", len(failures))
             result.add_metric("criteria_used", len(criteria))
             result.add_metric(
                 "score_spread",
@@ -147,6 +133,218 @@ class ComparativeStrategy(IEmbateStrategy):
                 e
             )
             
+    async def _score_individually(
+        self,
+        context: EmbateContext,
+        options: List[str],
+        criteria: List[str],
+        events: IEmbateEvents,
+        concurrency: int
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[Exception]]:
+        """Pontua cada opção com uma chamada própria, até ``concurrency`` em paralelo"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def score(option: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._score_option(context, option, criteria, events)
+                
+        outcomes = await asyncio.gather(
+            *(score(option) for option in options),
+            return_exceptions=True
+        )
+        
+        individual_scores = {}
+        failures = []
+        for option, outcome in zip(options, outcomes):
+            if isinstance(outcome, Exception):
+                failures.append(outcome)
+            else:
+                individual_scores[option] = outcome
+        return individual_scores, failures
+        
+    async def _score_option(
+        self,
+        context: EmbateContext,
+        option: str,
+        criteria: List[str],
+        events: IEmbateEvents
+    ) -> Dict[str, Any]:
+        """Analisa uma opção individualmente"""
+        try:
+            # Notifica análise da opção
+            await events.on_agent_started(
+                agent_id="comparative_analyzer",
+                embate_id=context.embate_id,
+                metadata={"option": option}
+            )
+            
+            # Prepara prompt para análise individual
+            prompt = self._prepare_individual_prompt(
+                context.parameters["prompt_template"],
+                option,
+                criteria
+            )
+            
+            # Executa análise
+            analysis = await self._execute_agent(
+                context.parameters["agent"],
+                prompt,
+                context.parameters
+            )
+            
+            # Valida e normaliza scores
+            scores = self._normalize_scores(
+                analysis.get("scores", {}),
+                criteria
+            )
+            
+            # Notifica conclusão da análise
+            await events.on_agent_completed(
+                agent_id="comparative_analyzer",
+                embate_id=context.embate_id,
+                result={"option": option, "scores": scores},
+                metadata={"phase": "individual_analysis"}
+            )
+            
+            return {
+                "scores": scores,
+                "analysis": analysis.get("analysis", {})
+            }
+            
+        except Exception as e:
+            await events.on_agent_failed(
+                agent_id="comparative_analyzer",
+                embate_id=context.embate_id,
+                error=e,
+                metadata={"option": option}
+            )
+            raise
+            
+    async def _score_batch(
+        self,
+        context: EmbateContext,
+        options: List[str],
+        criteria: List[str],
+        events: IEmbateEvents
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[Exception]]:
+        """
+        Pontua todas as opções com uma única chamada de resposta estruturada.
+        
+        Opções ausentes ou inválidas na resposta são reavaliadas
+        individualmente, em paralelo.
+        """
+        individual_scores = {}
+        failures = []
+        try:
+            await events.on_agent_started(
+                agent_id="comparative_analyzer",
+                embate_id=context.embate_id,
+                metadata={"options": options, "phase": "batch_analysis"}
+            )
+            
+            prompt = self._prepare_batch_prompt(
+                context.parameters["prompt_template"],
+                options,
+                criteria
+            )
+            response = await self._execute_agent(
+                context.parameters["agent"],
+                prompt,
+                context.parameters
+            )
+            
+            for item in self._parse_batch_response(response):
+                option = item.get("option")
+                if option in options and isinstance(item.get("scores"), dict):
+                    individual_scores[option] = {
+                        "scores": self._normalize_scores(item["scores"], criteria),
+                        "analysis": item.get("analysis", {})
+                    }
+                    
+            await events.on_agent_completed(
+                agent_id="comparative_analyzer",
+                embate_id=context.embate_id,
+                result={
+                    option: data["scores"] for option, data in individual_scores.items()
+                },
+                metadata={"phase": "batch_analysis"}
+            )
+            
+        except Exception as e:
+            failures.append(e)
+            await events.on_agent_failed(
+                agent_id="comparative_analyzer",
+                embate_id=context.embate_id,
+                error=e,
+                metadata={"phase": "batch_analysis"}
+            )
+            
+        missing = [option for option in options if option not in individual_scores]
+        if missing:
+            retried, retry_failures = await self._score_individually(
+                context,
+                missing,
+                criteria,
+                events,
+                concurrency=context.parameters.get("max_concurrency", self.max_concurrency)
+            )
+            individual_scores.update(retried)
+            failures.extend(retry_failures)
+            
+        return individual_scores, failures
+        
+    def _prepare_batch_prompt(
+        self,
+        template: str,
+        options: List[str],
+        criteria: List[str]
+    ) -> str:
+        """Prepara prompt único para todas as opções, com esquema JSON da resposta"""
+        schema = {
+            "type": "object",
+            "properties": {
+                "options": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "option": {"type": "string"},
+                            "scores": {
+                                "type": "object",
+                                "properties": {c: {"type": "number"} for c in criteria}
+                            },
+                            "analysis": {"type": "string"}
+                        },
+                        "required": ["option", "scores"]
+                    }
+                }
+            },
+            "required": ["options"]
+        }
+        sections = [
+            self._prepare_individual_prompt(template, option, criteria)
+            for option in options
+        ]
+        return (
+            "Avalie cada opção abaixo segundo os critérios, com notas de 0 a 1.\n\n"
+            + "\n\n---\n\n".join(sections)
+            + "\n\nResponda somente com JSON válido neste esquema:\n"
+            + json.dumps(schema, ensure_ascii=False)
+        )
+        
+    def _parse_batch_response(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extrai a lista de opções da resposta (dict ou texto JSON)"""
+        if "options" not in response:
+            text = response.get("content") or response.get("text") or response.get("result")
+            if not isinstance(text, str):
+                raise ValueError("Resposta em lote sem campo 'options'")
+            text = text.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+            response = json.loads(text)
+        items = response.get("options")
+        if not isinstance(items, list):
+            raise ValueError("Campo 'options' da resposta em lote não é uma lista")
+        return [item for item in items if isinstance(item, dict)]
+        
     def _prepare_individual_prompt(
         self,
         template: str,
@@ -201,29 +399,33 @@ class ComparativeStrategy(IEmbateStrategy):
         individual_scores: Dict[str, Dict[str, Any]],
         weights: Dict[str, float]
     ) -> Dict[str, Dict[str, Any]]:
-        """Calcula scores finais ponderados"""
-        final_scores = {}
+        """Calcula scores finais ponderados (matriz critérios × opções)"""
+        options = list(individual_scores.keys())
+        criteria = list(weights.keys())
         
         # Normaliza pesos
-        total_weight = sum(weights.values())
-        normalized_weights = {
-            k: w/total_weight for k, w in weights.items()
-        }
-        
-        for option, data in individual_scores.items():
-            scores = data["scores"]
-            weighted_sum = sum(
-                scores.get(criterion, 0.0) * normalized_weights.get(criterion, 0.0)
-                for criterion in weights.keys()
-            )
+        weight_vector = np.array([weights[c] for c in criteria], dtype=float)
+        total_weight = weight_vector.sum()
+        if total_weight:
+            weight_vector = weight_vector / total_weight
             
-            final_scores[option] = {
-                "final_score": weighted_sum,
+        matrix = np.array(
+            [
+                [individual_scores[option]["scores"].get(c, 0.0) for option in options]
+                for c in criteria
+            ],
+            dtype=float
+        ).reshape(len(criteria), len(options))
+        weighted = matrix * weight_vector[:, np.newaxis]
+        totals = weighted.sum(axis=0)
+        
+        return {
+            option: {
+                "final_score": float(totals[j]),
                 "weighted_scores": {
-                    criterion: scores.get(criterion, 0.0) * normalized_weights.get(criterion, 0.0)
-                    for criterion in weights.keys()
+                    criterion: float(weighted[i, j]) for i, criterion in enumerate(criteria)
                 },
-                "analysis": data["analysis"]
+                "analysis": individual_scores[option]["analysis"]
             }
-            
-        return final_scores 
\ No newline at end of file
+            for j, option in enumerate(options)
+        }
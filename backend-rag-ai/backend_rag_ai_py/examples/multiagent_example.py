@@ -8,6 +8,7 @@ from typing import List
 
 from ..services.multiagent.core.coordinator import AgentCoordinator
 from ..services.multiagent.core.interfaces import AgentResponse
+from ..services.multiagent.core.pipeline import DEFAULT_PIPELINE
 from ..services.multiagent.core.providers import GeminiProvider
 
 
@@ -22,13 +23,8 @@ async def process_research_task(coordinator: AgentCoordinator, task: str) -> lis
     Returns:
         Lista com resultados do processamento
     """
-    # Define pipeline de agentes
-    pipeline = [
-        "researcher",  # Pesquisa inicial
-        "analyst",  # Análise dos resultados
-        "improver",  # Melhoria do conteúdo
-        "synthesizer",  # Síntese final
-    ]
+    # Define pipeline de agentes: cada um recebe a saída do anterior
+    pipeline = DEFAULT_PIPELINE
 
     # Executa pipeline
     results = await coordinator.process_pipeline(task, pipeline)
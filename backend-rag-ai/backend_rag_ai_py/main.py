@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 # Importar e configurar rotas após a criação do app
 from backend_rag_ai_py.api.config_routes import configure_routes
 from backend_rag_ai_py.middleware.error_handler import configure_error_handlers
+from backend_rag_ai_py.services.llm_services.async_calls import shutdown_llm_executor
 
 app = FastAPI(
     title="Backend RAG AI",
@@ -32,6 +33,11 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.on_event("shutdown")
+async def shutdown_llm_calls():
+    """Libera o pool de threads das chamadas de LLM."""
+    shutdown_llm_executor()
+
 @app.get("/")
 async def root():
     """Rota raiz da API."""
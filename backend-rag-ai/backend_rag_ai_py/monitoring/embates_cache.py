@@ -1,9 +1,9 @@
-import hashlib
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 
+from ..utils.content_hash import UncacheableValueError, content_hash
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,11 +15,19 @@ class EmbatesCache:
         self._hits = 0
         self._misses = 0
 
-    def _generate_hash(self, embate_data: dict) -> str:
-        """Gera hash único para o embate"""
-        # Ordena as chaves para garantir consistência
-        serialized = json.dumps(embate_data, sort_keys=True)
-        return hashlib.sha256(serialized.encode()).hexdigest()
+    def _generate_hash(self, embate_data: dict) -> str | None:
+        """Gera hash do embate completo, incluindo ID e timestamps
+
+        Os resultados guardados carregam dados do próprio embate, então dois
+        embates só compartilham entrada se forem idênticos. Retorna None
+        quando o embate contém objetos sem identidade estável; nesse caso o
+        resultado não passa pelo cache.
+        """
+        try:
+            return content_hash(embate_data, volatile=())
+        except UncacheableValueError as e:
+            logger.warning(f"Embate sem chave de cache estável: {e}")
+            return None
 
     def _is_valid(self, hash_key: str) -> bool:
         """Verifica se o cache ainda é válido"""
@@ -32,6 +40,8 @@ class EmbatesCache:
     def get_validation_result(self, embate_data: dict) -> dict | None:
         """Recupera resultado de validação do cache"""
         hash_key = self._generate_hash(embate_data)
+        if hash_key is None:
+            return None
 
         if hash_key in self._cache and self._is_valid(hash_key):
             logger.info(f"Cache hit para embate hash: {hash_key}")
@@ -45,6 +55,8 @@ class EmbatesCache:
     def store_validation(self, embate_data: dict, result: dict) -> None:
         """Armazena resultado de validação no cache"""
         hash_key = self._generate_hash(embate_data)
+        if hash_key is None:
+            return
         self._cache[hash_key] = result
         self._timestamps[hash_key] = datetime.now()
         logger.info(f"Resultado armazenado em cache para hash: {hash_key}")
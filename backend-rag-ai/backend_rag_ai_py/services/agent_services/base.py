@@ -6,6 +6,7 @@ import asyncio
 from typing import Any, Dict, Optional
 
 from ...analysis.suggestions.interfaces import CursorAI
+from ..llm_services.rate_limiter import get_llm_scheduler, is_rate_limited, retry_after_seconds
 from ..llm_services.tracker import LlmTracker
 
 
@@ -39,10 +40,13 @@ class BaseAgent:
         """
         Processa uma tarefa com retry.
 
+        O intervalo cresce exponencialmente (com jitter) a partir de ``delay``;
+        em respostas 429 usa o ``Retry-After`` informado pelo provider.
+
         Args:
             task: Tarefa a ser processada
             max_retries: Número máximo de tentativas
-            delay: Delay entre tentativas em segundos
+            delay: Delay base entre tentativas em segundos
 
         Returns:
             Resultado do processamento
@@ -56,7 +60,10 @@ class BaseAgent:
                 )
                 if attempt == max_retries - 1:
                     raise
-                await asyncio.sleep(delay * (attempt + 1))
+                retry_after = retry_after_seconds(e) if is_rate_limited(e) else None
+                if retry_after is None:
+                    retry_after = get_llm_scheduler().backoff_delay(attempt, base=delay)
+                await asyncio.sleep(retry_after)
 
     async def process(self, task: str) -> dict[str, Any]:
         """
@@ -2,30 +2,91 @@
 Coordenador central do sistema multi-agente.
 """
 
+import asyncio
+import logging
 from typing import Any, Dict, List
 
+from ...config.multiagent_config import COORDINATOR_CONFIG
 from ..llm_services.providers.gemini import GeminiProvider
 
+logger = logging.getLogger(__name__)
+
 
 class AgentCoordinator:
     """Coordenador dos agentes do sistema."""
 
-    def __init__(self, provider: GeminiProvider):
-        """Inicializa o coordenador."""
+    def __init__(
+        self,
+        provider: GeminiProvider | None = None,
+        max_concurrency: int | None = None,
+        agent_timeout: float | None = None,
+    ):
+        """
+        Inicializa o coordenador.
+
+        Args:
+            provider: Provedor LLM compartilhado
+            max_concurrency: Máximo de agentes executando ao mesmo tempo
+            agent_timeout: Timeout padrão por agente, em segundos; None (padrão)
+                não limita, já que agentes como o CursorAI executam a pipeline
+                de embates inteira
+        """
         self.provider = provider
         self.agents = {}
+        self.timeouts: dict[str, float | None] = {}
+        self.max_concurrency = max_concurrency or COORDINATOR_CONFIG["max_concurrent_agents"]
+        self.agent_timeout = agent_timeout
+
+    def register_agent(self, name: str, agent: Any, timeout: float | None = None) -> None:
+        """
+        Registra um novo agente.
 
-    def register_agent(self, name: str, agent: Any) -> None:
-        """Registra um novo agente."""
+        Args:
+            name: Nome do agente
+            agent: Instância do agente
+            timeout: Timeout próprio do agente, em segundos (padrão: ``agent_timeout``)
+        """
         self.agents[name] = agent
+        if timeout is not None:
+            self.timeouts[name] = timeout
+
+    def _unique_agents(self) -> list[tuple[Any, list[str]]]:
+        """Agrupa os nomes registrados por instância de agente."""
+        groups: dict[int, tuple[Any, list[str]]] = {}
+        for name, agent in self.agents.items():
+            groups.setdefault(id(agent), (agent, []))[1].append(name)
+        return list(groups.values())
 
     async def process(self, context: dict[str, Any]) -> dict[str, Any]:
-        """Processa uma tarefa usando os agentes registrados."""
+        """
+        Processa uma tarefa usando os agentes registrados.
+
+        Os agentes rodam em paralelo, limitados por um semáforo. Um agente
+        com timeout configurado que o excede aparece no resultado como erro
+        com ``timed_out``. Um agente registrado sob vários nomes é executado
+        uma única vez e seu resultado é repetido para cada nome.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_agent(agent: Any, names: list[str]) -> Any:
+            timeout = next(
+                (self.timeouts[name] for name in names if name in self.timeouts),
+                self.agent_timeout,
+            )
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(agent.process(context), timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Agente {names[0]} excedeu {timeout}s")
+                    return {"error": f"Timeout após {timeout}s", "timed_out": True}
+                except Exception as e:
+                    return {"error": str(e)}
+
+        groups = self._unique_agents()
+        outputs = await asyncio.gather(*(run_agent(agent, names) for agent, names in groups))
+
         results = {}
-        for name, agent in self.agents.items():
-            try:
-                result = await agent.process(context)
-                results[name] = result
-            except Exception as e:
-                results[name] = {"error": str(e)}
-        return results
+        for (_, names), output in zip(groups, outputs):
+            for name in names:
+                results[name] = output
+        return {name: results[name] for name in self.agents}
@@ -8,7 +8,9 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 
 from ...monitoring.metrics import Metrica
+from ..llm_services.rate_limiter import Priority
 from .multi_agent import GeminiAgent, MultiAgentSystem
+from .tiered import TieredExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,7 @@ class EmbateAgent(GeminiAgent):
     def __init__(self, name: str, api_key: str):
         super().__init__(name, api_key)
         self.metrica = Metrica(nome=f"embate_{name}", valor=0.0, timestamp=datetime.now())
+        self.tiered: TieredExecutor | None = None
 
     @classmethod
     def requer_embate(cls, prompt: str) -> bool:
@@ -47,8 +50,11 @@ class EmbateAgent(GeminiAgent):
         try:
             # Verifica se precisa ativar embate
             if not self.requer_embate(task) and not kwargs.get("force_embate"):
-                # Se não requer embate, executa normalmente
-                return await super().run(task)
+                # Se não requer embate, executa normalmente (modelo barato primeiro, se houver)
+                if self.tiered is None:
+                    return await super().run(task)
+                escalate = super().run
+                return await self.tiered.run(task, lambda: escalate(task))
 
             # Verifica se pode usar ferramentas
             if not self.metrica.incrementar_tools():
@@ -97,6 +103,22 @@ class EmbateAgent(GeminiAgent):
 class EmbateSystem(MultiAgentSystem):
     """Sistema multiagente com suporte a embates."""
 
+    # Ciclos de embate cedem a vez às requisições interativas da API
+    default_priority = Priority.BACKGROUND
+
+    def __init__(self, *args: Any, tiered: TieredExecutor | None = None, **kwargs: Any):
+        """
+        Inicializa o sistema.
+
+        Args:
+            tiered: Executor em camadas para tarefas que não requerem embate
+            *args, **kwargs: Repassados a MultiAgentSystem
+        """
+        super().__init__(*args, **kwargs)
+        self.tiered = tiered
+        for agent in self.agents.values():
+            agent.tiered = tiered
+
     def _setup_agents(self) -> dict[str, EmbateAgent]:
         """Configura os agentes com suporte a embates."""
         return {
@@ -106,25 +128,23 @@ class EmbateSystem(MultiAgentSystem):
             "synthesizer": EmbateAgent("synthesizer", self.api_key),
         }
 
-    async def process_task(
-        self, task: str, context: dict[str, Any] | None = None
-    ) -> dict[str, Any]:
-        """Processa uma tarefa, ativando embate se necessário."""
-        # Verifica se o prompt requer embate
-        requires_embate = any(agent.requer_embate(task) for agent in self.agents.values())
-
-        if requires_embate:
+    def _run_kwargs(self, task: str, context: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Ativa o embate nos agentes quando o prompt o requer."""
+        run_kwargs = super()._run_kwargs(task, context)
+        if any(agent.requer_embate(task) for agent in self.agents.values()):
             logger.info(f"Ativando sistema de embates para a tarefa: {task}")
-            context = context or {}
-            context["force_embate"] = True
-
-        return await super().process_task(task, context)
+            run_kwargs["force_embate"] = True
+        return run_kwargs
 
     def interromper_todos_embates(self) -> None:
         """Interrompe todos os embates ativos."""
         for agent in self.agents.values():
             agent.metrica.interromper_embate()
 
+    def get_tier_stats(self) -> dict[str, Any]:
+        """Retorna latência por camada e taxa de escalonamento."""
+        return self.tiered.get_stats() if self.tiered else {}
+
     def get_status_embates(self) -> dict[str, Any]:
         """Retorna o status de todos os embates."""
         return {
@@ -4,12 +4,31 @@ Sistema multiagente usando Gemini.
 
 import asyncio
 import logging
+from collections.abc import AsyncIterator
 from typing import Any, Dict, List, Optional
 
 import google.generativeai as genai
 
 from ...engine.llms.gemini_config import GENERATION_CONFIG, get_model_config
 from ...engine.llms.tracker import LlmTracker
+from ..llm_services import async_calls
+from ..llm_services.context_packer import ContextPacker
+from ..llm_services.rate_limiter import (
+    LlmScheduler,
+    Priority,
+    estimate_tokens,
+    get_llm_scheduler,
+)
+from ..llm_services.response_cache import ResponseCache
+from ..multiagent.core.config import get_max_concurrent_tasks
+from ..multiagent.core.pipeline import (
+    DEFAULT_PIPELINE,
+    PipelineDAG,
+    PipelineStep,
+    StepOutcome,
+    merge_inputs,
+    run_pipeline,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,25 +36,92 @@ logger = logging.getLogger(__name__)
 class GeminiAgent:
     """Agente base usando Gemini."""
 
-    def __init__(self, name: str, api_key: str):
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        cache: ResponseCache | None = None,
+        scheduler: LlmScheduler | None = None,
+        priority: Priority = Priority.NORMAL,
+    ):
         self.name = name
+        self.api_key = api_key
+        self.cache = cache
+        self.scheduler = scheduler or get_llm_scheduler()
+        self.priority = priority
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel("gemini-pro")
 
     async def run(self, task: str, **kwargs) -> dict[str, Any]:
         """Executa uma tarefa usando Gemini."""
         try:
-            response = self.model.generate_content(task)
-            return {"result": response.text}
+            return {"result": await self._generate_text(task)}
         except Exception as e:
             logger.error(f"Erro ao executar tarefa: {e}")
             return {"error": str(e)}
 
+    async def _generate_text(self, task: str) -> str:
+        """
+        Gera texto sem bloquear o event loop.
+
+        Consulta o cache, se houver; chamadas ao modelo passam pelo agendador
+        (cotas, prioridade e backoff em 429).
+        """
+
+        async def request() -> str:
+            response = await async_calls.generate_content(self.model, task)
+            return response.text
+
+        async def call() -> str:
+            text = await self.scheduler.run(
+                "gemini", request, estimate_tokens(task), self.priority, self.api_key
+            )
+            self.scheduler.record_usage("gemini", estimate_tokens(text), self.api_key)
+            return text
+
+        if self.cache is None:
+            return await call()
+        return await self.cache.get_or_call(self.model.model_name, task, {}, call)
+
+    async def stream(self, task: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Executa uma tarefa produzindo a resposta em trechos.
+
+        Como ``_generate_text``, consulta o cache e passa pelo agendador.
+        """
+
+        def call() -> AsyncIterator[str]:
+            return self.scheduler.stream(
+                "gemini",
+                lambda: async_calls.stream_content(self.model, task),
+                estimate_tokens(task),
+                self.priority,
+                self.api_key,
+            )
+
+        if self.cache is None:
+            async for delta in call():
+                yield delta
+            return
+        async for delta in self.cache.stream_or_call(self.model.model_name, task, {}, call):
+            yield delta
+
 
 class MultiAgentSystem:
     """Sistema multiagente usando Gemini."""
 
-    def __init__(self, config: dict[str, Any] | None = None):
+    default_priority = Priority.NORMAL
+
+    def __init__(
+        self,
+        config: dict[str, Any] | None = None,
+        pipeline: PipelineDAG | None = None,
+        max_concurrency: int | None = None,
+        response_cache: ResponseCache | None = None,
+        scheduler: LlmScheduler | None = None,
+        priority: Priority | None = None,
+        packer: ContextPacker | None = None,
+    ):
         """Inicializa o sistema multiagente."""
         self.config = config or get_model_config()
         self.api_key = self.config.get("api_key")
@@ -43,7 +129,18 @@ class MultiAgentSystem:
             raise ValueError("API key do Gemini não encontrada na configuração")
 
         self.agents = self._setup_agents()
+        # Cache e agendador compartilhados entre os agentes (inclusive os de subclasses)
+        self.scheduler = scheduler or get_llm_scheduler()
+        self.priority = self.default_priority if priority is None else priority
+        for agent in self.agents.values():
+            agent.cache = response_cache
+            agent.scheduler = self.scheduler
+            agent.priority = self.priority
         self.tracker = LlmTracker()
+        self.pipeline = pipeline or DEFAULT_PIPELINE
+        self.max_concurrency = max_concurrency or get_max_concurrent_tasks()
+        # Mantém cada etapa dentro de PROMPT_CONFIG (max_prompt_tokens - buffer)
+        self.packer = packer or ContextPacker()
 
     def _setup_agents(self) -> dict[str, GeminiAgent]:
         """Configura os agentes do sistema."""
@@ -54,30 +151,99 @@ class MultiAgentSystem:
             "synthesizer": GeminiAgent("synthesizer", self.api_key),
         }
 
+    def _run_kwargs(self, task: str, context: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Argumentos repassados a ``run``/``stream`` de cada agente a partir do contexto."""
+        return {key: value for key, value in (context or {}).items() if key != "task"}
+
     async def process_task(
         self, task: str, context: dict[str, Any] | None = None
     ) -> dict[str, Any]:
-        """Processa uma tarefa usando o sistema multiagente."""
+        """Processa uma tarefa executando a pipeline de agentes como DAG."""
         try:
-            # Pipeline de processamento
-            pipeline = ["researcher", "analyst", "improver", "synthesizer"]
-            results = {}
-
-            for agent_name in pipeline:
-                agent = self.agents[agent_name]
-                result = await agent.run(task)
-                results[agent_name] = result.get("result", "")
+            run_kwargs = self._run_kwargs(task, context)
 
-                # Atualiza contexto para próximo agente
-                if result.get("result"):
-                    task = result["result"]
+            async def run_step(step: PipelineStep, step_task: str, step_context: dict[str, Any]):
+                result = await self.agents[step.agent].run(step_task, **run_kwargs)
+                if result.get("error"):
+                    return StepOutcome(name=step.name, success=False, error=result["error"])
+                return StepOutcome(name=step.name, success=True, result=result.get("result", ""))
 
-            return results
+            outcomes = await run_pipeline(
+                self.pipeline,
+                task,
+                run_step,
+                context,
+                max_concurrency=self.max_concurrency,
+                packer=self.packer,
+            )
+            return {
+                name: outcome.result if outcome.success else ""
+                for name, outcome in outcomes.items()
+            }
 
         except Exception as e:
             logger.error(f"Erro no processamento: {e}")
             return {"error": str(e)}
 
+    async def stream_task(
+        self, task: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Processa uma tarefa emitindo eventos à medida que a pipeline avança.
+
+        Emite ``step`` quando cada etapa intermediária termina, ``delta``
+        para cada trecho da etapa final (transmitida em streaming) e
+        ``done`` ao concluir, ou ``error`` em caso de falha.
+        """
+        final = self.pipeline.steps[self.pipeline.order[-1]]
+        upstream = [step for name, step in self.pipeline.steps.items() if name != final.name]
+        run_kwargs = self._run_kwargs(task, context)
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def run_step(step: PipelineStep, step_task: str, step_context: dict[str, Any]):
+            result = await self.agents[step.agent].run(step_task, **run_kwargs)
+            outcome = (
+                StepOutcome(name=step.name, success=False, error=result["error"])
+                if result.get("error")
+                else StepOutcome(name=step.name, success=True, result=result.get("result", ""))
+            )
+            await events.put(outcome)
+            return outcome
+
+        pipeline_task = asyncio.create_task(
+            run_pipeline(
+                PipelineDAG(upstream), task, run_step, context, self.max_concurrency, self.packer
+            )
+        )
+        # Etapas puladas não geram evento; o fim da pipeline encerra a leitura
+        pipeline_task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (outcome := await events.get()) is not None:
+                yield {
+                    "event": "step",
+                    "agent": outcome.name,
+                    "success": outcome.success,
+                    "result": outcome.result if outcome.success else outcome.error,
+                }
+            outcomes = await pipeline_task
+
+            failed = [name for name in final.inputs if not outcomes[name].success]
+            if failed:
+                yield {"event": "error", "error": f"Etapas falharam: {', '.join(failed)}"}
+                return
+
+            async for delta in self.agents[final.agent].stream(
+                merge_inputs(task, final, outcomes, self.packer), **run_kwargs
+            ):
+                yield {"event": "delta", "agent": final.name, "text": delta}
+            yield {"event": "done"}
+
+        except Exception as e:
+            logger.error(f"Erro no streaming: {e}")
+            yield {"event": "error", "error": str(e)}
+        finally:
+            pipeline_task.cancel()
+
     async def generate_response(self, prompt: str) -> dict[str, Any]:
         """Gera uma resposta usando o agente sintetizador."""
         try:
@@ -89,6 +255,11 @@ class MultiAgentSystem:
             logger.error(f"Erro na geração: {e}")
             return {"error": str(e)}
 
+    async def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """Gera uma resposta com o agente sintetizador, trecho a trecho."""
+        async for delta in self.agents["synthesizer"].stream(prompt):
+            yield delta
+
     def get_system_status(self) -> dict[str, Any]:
         """Retorna o status do sistema."""
         return {
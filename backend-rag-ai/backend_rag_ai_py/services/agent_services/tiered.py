@@ -0,0 +1,162 @@
+"""
+Execução em camadas: modelo barato primeiro, escalonando para o modelo grande.
+"""
+
+import logging
+import re
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..llm_services.async_calls import run_blocking
+from ..llm_services.providers.base import BaseProvider
+
+logger = logging.getLogger(__name__)
+
+SELF_CHECK_INSTRUCTION = (
+    "\n\nResponda de forma direta. Na última linha, escreva apenas "
+    "'CONFIANCA: N', onde N de 0 a 100 indica o quanto você tem certeza da resposta."
+)
+
+# Sinais de que o modelo barato não sabe responder
+HEDGE_PATTERNS = [
+    r"n[aã]o (sei|tenho certeza|tenho informa[cç][oõ]es|consigo)",
+    r"talvez",
+    r"n[aã]o [eé] poss[ií]vel (afirmar|determinar)",
+    r"i (don'?t|do not) know",
+    r"i'?m not sure",
+    r"as an ai",
+]
+
+_CONFIDENCE_PATTERN = re.compile(r"CONFIAN[CÇ]A:\s*(\d{1,3})", re.IGNORECASE)
+
+
+class TierStats:
+    """Latência e volume de uma camada."""
+
+    def __init__(self, window_size: int = 500):
+        """Inicializa o acompanhamento com uma janela de latências."""
+        self.calls = 0
+        self.errors = 0
+        self.latencies: deque[float] = deque(maxlen=window_size)
+
+    def record(self, latency: float, success: bool = True) -> None:
+        """Registra o resultado de uma chamada."""
+        self.calls += 1
+        if success:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float | None:
+        """Retorna o percentil de latência das chamadas bem-sucedidas."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converte as estatísticas para dicionário."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+        }
+
+
+class TieredExecutor:
+    """
+    Responde com um modelo barato e escala para o modelo grande quando necessário.
+
+    A resposta do modelo barato inclui uma autoavaliação de confiança; ela é
+    combinada com heurísticas (respostas vazias, curtas demais ou evasivas).
+    Abaixo do limiar, a tarefa é reenviada ao modelo grande.
+    """
+
+    def __init__(
+        self,
+        cheap: BaseProvider,
+        confidence_threshold: float = 0.7,
+        min_answer_words: int = 3,
+        timeout: float | None = None,
+    ):
+        """
+        Inicializa o executor.
+
+        Args:
+            cheap: Provider barato ou local (ex.: OllamaLocalProvider, MockProvider)
+            confidence_threshold: Confiança mínima (0-1) para aceitar a resposta
+            min_answer_words: Respostas mais curtas são escaladas
+            timeout: Timeout da camada barata em segundos
+        """
+        self.cheap = cheap
+        self.confidence_threshold = confidence_threshold
+        self.min_answer_words = min_answer_words
+        self.timeout = timeout
+        self.tiers = {"cheap": TierStats(), "expensive": TierStats()}
+        self.escalations = 0
+        self.requests = 0
+
+    def assess(self, answer: str) -> tuple[str, float]:
+        """
+        Separa a resposta da autoavaliação e calcula a confiança.
+
+        Returns:
+            Resposta sem a linha de confiança e confiança entre 0 e 1
+        """
+        match = _CONFIDENCE_PATTERN.search(answer)
+        confidence = min(int(match.group(1)), 100) / 100 if match else 0.5
+        answer = _CONFIDENCE_PATTERN.sub("", answer).strip()
+
+        if len(answer.split()) < self.min_answer_words:
+            return answer, 0.0
+        lowered = answer.lower()
+        if any(re.search(pattern, lowered) for pattern in HEDGE_PATTERNS):
+            confidence = min(confidence, 0.3)
+        return answer, confidence
+
+    async def run(
+        self, task: str, escalate: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """
+        Executa a tarefa na camada barata, escalando se a confiança for baixa.
+
+        Args:
+            task: Tarefa a executar
+            escalate: Executa a tarefa no modelo grande
+
+        Returns:
+            Resultado com ``tier`` e ``confidence``
+        """
+        self.requests += 1
+        start = time.perf_counter()
+        try:
+            response = await run_blocking(
+                self.cheap.generate, task + SELF_CHECK_INSTRUCTION, timeout=self.timeout
+            )
+            answer, confidence = self.assess(response.get("content", ""))
+            self.tiers["cheap"].record(time.perf_counter() - start)
+        except Exception as e:
+            logger.warning(f"Camada barata falhou, escalando: {e}")
+            self.tiers["cheap"].record(time.perf_counter() - start, success=False)
+            answer, confidence = "", 0.0
+
+        if confidence >= self.confidence_threshold:
+            return {"result": answer, "tier": "cheap", "confidence": confidence}
+
+        self.escalations += 1
+        start = time.perf_counter()
+        result = await escalate()
+        self.tiers["expensive"].record(time.perf_counter() - start, not result.get("error"))
+        return {**result, "tier": "expensive", "confidence": confidence}
+
+    def get_stats(self) -> dict[str, Any]:
+        """Retorna latência por camada e taxa de escalonamento."""
+        return {
+            "requests": self.requests,
+            "escalations": self.escalations,
+            "escalation_rate": self.escalations / self.requests if self.requests else 0.0,
+            "tiers": {name: stats.to_dict() for name, stats in self.tiers.items()},
+        }
@@ -0,0 +1,153 @@
+"""
+Chamadas não bloqueantes aos modelos de linguagem.
+
+Usa a API assíncrona do SDK quando disponível; caso contrário executa a
+chamada síncrona num pool de threads dedicado e limitado, para não
+bloquear o event loop.
+"""
+
+import asyncio
+import functools
+import threading
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from .gemini_config import CALL_CONFIG
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """Retorna o pool de threads compartilhado das chamadas de LLM."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=CALL_CONFIG["max_workers"], thread_name_prefix="llm-call"
+                )
+    return _executor
+
+
+def shutdown_llm_executor(wait: bool = False) -> None:
+    """Encerra o pool de threads (ex.: no shutdown da aplicação)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+async def run_blocking(func, *args: Any, timeout: float | None = None, **kwargs: Any) -> Any:
+    """
+    Executa uma função síncrona no pool de LLM com timeout.
+
+    Args:
+        func: Função bloqueante
+        *args: Argumentos posicionais
+        timeout: Timeout em segundos (padrão: CALL_CONFIG["timeout"])
+        **kwargs: Argumentos nomeados
+
+    Returns:
+        Retorno da função
+
+    Raises:
+        asyncio.TimeoutError: Se a chamada exceder o timeout
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_llm_executor(), functools.partial(func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout or CALL_CONFIG["timeout"])
+
+
+async def generate_content(
+    model: Any, prompt: Any, timeout: float | None = None, **kwargs: Any
+) -> Any:
+    """
+    Chama ``model.generate_content`` sem bloquear o event loop.
+
+    Prefere ``generate_content_async`` do SDK; se o modelo não a oferecer,
+    delega a chamada síncrona ao pool de threads. Cancelar a coroutine
+    interrompe a espera; numa thread, a resposta tardia é descartada.
+
+    Args:
+        model: Modelo com ``generate_content`` (ex.: genai.GenerativeModel)
+        prompt: Prompt ou conteúdo da requisição
+        timeout: Timeout em segundos (padrão: CALL_CONFIG["timeout"])
+        **kwargs: Argumentos repassados ao SDK
+
+    Returns:
+        Resposta do SDK
+    """
+    generate_async = getattr(model, "generate_content_async", None)
+    if generate_async is not None:
+        return await asyncio.wait_for(
+            generate_async(prompt, **kwargs), timeout or CALL_CONFIG["timeout"]
+        )
+    return await run_blocking(model.generate_content, prompt, timeout=timeout, **kwargs)
+
+
+_STREAM_END = object()
+
+
+async def stream_content(
+    model: Any, prompt: Any, timeout: float | None = None, **kwargs: Any
+) -> AsyncIterator[str]:
+    """
+    Chama ``model.generate_content(..., stream=True)`` e produz os deltas de texto.
+
+    Com a API assíncrona do SDK os chunks são lidos diretamente; sem ela,
+    uma thread do pool itera a resposta síncrona e repassa os chunks ao
+    event loop. O timeout vale para a espera de cada chunk.
+
+    Args:
+        model: Modelo com ``generate_content`` (ex.: genai.GenerativeModel)
+        prompt: Prompt ou conteúdo da requisição
+        timeout: Timeout em segundos entre chunks (padrão: CALL_CONFIG["timeout"])
+        **kwargs: Argumentos repassados ao SDK
+
+    Yields:
+        Trechos de texto na ordem em que são gerados
+    """
+    timeout = timeout or CALL_CONFIG["timeout"]
+
+    generate_async = getattr(model, "generate_content_async", None)
+    if generate_async is not None:
+        response = await asyncio.wait_for(generate_async(prompt, stream=True, **kwargs), timeout)
+        chunks = response.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            if chunk.text:
+                yield chunk.text
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def produce() -> None:
+        try:
+            for chunk in model.generate_content(prompt, stream=True, **kwargs):
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+            loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    loop.run_in_executor(get_llm_executor(), produce)
+    try:
+        while True:
+            item = await asyncio.wait_for(queue.get(), timeout)
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            if item:
+                yield item
+    finally:
+        # Interrompe a thread se o consumidor desistir (cancelamento/timeout)
+        cancelled.set()
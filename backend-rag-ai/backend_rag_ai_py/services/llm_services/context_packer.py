@@ -0,0 +1,212 @@
+"""
+Orçamento de tokens e montagem de contexto dos prompts.
+
+Aplica ``PROMPT_CONFIG["max_prompt_tokens"]`` menos
+``PROMPT_CONFIG["token_limit_buffer"]``: seleciona os trechos mais
+similares que cabem no orçamento, descarta trechos sobrepostos e resume
+saídas anteriores da pipeline quando o prompt excederia o limite.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .gemini_config import PROMPT_CONFIG
+
+Tokenizer = Callable[[str], int]
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Conta tokens localmente, sem chamar a API.
+
+    Cada pontuação conta como um token e cada palavra como um token a cada
+    quatro caracteres, aproximando tokenizadores de subpalavras.
+    """
+    return sum(1 + (len(piece) - 1) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def prompt_budget(config: dict[str, Any] | None = None) -> int:
+    """Tokens disponíveis para o prompt segundo a configuração."""
+    config = config or PROMPT_CONFIG
+    return config["max_prompt_tokens"] - config["token_limit_buffer"]
+
+
+@dataclass
+class PackedContext:
+    """Trechos selecionados para o prompt."""
+
+    chunks: list[dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+    dropped: int = 0
+    duplicates: int = 0
+
+
+class ContextPacker:
+    """Monta contextos de prompt dentro de um orçamento de tokens."""
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        tokenizer: Tokenizer = count_tokens,
+        dedup_threshold: float = 0.8,
+        shingle_size: int = 5,
+    ):
+        """
+        Inicializa o empacotador.
+
+        Args:
+            max_tokens: Orçamento total (padrão: prompt_budget())
+            tokenizer: Função que conta tokens de um texto
+            dedup_threshold: Sobreposição de shingles a partir da qual um
+                trecho é considerado duplicado
+            shingle_size: Palavras por shingle na detecção de sobreposição
+        """
+        self.max_tokens = max_tokens or prompt_budget()
+        self.tokenizer = tokenizer
+        self.dedup_threshold = dedup_threshold
+        self.shingle_size = shingle_size
+
+    def pack(
+        self,
+        chunks: list[dict[str, Any]],
+        reserved: str | int = 0,
+        content_key: str = "content",
+        score_key: str = "similarity",
+    ) -> PackedContext:
+        """
+        Seleciona gulosamente os trechos mais similares que cabem no orçamento.
+
+        Args:
+            chunks: Trechos com conteúdo e pontuação de similaridade
+            reserved: Texto (ou tokens) já ocupado no prompt, ex.: a consulta
+            content_key: Chave do texto do trecho
+            score_key: Chave da pontuação de similaridade
+
+        Returns:
+            Trechos escolhidos, em ordem decrescente de similaridade
+        """
+        used = self.tokenizer(reserved) if isinstance(reserved, str) else reserved
+        packed = PackedContext(tokens=used)
+        selected_shingles: list[set[tuple[str, ...]]] = []
+
+        ranked = sorted(chunks, key=lambda chunk: chunk.get(score_key, 0.0), reverse=True)
+        for chunk in ranked:
+            content = str(chunk.get(content_key, ""))
+            shingles = self._shingles(content)
+            if any(
+                self._overlap(shingles, other) >= self.dedup_threshold
+                for other in selected_shingles
+            ):
+                packed.duplicates += 1
+                continue
+
+            tokens = self.tokenizer(content)
+            if packed.tokens + tokens > self.max_tokens:
+                packed.dropped += 1
+                continue
+
+            packed.chunks.append(chunk)
+            packed.tokens += tokens
+            selected_shingles.append(shingles)
+
+        return packed
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Corta o texto no limite de tokens, preservando palavras inteiras."""
+        if self.tokenizer(text) <= max_tokens:
+            return text
+
+        words = text.split()
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.tokenizer(" ".join(words[:middle])) < max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low]) + " …"
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        """
+        Resume o texto de forma extrativa para caber em ``max_tokens``.
+
+        Mantém, na ordem original, as frases com termos mais frequentes no
+        texto; não faz chamadas ao modelo.
+        """
+        if self.tokenizer(text) <= max_tokens:
+            return text
+
+        sentences = [s.strip() for s in _SENTENCE_PATTERN.split(text) if s.strip()]
+        frequencies = Counter(word.lower() for word in re.findall(r"\w{4,}", text))
+
+        def score(sentence: str) -> float:
+            words = re.findall(r"\w{4,}", sentence.lower())
+            return sum(frequencies[word] for word in words) / (len(words) or 1)
+
+        ranked = sorted(range(len(sentences)), key=lambda i: score(sentences[i]), reverse=True)
+        chosen, used = set(), 0
+        for index in ranked:
+            tokens = self.tokenizer(sentences[index])
+            if used + tokens <= max_tokens:
+                chosen.add(index)
+                used += tokens
+
+        if not chosen:
+            return self.truncate(text, max_tokens)
+        return " ".join(sentences[i] for i in sorted(chosen))
+
+    def pack_sections(self, task: str, sections: list[tuple[str, str]]) -> str:
+        """
+        Monta a entrada de uma etapa com a tarefa e as saídas anteriores.
+
+        Se tudo couber no orçamento, o texto é mantido integralmente. Caso
+        contrário a tarefa ocupa até metade do orçamento, a saída mais
+        recente fica com metade do restante e as anteriores são resumidas
+        dividindo o que sobrar.
+
+        Args:
+            task: Tarefa original
+            sections: Pares (nome da etapa, saída), da mais antiga à mais recente
+
+        Returns:
+            Texto de entrada dentro do orçamento
+        """
+        full = self._render(task, sections)
+        if self.tokenizer(full) <= self.max_tokens or not sections:
+            return self.truncate(full, self.max_tokens)
+
+        headers = self.tokenizer(self._render("", [(name, "") for name, _ in sections]))
+        task = self.truncate(task, self.max_tokens // 2)
+        remaining = max(0, self.max_tokens - headers - self.tokenizer(task))
+
+        *earlier, (latest_name, latest) = sections
+        latest = self.truncate(latest, remaining // 2 if earlier else remaining)
+        remaining -= self.tokenizer(latest)
+
+        share = remaining // len(earlier) if earlier else 0
+        compressed = [(name, self.summarize(text, share)) for name, text in earlier]
+        return self._render(task, [*compressed, (latest_name, latest)])
+
+    @staticmethod
+    def _render(task: str, sections: list[tuple[str, str]]) -> str:
+        parts = [f"Tarefa original:\n{task}"]
+        parts.extend(f"Resultado de {name}:\n{text}" for name, text in sections)
+        return "\n\n".join(parts)
+
+    def _shingles(self, text: str) -> set[tuple[str, ...]]:
+        words = text.lower().split()
+        size = min(self.shingle_size, len(words)) or 1
+        return {tuple(words[i : i + size]) for i in range(max(1, len(words) - size + 1))}
+
+    @staticmethod
+    def _overlap(first: set, second: set) -> float:
+        """Fração do menor conjunto contida no outro (detecta janelas sobrepostas)."""
+        if not first or not second:
+            return 0.0
+        return len(first & second) / min(len(first), len(second))
@@ -30,7 +30,23 @@ GENERATION_CONFIG = {
 }
 
 # Configurações de chamada
-CALL_CONFIG = {"timeout": 30, "retry_count": 3, "backoff_factor": 1.5, "stream": False}
+CALL_CONFIG = {
+    "timeout": 30,
+    "retry_count": 3,
+    "backoff_factor": 1.5,
+    "stream": False,
+    "max_workers": 16,  # Threads para chamadas síncronas do SDK
+}
+
+# Cotas e backoff das chamadas (ver rate_limiter.LlmScheduler)
+RATE_LIMIT_CONFIG = {
+    "providers": {
+        "gemini": {"requests_per_minute": 60, "tokens_per_minute": 120000},
+    },
+    "backoff_base": 1.0,  # Primeiro intervalo após um 429 sem Retry-After
+    "max_backoff": 60.0,
+    "max_retries": 3,
+}
 
 # Configurações de prompt
 PROMPT_CONFIG = {
@@ -2,6 +2,16 @@
 Provedores de LLM.
 """
 
+from .base import BaseProvider
 from .gemini import GeminiProvider
+from .mock import MockProvider
+from .ollama_local import OllamaLocalProvider
+from .router import ProviderRouter
 
-__all__ = ["GeminiProvider"]
+__all__ = [
+    "BaseProvider",
+    "GeminiProvider",
+    "MockProvider",
+    "OllamaLocalProvider",
+    "ProviderRouter",
+]
@@ -2,7 +2,9 @@
 Classe base para providers de LLMs.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Any, Dict, List
 
 
@@ -36,3 +38,21 @@ class BaseProvider(ABC):
             Dict com a resposta do modelo
         """
         pass
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Gera texto de forma incremental.
+
+        Providers com suporte a streaming devem sobrescrever este método;
+        a implementação padrão executa ``generate`` fora do event loop e
+        produz a resposta completa como um único delta.
+
+        Args:
+            prompt: O prompt para geração
+            **kwargs: Argumentos adicionais para a API
+
+        Yields:
+            Trechos de texto gerados
+        """
+        response = await asyncio.to_thread(self.generate, prompt, **kwargs)
+        yield response.get("content", "")
@@ -2,20 +2,34 @@
 Provider específico para o modelo Gemini.
 """
 
+from collections.abc import AsyncIterator
 from typing import Any, Dict, Optional
 
 import google.generativeai as genai
 
+from .. import async_calls
 from ..gemini_config import GENERATION_CONFIG, get_model_config
+from ..rate_limiter import LlmScheduler, Priority, estimate_tokens, get_llm_scheduler
+from ..response_cache import ResponseCache
+from .base import BaseProvider
 
 
-class GeminiProvider:
+class GeminiProvider(BaseProvider):
     """Provider para interação com o modelo Gemini."""
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache: ResponseCache | None = None,
+        scheduler: LlmScheduler | None = None,
+        priority: Priority = Priority.NORMAL,
+    ):
         """Inicializa o provider."""
         self.config = get_model_config()
         self.api_key = api_key
+        self.cache = cache
+        self.scheduler = scheduler or get_llm_scheduler()
+        self.priority = priority
         self._setup()
 
     def _setup(self) -> None:
@@ -34,11 +48,72 @@ class GeminiProvider:
             if context and "generation_config" in context:
                 generation_config.update(context["generation_config"])
 
-            # Gera resposta
-            response = self.model.generate_content(prompt, generation_config=generation_config)
+            return await self._generate_text(prompt, generation_config)
 
+        except Exception as e:
+            raise RuntimeError(f"Erro na geração: {str(e)}")
+
+    async def _generate_text(self, prompt: str, generation_config: dict[str, Any]) -> str:
+        """
+        Gera texto sem bloquear o event loop.
+
+        Consulta o cache, se houver; chamadas ao modelo passam pelo agendador
+        (cotas, prioridade e backoff em 429).
+        """
+
+        async def request() -> str:
+            response = await async_calls.generate_content(
+                self.model,
+                prompt,
+                timeout=self.config["call"]["timeout"],
+                generation_config=generation_config,
+            )
             return response.text
 
+        async def call() -> str:
+            text = await self.scheduler.run(
+                "gemini", request, estimate_tokens(prompt), self.priority, self.api_key
+            )
+            self.scheduler.record_usage("gemini", estimate_tokens(text), self.api_key)
+            return text
+
+        if self.cache is None:
+            return await call()
+        return await self.cache.get_or_call(
+            self.config["model"]["name"], prompt, generation_config, call
+        )
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Gera texto produzindo os trechos à medida que chegam (interface BaseProvider).
+
+        Como ``_generate_text``, consulta o cache e passa pelo agendador.
+        """
+        generation_config = {**GENERATION_CONFIG, **kwargs.get("generation_config", {})}
+
+        def request() -> AsyncIterator[str]:
+            return async_calls.stream_content(
+                self.model,
+                prompt,
+                timeout=self.config["call"]["timeout"],
+                generation_config=generation_config,
+            )
+
+        def call() -> AsyncIterator[str]:
+            return self.scheduler.stream(
+                "gemini", request, estimate_tokens(prompt), self.priority, self.api_key
+            )
+
+        try:
+            if self.cache is None:
+                async for delta in call():
+                    yield delta
+            else:
+                async for delta in self.cache.stream_or_call(
+                    self.config["model"]["name"], prompt, generation_config, call
+                ):
+                    yield delta
+
         except Exception as e:
             raise RuntimeError(f"Erro na geração: {str(e)}")
 
@@ -58,12 +133,10 @@ class GeminiProvider:
             """
 
             # Gera análise
-            response = self.model.generate_content(
-                analysis_prompt, generation_config=GENERATION_CONFIG
-            )
+            analysis = await self._generate_text(analysis_prompt, GENERATION_CONFIG)
 
             return {
-                "analysis": response.text,
+                "analysis": analysis,
                 "model": self.config["model"]["name"],
                 "status": "success",
             }
@@ -71,6 +144,25 @@ class GeminiProvider:
         except Exception as e:
             raise RuntimeError(f"Erro na análise: {str(e)}")
 
+    def generate(self, prompt: str, **kwargs: Any) -> dict[str, Any]:
+        """Gera texto de forma síncrona (interface BaseProvider)."""
+        generation_config = {**GENERATION_CONFIG, **kwargs.get("generation_config", {})}
+        response = self.model.generate_content(prompt, generation_config=generation_config)
+        return {"content": response.text, "model": self.config["model"]["name"]}
+
+    def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> dict[str, Any]:
+        """Processa uma conversa de forma síncrona (interface BaseProvider)."""
+        history = [
+            {
+                "role": "model" if message["role"] == "assistant" else "user",
+                "parts": [message["content"]],
+            }
+            for message in messages
+        ]
+        generation_config = {**GENERATION_CONFIG, **kwargs.get("generation_config", {})}
+        response = self.model.generate_content(history, generation_config=generation_config)
+        return {"content": response.text, "model": self.config["model"]["name"]}
+
     def get_config(self) -> dict[str, Any]:
         """Retorna a configuração atual do provider."""
         return self.config
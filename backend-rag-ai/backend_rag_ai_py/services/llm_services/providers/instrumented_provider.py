@@ -1,43 +1,130 @@
 """
 Provider instrumentado para rastreamento de uso.
-"""
 
-from typing import Any, Dict, List, TypedDict
+Cada chamada gera um span leve (provider, modelo, tokens, latência, cache
+e erro) mantido num buffer limitado e enviado em lotes aos exportadores.
+O conteúdo dos prompts só é guardado quando ``capture_prompts`` está ativo.
+"""
 
+import json
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ..context_packer import count_tokens
 from .base import BaseProvider
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """Registro de uma chamada ao provider."""
+
+    name: str
+    provider: str
+    model: str | None
+    start_time: float
+    latency: float
+    prompt_tokens: int
+    completion_tokens: int = 0
+    cache_hit: bool = False
+    error: str | None = None
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converte o span para dicionário."""
+        return asdict(self)
+
+
+class SpanExporter(ABC):
+    """Destino dos spans; subclasses implementam ``export``."""
+
+    @abstractmethod
+    def export(self, spans: list[Span]) -> None:
+        """
+        Envia um lote de spans.
+
+        Args:
+            spans: Spans a exportar, na ordem em que foram registrados
+        """
+        pass
+
+    def shutdown(self) -> None:
+        """Libera recursos do exportador."""
 
-class ChatCall(TypedDict):
-    """Registro de chamada do método chat."""
 
-    type: str
-    messages: list[dict[str, Any]]
-    kwargs: dict[str, Any]
+class InMemorySpanExporter(SpanExporter):
+    """Exportador em memória, com a interface do exportador de testes do OpenTelemetry."""
 
+    def __init__(self, max_spans: int = 10000):
+        """Inicializa o exportador com um limite de spans retidos."""
+        self._spans: deque[Span] = deque(maxlen=max_spans)
 
-class GenerateCall(TypedDict):
-    """Registro de chamada do método generate."""
+    def export(self, spans: list[Span]) -> None:
+        """Armazena o lote de spans."""
+        self._spans.extend(spans)
 
-    type: str
-    prompt: str
-    kwargs: dict[str, Any]
+    def get_finished_spans(self) -> list[Span]:
+        """Retorna os spans exportados."""
+        return list(self._spans)
 
+    def clear(self) -> None:
+        """Descarta os spans exportados."""
+        self._spans.clear()
 
-Call = ChatCall | GenerateCall
+
+class JsonLinesExporter(SpanExporter):
+    """Exportador que grava um span por linha num arquivo JSON Lines."""
+
+    def __init__(self, path: str | Path):
+        """Inicializa o exportador, criando o diretório do arquivo."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        """Acrescenta o lote ao arquivo."""
+        lines = "".join(json.dumps(span.to_dict(), ensure_ascii=False) + "\n" for span in spans)
+        with self._lock, self.path.open("a", encoding="utf-8") as file:
+            file.write(lines)
 
 
 class InstrumentedProvider(BaseProvider):
     """Provider instrumentado para rastreamento de uso."""
 
-    def __init__(self, provider: BaseProvider):
+    def __init__(
+        self,
+        provider: BaseProvider,
+        exporters: list[SpanExporter] | None = None,
+        max_spans: int = 1000,
+        export_batch_size: int = 50,
+        capture_prompts: bool = False,
+    ):
         """
         Inicializa o provider instrumentado.
 
         Args:
             provider: O provider base a ser instrumentado
+            exporters: Destinos dos spans
+            max_spans: Tamanho do buffer de spans recentes
+            export_batch_size: Spans acumulados antes de exportar
+            capture_prompts: Guarda prompts e respostas nos atributos do span
         """
         self.provider = provider
-        self.calls: list[Call] = []
+        self.exporters = exporters or []
+        self.export_batch_size = export_batch_size
+        self.capture_prompts = capture_prompts
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self._pending: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
 
     def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> dict[str, Any]:
         """
@@ -50,8 +137,10 @@ class InstrumentedProvider(BaseProvider):
         Returns:
             Dict com a resposta do modelo
         """
-        self.calls.append({"type": "chat", "messages": messages, "kwargs": kwargs})
-        return self.provider.chat(messages, **kwargs)
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        return self._traced(
+            "chat", prompt, messages, lambda: self.provider.chat(messages, **kwargs)
+        )
 
     def generate(self, prompt: str, **kwargs: Any) -> dict[str, Any]:
         """
@@ -64,9 +153,76 @@ class InstrumentedProvider(BaseProvider):
         Returns:
             Dict com a resposta do modelo
         """
-        self.calls.append({"type": "generate", "prompt": prompt, "kwargs": kwargs})
-        return self.provider.generate(prompt, **kwargs)
-
-    def get_calls(self) -> list[Call]:
-        """Retorna a lista de chamadas registradas."""
-        return self.calls
+        return self._traced(
+            "generate", prompt, prompt, lambda: self.provider.generate(prompt, **kwargs)
+        )
+
+    def _traced(self, name: str, prompt: str, payload: Any, call) -> dict[str, Any]:
+        """Executa a chamada registrando um span."""
+        start_time = time.time()
+        start = time.perf_counter()
+        result: dict[str, Any] = {}
+        error = None
+        try:
+            result = call()
+            return result
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            usage = result.get("usage") or {}
+            content = str(result.get("content", ""))
+            model = result.get("model") or getattr(self.provider, "model", None)
+            span = Span(
+                name=name,
+                provider=type(self.provider).__name__,
+                model=model if isinstance(model, str) else None,
+                start_time=start_time,
+                latency=time.perf_counter() - start,
+                prompt_tokens=usage.get("prompt_tokens") or count_tokens(prompt),
+                completion_tokens=usage.get("completion_tokens") or count_tokens(content),
+                cache_hit=bool(result.get("cache_hit", False)),
+                error=error,
+            )
+            if self.capture_prompts:
+                span.attributes = {"prompt": payload, "completion": content}
+            self._record(span)
+
+    def _record(self, span: Span) -> None:
+        """Guarda o span e exporta quando o lote estiver completo."""
+        with self._lock:
+            self.spans.append(span)
+            if not self.exporters:
+                return
+            self._pending.append(span)
+            if len(self._pending) < self.export_batch_size:
+                return
+            batch = list(self._pending)
+            self._pending.clear()
+        self._export(batch)
+
+    def _export(self, batch: list[Span]) -> None:
+        """Envia o lote a todos os exportadores sem propagar falhas."""
+        for exporter in self.exporters:
+            try:
+                exporter.export(batch)
+            except Exception as e:
+                logger.error(f"Erro ao exportar spans via {type(exporter).__name__}: {e}")
+
+    def flush(self) -> None:
+        """Exporta os spans pendentes."""
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        if batch:
+            self._export(batch)
+
+    def shutdown(self) -> None:
+        """Exporta os pendentes e encerra os exportadores."""
+        self.flush()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    def get_calls(self) -> list[dict[str, Any]]:
+        """Retorna os spans recentes registrados."""
+        return [span.to_dict() for span in self.spans]
@@ -0,0 +1,73 @@
+"""
+Provider simulado para testes e desenvolvimento offline.
+"""
+
+import random
+import time
+from typing import Any
+
+from .base import BaseProvider
+
+
+class MockProviderError(RuntimeError):
+    """Falha simulada pelo MockProvider."""
+
+
+class MockProvider(BaseProvider):
+    """Provider que responde localmente com latência e falhas configuráveis."""
+
+    def __init__(
+        self,
+        name: str = "mock",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        response: str | None = None,
+        seed: int | None = None,
+    ):
+        """
+        Inicializa o provider simulado.
+
+        Args:
+            name: Nome do provider (usado como modelo na resposta)
+            latency: Latência base em segundos
+            jitter: Variação máxima adicionada à latência
+            failure_rate: Probabilidade (0-1) de falha por chamada
+            response: Resposta fixa; por padrão ecoa o prompt
+            seed: Semente para reprodutibilidade
+        """
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.response = response
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _respond(self, prompt: str) -> dict[str, Any]:
+        """Simula latência e falhas e monta a resposta."""
+        self.calls += 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self._random.random() < self.failure_rate:
+            raise MockProviderError(f"Falha simulada em {self.name}")
+
+        content = self.response if self.response is not None else f"[{self.name}] {prompt}"
+        return {
+            "content": content,
+            "model": self.name,
+            "usage": {
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(content.split()),
+            },
+        }
+
+    def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> dict[str, Any]:
+        """Responde à última mensagem da conversa."""
+        prompt = messages[-1]["content"] if messages else ""
+        return self._respond(prompt)
+
+    def generate(self, prompt: str, **kwargs: Any) -> dict[str, Any]:
+        """Responde ao prompt."""
+        return self._respond(prompt)
@@ -0,0 +1,69 @@
+"""
+Provider para modelos locais servidos pelo Ollama (API HTTP).
+"""
+
+import json
+import os
+import urllib.request
+from typing import Any
+
+from .base import BaseProvider
+
+
+class OllamaLocalProvider(BaseProvider):
+    """Provider que chama um servidor Ollama local via HTTP."""
+
+    def __init__(
+        self,
+        model: str = "llama3.2",
+        base_url: str | None = None,
+        timeout: float = 30.0,
+    ):
+        """
+        Inicializa o provider.
+
+        Args:
+            model: Nome do modelo no Ollama
+            base_url: Endereço do servidor (padrão: OLLAMA_HOST ou localhost:11434)
+            timeout: Timeout das requisições em segundos
+        """
+        self.model = model
+        base_url = base_url or os.getenv("OLLAMA_HOST", "http://localhost:11434")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Envia uma requisição sem streaming e decodifica a resposta."""
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=json.dumps({**payload, "stream": False}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    @staticmethod
+    def _usage(data: dict[str, Any]) -> dict[str, int]:
+        """Converte os contadores do Ollama para o formato de uso."""
+        return {
+            "prompt_tokens": data.get("prompt_eval_count", 0),
+            "completion_tokens": data.get("eval_count", 0),
+        }
+
+    def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> dict[str, Any]:
+        """Processa uma conversa no modelo local."""
+        data = self._post("/api/chat", {"model": self.model, "messages": messages, **kwargs})
+        return {
+            "content": data.get("message", {}).get("content", ""),
+            "model": f"ollama/{data.get('model', self.model)}",
+            "usage": self._usage(data),
+        }
+
+    def generate(self, prompt: str, **kwargs: Any) -> dict[str, Any]:
+        """Gera texto no modelo local."""
+        data = self._post("/api/generate", {"model": self.model, "prompt": prompt, **kwargs})
+        return {
+            "content": data.get("response", ""),
+            "model": f"ollama/{data.get('model', self.model)}",
+            "usage": self._usage(data),
+        }
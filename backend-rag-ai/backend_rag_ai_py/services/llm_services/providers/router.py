@@ -0,0 +1,368 @@
+"""
+Roteador de providers com failover, hedging e circuit breaker.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import Enum
+from typing import Any
+
+from ..gemini_config import CALL_CONFIG
+from .base import BaseProvider
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Estados do circuit breaker de um provider."""
+
+    CLOSED = "closed"  # Recebe requisições normalmente
+    OPEN = "open"  # Bloqueado após falhas consecutivas
+    HALF_OPEN = "half_open"  # Liberado para uma requisição de teste
+
+
+class ProviderHealth:
+    """Latência e erros recentes de um provider, com circuit breaker."""
+
+    def __init__(self, window_size: int, failure_threshold: int, cooldown: float):
+        """
+        Inicializa o acompanhamento.
+
+        Args:
+            window_size: Número de chamadas consideradas nas estatísticas
+            failure_threshold: Falhas consecutivas que abrem o circuito
+            cooldown: Segundos até liberar uma requisição de teste
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latencies: deque[float] = deque(maxlen=window_size)
+        self.outcomes: deque[bool] = deque(maxlen=window_size)
+        self.consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.calls = 0
+
+    def record(self, latency: float, success: bool) -> None:
+        """Registra o resultado de uma chamada."""
+        self.calls += 1
+        self.outcomes.append(success)
+        self.probing = False
+        if success:
+            self.latencies.append(latency)
+            self.consecutive_failures = 0
+            self.state = CircuitState.CLOSED
+            return
+
+        self.consecutive_failures += 1
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def is_available(self) -> bool:
+        """Indica, sem alterar o estado, se o provider aceitaria uma requisição agora."""
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self.opened_at >= self.cooldown
+        if self.state == CircuitState.HALF_OPEN:
+            return not self.probing
+        return True
+
+    def try_acquire(self) -> bool:
+        """
+        Reserva o provider para uma chamada.
+
+        Com o circuito aberto e o cooldown vencido, passa a HALF_OPEN e libera
+        uma única requisição de teste; as demais são recusadas até ela terminar.
+        """
+        if not self.is_available():
+            return False
+        if self.state != CircuitState.CLOSED:
+            self.state = CircuitState.HALF_OPEN
+            self.probing = True
+        return True
+
+    def percentile(self, fraction: float) -> float | None:
+        """Retorna o percentil de latência das chamadas bem-sucedidas."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    @property
+    def error_rate(self) -> float:
+        """Fração de chamadas com erro na janela."""
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converte o estado para dicionário."""
+        return {
+            "state": self.state.value,
+            "calls": self.calls,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "error_rate": self.error_rate,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class ProviderRouter(BaseProvider):
+    """
+    Provider que distribui chamadas entre vários backends.
+
+    Cada requisição vai para o backend saudável com menor latência p50.
+    Se a resposta demorar mais que o limiar de hedging, um segundo backend
+    é acionado em paralelo e vence a primeira resposta bem-sucedida. Falhas
+    disparam failover para o próximo backend e, quando consecutivas, abrem
+    o circuit breaker do provider.
+    """
+
+    def __init__(
+        self,
+        providers: dict[str, BaseProvider],
+        hedge_after: float | None = None,
+        default_hedge_after: float = 2.0,
+        max_parallel: int = 2,
+        window_size: int = 100,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        cooldown: float = 30.0,
+        max_workers: int = 16,
+    ):
+        """
+        Inicializa o roteador.
+
+        Args:
+            providers: Backends por nome
+            hedge_after: Limiar fixo de hedging em segundos; por padrão usa o
+                p95 do backend escolhido
+            default_hedge_after: Limiar usado enquanto não há histórico
+            max_parallel: Máximo de backends simultâneos por requisição
+            window_size: Janela de chamadas para p50/p95 e taxa de erro
+            failure_threshold: Falhas consecutivas que abrem o circuito
+            error_rate_threshold: Taxa de erro que rebaixa o backend no ranking
+            cooldown: Segundos com o circuito aberto
+            max_workers: Threads para chamadas aos backends
+        """
+        if not providers:
+            raise ValueError("Informe ao menos um provider")
+
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self.default_hedge_after = default_hedge_after
+        self.max_parallel = max(1, max_parallel)
+        self.error_rate_threshold = error_rate_threshold
+        self.health = {
+            name: ProviderHealth(window_size, failure_threshold, cooldown) for name in providers
+        }
+        self.stats = {"requests": 0, "hedged": 0, "failovers": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="router")
+
+    def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> dict[str, Any]:
+        """Processa uma conversa no backend mais rápido disponível."""
+        return self._route("chat", messages, kwargs)
+
+    def generate(self, prompt: str, **kwargs: Any) -> dict[str, Any]:
+        """Gera texto no backend mais rápido disponível."""
+        return self._route("generate", prompt, kwargs)
+
+    async def achat(self, messages: list[dict[str, Any]], **kwargs: Any) -> dict[str, Any]:
+        """Versão assíncrona de ``chat`` (não bloqueia o event loop)."""
+        return await asyncio.wait_for(
+            self._aroute("chat", messages, kwargs), CALL_CONFIG["timeout"]
+        )
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> dict[str, Any]:
+        """Versão assíncrona de ``generate`` (não bloqueia o event loop)."""
+        return await asyncio.wait_for(
+            self._aroute("generate", prompt, kwargs), CALL_CONFIG["timeout"]
+        )
+
+    def ranked_providers(self) -> list[str]:
+        """Retorna os backends disponíveis, do mais rápido ao mais lento."""
+        with self._lock:
+            available = [name for name, health in self.health.items() if health.is_available()]
+
+            def sort_key(name: str) -> tuple[bool, float]:
+                health = self.health[name]
+                p50 = health.percentile(0.5)
+                # Backends sem histórico entram primeiro para serem medidos
+                degraded = health.error_rate > self.error_rate_threshold
+                return (degraded, p50 if p50 is not None else 0.0)
+
+            return sorted(available, key=sort_key)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Retorna métricas do roteador e de cada backend."""
+        with self._lock:
+            return {
+                **self.stats,
+                "providers": {name: health.to_dict() for name, health in self.health.items()},
+            }
+
+    def close(self) -> None:
+        """Libera as threads do roteador."""
+        self._executor.shutdown(wait=False)
+
+    def _hedge_delay(self, name: str) -> float:
+        """Tempo de espera antes de acionar um backend adicional."""
+        if self.hedge_after is not None:
+            return self.hedge_after
+        with self._lock:
+            p95 = self.health[name].percentile(0.95)
+        return p95 if p95 is not None else self.default_hedge_after
+
+    def _call(self, name: str, method: str, payload: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Executa a chamada num backend registrando latência e erros."""
+        start = time.perf_counter()
+        try:
+            result = getattr(self.providers[name], method)(payload, **kwargs)
+        except Exception:
+            with self._lock:
+                self.health[name].record(time.perf_counter() - start, success=False)
+            raise
+        with self._lock:
+            self.health[name].record(time.perf_counter() - start, success=True)
+        return result
+
+    def _begin(self) -> list[str]:
+        """Contabiliza a requisição e retorna os backends candidatos."""
+        with self._lock:
+            self.stats["requests"] += 1
+        return self.ranked_providers()
+
+    def _acquire_next(self, candidates: list[str]) -> str | None:
+        """Retira dos candidatos o próximo backend que aceita a chamada agora."""
+        with self._lock:
+            while candidates:
+                name = candidates.pop(0)
+                if self.health[name].try_acquire():
+                    return name
+        return None
+
+    def _fail(self, errors: dict[str, str]) -> RuntimeError:
+        """Contabiliza a falha da requisição e monta o erro."""
+        with self._lock:
+            self.stats["failures"] += 1
+        if not errors:
+            return RuntimeError("Nenhum provider disponível (circuitos abertos)")
+        return RuntimeError(f"Todos os providers falharam: {errors}")
+
+    def _on_failure(self, name: str, error: Exception, errors: dict[str, str]) -> None:
+        """Registra a falha de um backend numa requisição."""
+        errors[name] = str(error)
+        logger.warning(f"Provider {name} falhou: {error}")
+
+    def _route(self, method: str, payload: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Escolhe, aciona e, se necessário, substitui backends para uma chamada."""
+        candidates = self._begin()
+        running: dict[Future, str] = {}
+        errors: dict[str, str] = {}
+
+        def launch() -> str | None:
+            name = self._acquire_next(candidates)
+            if name is not None:
+                running[self._executor.submit(self._call, name, method, payload, kwargs)] = name
+            return name
+
+        primary = launch()
+        while running:
+            can_hedge = candidates and len(running) < self.max_parallel
+            done, _ = wait(
+                running,
+                timeout=self._hedge_delay(primary) if can_hedge else None,
+                return_when=FIRST_COMPLETED,
+            )
+
+            if not done:
+                hedge = launch()
+                if hedge is not None:
+                    with self._lock:
+                        self.stats["hedged"] += 1
+                    logger.debug(f"Hedging: {primary} lento, acionando {hedge}")
+                continue
+
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._on_failure(name, e, errors)
+                    if candidates and len(running) < self.max_parallel:
+                        replacement = launch()
+                        if replacement is not None:
+                            with self._lock:
+                                self.stats["failovers"] += 1
+                            if not running or name == primary:
+                                primary = replacement
+                    continue
+
+                # As chamadas restantes terminam em segundo plano e alimentam as métricas
+                if isinstance(result, dict):
+                    result = {**result, "provider": name}
+                return result
+
+        raise self._fail(errors)
+
+    async def _aroute(self, method: str, payload: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Versão assíncrona de ``_route``: mesmas decisões, esperando no event loop."""
+        loop = asyncio.get_running_loop()
+        candidates = self._begin()
+        running: dict[asyncio.Future, str] = {}
+        errors: dict[str, str] = {}
+
+        def launch() -> str | None:
+            name = self._acquire_next(candidates)
+            if name is not None:
+                future = loop.run_in_executor(
+                    self._executor, self._call, name, method, payload, kwargs
+                )
+                running[future] = name
+            return name
+
+        primary = launch()
+        while running:
+            can_hedge = candidates and len(running) < self.max_parallel
+            done, _ = await asyncio.wait(
+                running,
+                timeout=self._hedge_delay(primary) if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if not done:
+                hedge = launch()
+                if hedge is not None:
+                    with self._lock:
+                        self.stats["hedged"] += 1
+                    logger.debug(f"Hedging: {primary} lento, acionando {hedge}")
+                continue
+
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._on_failure(name, e, errors)
+                    if candidates and len(running) < self.max_parallel:
+                        replacement = launch()
+                        if replacement is not None:
+                            with self._lock:
+                                self.stats["failovers"] += 1
+                            if not running or name == primary:
+                                primary = replacement
+                    continue
+
+                if isinstance(result, dict):
+                    result = {**result, "provider": name}
+                return result
+
+        raise self._fail(errors)
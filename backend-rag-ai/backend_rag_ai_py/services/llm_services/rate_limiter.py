@@ -0,0 +1,391 @@
+"""
+Limitação de taxa e agendamento das chamadas aos providers de LLM.
+
+Cada par (provider, chave de API) tem uma fila de prioridade e dois
+token buckets: requisições por minuto e tokens por minuto. Respostas 429
+bloqueiam a fila pelo ``Retry-After`` informado ou, na falta dele, por um
+backoff exponencial com jitter.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any
+
+from .gemini_config import RATE_LIMIT_CONFIG
+
+
+class Priority(IntEnum):
+    """Prioridade de uma chamada (menor valor é atendido primeiro)."""
+
+    INTERACTIVE = 0  # Requisições da API aguardando resposta
+    NORMAL = 1
+    BACKGROUND = 2  # Ciclos de embates e tarefas em lote
+
+
+@dataclass
+class RateLimit:
+    """Cotas de um provider (None desativa o limite)."""
+
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+
+
+class TokenBucket:
+    """Token bucket com reposição contínua."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Segundos até haver saldo para ``amount`` (limitado à capacidade)."""
+        self._refill()
+        deficit = min(amount, self.capacity) - self.tokens
+        return max(0.0, deficit / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Debita ``amount``; o saldo pode ficar negativo (dívida)."""
+        self._refill()
+        self.tokens -= amount
+
+
+@dataclass
+class _Lane:
+    """Fila e estado de limitação de um par (provider, chave)."""
+
+    requests: TokenBucket | None
+    tokens: TokenBucket | None
+    waiters: list = field(default_factory=list)
+    wakeup: asyncio.Event | None = None
+    pump: asyncio.Task | None = None
+    blocked_until: float = 0.0
+    consecutive_limits: int = 0
+    granted: int = 0
+    rate_limited: int = 0
+    max_queue_depth: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def wait_time(self, amount: float) -> float:
+        return max(
+            self.blocked_until - time.monotonic(),
+            self.requests.wait_time(1) if self.requests else 0.0,
+            self.tokens.wait_time(amount) if self.tokens else 0.0,
+        )
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa rápida de tokens (~4 caracteres por token)."""
+    return len(text) // 4 + 1
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Indica se a exceção corresponde a um HTTP 429 / cota excedida."""
+    for attr in ("code", "status_code", "status"):
+        value = getattr(error, attr, None)
+        try:
+            if value is not None and int(value) == 429:
+                return True
+        except (TypeError, ValueError):
+            continue
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    return type(error).__name__ in ("ResourceExhausted", "RateLimitError", "TooManyRequests")
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """Extrai o ``Retry-After`` (segundos ou data HTTP) de uma exceção, se houver."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LlmScheduler:
+    """Agendador compartilhado das chamadas de LLM."""
+
+    def __init__(
+        self,
+        limits: dict[str, RateLimit] | None = None,
+        default_limit: RateLimit | None = None,
+        backoff_base: float = 1.0,
+        max_backoff: float = 60.0,
+        max_retries: int = 3,
+    ):
+        """
+        Inicializa o agendador.
+
+        Args:
+            limits: Cotas por provider
+            default_limit: Cota dos providers não listados
+            backoff_base: Primeiro intervalo do backoff exponencial (segundos)
+            max_backoff: Intervalo máximo de backoff
+            max_retries: Novas tentativas após um 429 em ``run``
+        """
+        self.limits = limits or {}
+        self.default_limit = default_limit or RateLimit()
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self._lanes: dict[tuple[str, str], _Lane] = {}
+        self._sequence = itertools.count()
+
+    @staticmethod
+    def _key_id(key: str | None) -> str:
+        """Identifica a chave de API sem expô-la nas métricas."""
+        return hashlib.sha256(key.encode()).hexdigest()[:8] if key else "default"
+
+    def _lane(self, provider: str, key: str | None) -> _Lane:
+        lane_id = (provider, self._key_id(key))
+        lane = self._lanes.get(lane_id)
+        if lane is None:
+            limit = self.limits.get(provider, self.default_limit)
+            lane = _Lane(
+                requests=TokenBucket(limit.requests_per_minute)
+                if limit.requests_per_minute
+                else None,
+                tokens=TokenBucket(limit.tokens_per_minute) if limit.tokens_per_minute else None,
+            )
+            self._lanes[lane_id] = lane
+        return lane
+
+    async def acquire(
+        self,
+        provider: str,
+        tokens: int = 1,
+        priority: Priority = Priority.NORMAL,
+        key: str | None = None,
+    ) -> float:
+        """
+        Aguarda a vez e a cota para uma chamada.
+
+        Args:
+            provider: Nome do provider
+            tokens: Tokens estimados da requisição
+            priority: Prioridade da chamada
+            key: Chave de API (cotas são separadas por chave)
+
+        Returns:
+            Tempo de espera em segundos
+        """
+        lane = self._lane(provider, key)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, (int(priority), next(self._sequence), tokens, future))
+        lane.max_queue_depth = max(lane.max_queue_depth, len(lane.waiters))
+
+        if lane.pump is None or lane.pump.done():
+            lane.pump = asyncio.create_task(self._pump(lane))
+        elif lane.wakeup is not None:
+            lane.wakeup.set()
+
+        start = time.monotonic()
+        await future
+        waited = time.monotonic() - start
+        lane.wait_total += waited
+        lane.wait_max = max(lane.wait_max, waited)
+        return waited
+
+    async def _pump(self, lane: _Lane) -> None:
+        """Libera os pedidos da fila em ordem de prioridade, respeitando as cotas."""
+        try:
+            while lane.waiters:
+                _, _, tokens, future = lane.waiters[0]
+                if future.done():  # Cancelado pelo chamador
+                    heapq.heappop(lane.waiters)
+                    continue
+
+                wait = lane.wait_time(tokens)
+                if wait <= 0:
+                    heapq.heappop(lane.waiters)
+                    if lane.requests:
+                        lane.requests.consume(1)
+                    if lane.tokens:
+                        lane.tokens.consume(tokens)
+                    lane.granted += 1
+                    future.set_result(None)
+                    continue
+
+                # Acorda antes se chegar um pedido de maior prioridade
+                lane.wakeup = asyncio.Event()
+                try:
+                    await asyncio.wait_for(lane.wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            lane.wakeup = None
+
+    def record_usage(self, provider: str, tokens: int, key: str | None = None) -> None:
+        """Debita tokens consumidos além da estimativa (ex.: a resposta gerada)."""
+        lane = self._lane(provider, key)
+        if lane.tokens and tokens > 0:
+            lane.tokens.consume(tokens)
+
+    def report_rate_limited(
+        self, provider: str, key: str | None = None, retry_after: float | None = None
+    ) -> float:
+        """
+        Registra um 429 e bloqueia a fila do provider.
+
+        Returns:
+            Segundos de bloqueio aplicados
+        """
+        lane = self._lane(provider, key)
+        lane.rate_limited += 1
+        lane.consecutive_limits += 1
+        delay = retry_after if retry_after is not None else self.backoff_delay(
+            lane.consecutive_limits - 1
+        )
+        lane.blocked_until = max(lane.blocked_until, time.monotonic() + delay)
+        return delay
+
+    def report_success(self, provider: str, key: str | None = None) -> None:
+        """Zera o backoff após uma chamada bem-sucedida."""
+        self._lane(provider, key).consecutive_limits = 0
+
+    def backoff_delay(self, attempt: int, base: float | None = None) -> float:
+        """Backoff exponencial com jitter sobre a metade superior do intervalo."""
+        delay = min(self.max_backoff, (base or self.backoff_base) * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def run(
+        self,
+        provider: str,
+        call: Callable[[], Awaitable[Any]],
+        tokens: int = 1,
+        priority: Priority = Priority.NORMAL,
+        key: str | None = None,
+    ) -> Any:
+        """
+        Executa ``call`` dentro das cotas, repetindo após respostas 429.
+
+        Args:
+            provider: Nome do provider
+            call: Coroutine factory que faz a chamada
+            tokens: Tokens estimados da requisição
+            priority: Prioridade da chamada
+            key: Chave de API
+
+        Returns:
+            Retorno de ``call``
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(provider, tokens, priority, key)
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                self.report_rate_limited(provider, key, retry_after_seconds(e))
+                continue
+            self.report_success(provider, key)
+            return result
+
+    async def stream(
+        self,
+        provider: str,
+        open_stream: Callable[[], AsyncIterator[str]],
+        tokens: int = 1,
+        priority: Priority = Priority.NORMAL,
+        key: str | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Transmite uma resposta dentro das cotas, como ``run``.
+
+        A abertura do stream e a espera pelo primeiro trecho passam por
+        ``run``, então um 429 nessa fase respeita o ``Retry-After`` e é
+        repetido; depois do primeiro trecho a transmissão não é refeita. Os
+        tokens gerados são debitados ao final.
+
+        Args:
+            provider: Nome do provider
+            open_stream: Função que abre o stream de trechos
+            tokens: Tokens estimados da requisição
+            priority: Prioridade da chamada
+            key: Chave de API
+
+        Yields:
+            Trechos na ordem em que são gerados
+        """
+
+        async def start() -> tuple[str | None, AsyncIterator[str]]:
+            chunks = open_stream().__aiter__()
+            try:
+                return await chunks.__anext__(), chunks
+            except StopAsyncIteration:
+                return None, chunks
+            except BaseException:
+                aclose = getattr(chunks, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                raise
+
+        first, chunks = await self.run(provider, start, tokens, priority, key)
+        if first is None:
+            return
+        generated = [first]
+        yield first
+        async for delta in chunks:
+            generated.append(delta)
+            yield delta
+        self.record_usage(provider, estimate_tokens("".join(generated)), key)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Retorna profundidade de fila, espera e 429s por provider/chave."""
+        now = time.monotonic()
+        return {
+            f"{provider}:{key_id}": {
+                "queue_depth": len(lane.waiters),
+                "max_queue_depth": lane.max_queue_depth,
+                "granted": lane.granted,
+                "rate_limited": lane.rate_limited,
+                "wait_avg": lane.wait_total / lane.granted if lane.granted else 0.0,
+                "wait_max": lane.wait_max,
+                "blocked_for": max(0.0, lane.blocked_until - now),
+            }
+            for (provider, key_id), lane in self._lanes.items()
+        }
+
+
+_scheduler: LlmScheduler | None = None
+
+
+def get_llm_scheduler() -> LlmScheduler:
+    """Retorna o agendador compartilhado, configurado por RATE_LIMIT_CONFIG."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LlmScheduler(
+            limits={
+                provider: RateLimit(**limit)
+                for provider, limit in RATE_LIMIT_CONFIG["providers"].items()
+            },
+            backoff_base=RATE_LIMIT_CONFIG["backoff_base"],
+            max_backoff=RATE_LIMIT_CONFIG["max_backoff"],
+            max_retries=RATE_LIMIT_CONFIG["max_retries"],
+        )
+    return _scheduler
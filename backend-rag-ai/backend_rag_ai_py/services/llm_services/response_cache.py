@@ -0,0 +1,267 @@
+"""
+Cache de respostas de LLM na frente dos providers.
+
+Possui duas camadas: correspondência exata por (modelo, prompt
+normalizado, hash da configuração de geração) e, opcionalmente, uma
+camada semântica que reaproveita a resposta de um prompt cujo embedding
+esteja acima de um limiar de similaridade.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+Embedder = Callable[[str], Sequence[float]]
+
+
+@dataclass
+class CachedResponse:
+    """Entrada do cache de respostas."""
+
+    value: Any
+    partition: str
+    created_at: float
+    embedding: np.ndarray | None = None
+
+
+class ResponseCache:
+    """Cache LRU com TTL para respostas de LLM."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float | None = 3600,
+        embedder: Embedder | None = None,
+        similarity_threshold: float = 0.95,
+        cache_nondeterministic: bool = False,
+        default_temperature: float = 1.0,
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries: Número máximo de respostas armazenadas
+            ttl: Tempo de vida em segundos (None para não expirar)
+            embedder: Função que gera o embedding de um prompt; habilita a
+                camada semântica (ex.: SentenceTransformer(...).encode)
+            similarity_threshold: Similaridade de cosseno mínima para reuso
+            cache_nondeterministic: Permite cache com temperature > 0
+            default_temperature: Temperatura assumida quando a configuração
+                não informa uma (o padrão trata a chamada como não determinística)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.cache_nondeterministic = cache_nondeterministic
+        self.default_temperature = default_temperature
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "bypassed": 0, "evictions": 0}
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Remove espaços redundantes do prompt."""
+        return re.sub(r"\s+", " ", prompt).strip()
+
+    @staticmethod
+    def _partition(model: str, config: dict[str, Any] | None) -> str:
+        """Identifica modelo e configuração de geração."""
+        config_hash = hashlib.sha256(
+            json.dumps(config or {}, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{model}:{config_hash}"
+
+    def make_key(self, model: str, prompt: str, config: dict[str, Any] | None = None) -> str:
+        """Gera a chave exata de uma chamada."""
+        partition = self._partition(model, config)
+        prompt_hash = hashlib.sha256(self.normalize_prompt(prompt).encode()).hexdigest()
+        return f"{partition}:{prompt_hash}"
+
+    def should_cache(self, config: dict[str, Any] | None = None) -> bool:
+        """Indica se a chamada é elegível para cache."""
+        temperature = (config or {}).get("temperature", self.default_temperature)
+        return self.cache_nondeterministic or not temperature
+
+    def get(
+        self,
+        model: str,
+        prompt: str,
+        config: dict[str, Any] | None = None,
+        embedding: Sequence[float] | None = None,
+    ) -> Any | None:
+        """
+        Busca uma resposta no cache.
+
+        Args:
+            model: Nome do modelo
+            prompt: Prompt da chamada
+            config: Configuração de geração
+            embedding: Embedding do prompt (calculado se houver embedder)
+
+        Returns:
+            Resposta armazenada ou None
+        """
+        if not self.should_cache(config):
+            self._stats["bypassed"] += 1
+            return None
+
+        key = self.make_key(model, prompt, config)
+        entry = self._entries.get(key)
+        if entry is not None and not self._expired(entry):
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+        if entry is not None:
+            del self._entries[key]
+
+        if self.embedder is not None:
+            vector = self._vector(prompt, embedding)
+            match = self._semantic_lookup(self._partition(model, config), vector)
+            if match is not None:
+                self._entries.move_to_end(match)
+                self._stats["semantic_hits"] += 1
+                return self._entries[match].value
+
+        self._stats["misses"] += 1
+        return None
+
+    def set(
+        self,
+        model: str,
+        prompt: str,
+        value: Any,
+        config: dict[str, Any] | None = None,
+        embedding: Sequence[float] | None = None,
+    ) -> None:
+        """Armazena uma resposta, respeitando o limite de entradas."""
+        if not self.should_cache(config):
+            return
+
+        vector = self._vector(prompt, embedding) if self.embedder is not None else None
+        key = self.make_key(model, prompt, config)
+        self._entries[key] = CachedResponse(
+            value=value,
+            partition=self._partition(model, config),
+            created_at=time.monotonic(),
+            embedding=vector,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def get_or_call(
+        self,
+        model: str,
+        prompt: str,
+        config: dict[str, Any] | None,
+        call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Retorna a resposta em cache ou executa a chamada e armazena o resultado.
+
+        O embedding do prompt é calculado uma única vez, fora do event loop.
+        """
+        if not self.should_cache(config):
+            self._stats["bypassed"] += 1
+            return await call()
+
+        embedding = None
+        if self.embedder is not None:
+            embedding = await asyncio.to_thread(self.embedder, self.normalize_prompt(prompt))
+
+        cached = self.get(model, prompt, config, embedding)
+        if cached is not None:
+            return cached
+
+        value = await call()
+        self.set(model, prompt, value, config, embedding)
+        return value
+
+    async def stream_or_call(
+        self,
+        model: str,
+        prompt: str,
+        config: dict[str, Any] | None,
+        stream: Callable[[], AsyncIterator[str]],
+    ) -> AsyncIterator[str]:
+        """
+        Versão em streaming de ``get_or_call``.
+
+        Um acerto é produzido como um único trecho; numa falta os trechos
+        são repassados à medida que chegam e a resposta só é armazenada se
+        o stream terminar.
+        """
+        if not self.should_cache(config):
+            self._stats["bypassed"] += 1
+            async for delta in stream():
+                yield delta
+            return
+
+        embedding = None
+        if self.embedder is not None:
+            embedding = await asyncio.to_thread(self.embedder, self.normalize_prompt(prompt))
+
+        cached = self.get(model, prompt, config, embedding)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        async for delta in stream():
+            parts.append(delta)
+            yield delta
+        self.set(model, prompt, "".join(parts), config, embedding)
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Retorna métricas de uso do cache."""
+        lookups = self._stats["hits"] + self._stats["semantic_hits"] + self._stats["misses"]
+        hits = self._stats["hits"] + self._stats["semantic_hits"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def _expired(self, entry: CachedResponse) -> bool:
+        """Verifica se a entrada passou do TTL."""
+        return self.ttl is not None and time.monotonic() - entry.created_at > self.ttl
+
+    def _vector(self, prompt: str, embedding: Sequence[float] | None) -> np.ndarray:
+        """Retorna o embedding normalizado (norma 1) do prompt."""
+        if embedding is None:
+            embedding = self.embedder(self.normalize_prompt(prompt))
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _semantic_lookup(self, partition: str, vector: np.ndarray) -> str | None:
+        """Encontra a entrada mais similar da mesma partição acima do limiar."""
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if entry.partition == partition
+            and entry.embedding is not None
+            and not self._expired(entry)
+        ]
+        if not keys:
+            return None
+
+        matrix = np.stack([self._entries[key].embedding for key in keys])
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            return keys[best]
+        return None
@@ -1,44 +1,159 @@
 """
 Sistema de tracking para LLMs.
+
+Eventos recentes ficam em buffers circulares de tamanho fixo e as métricas
+são agregadas de forma incremental (contadores e histogramas de latência),
+então o uso de memória não cresce com o tempo de execução.
 """
 
 import logging
+import math
+import random
 import time
-from collections import defaultdict
+from collections import Counter, deque
+from itertools import islice
 from typing import Any, Dict, List
 
 logger = logging.getLogger(__name__)
 
 
+class LatencyHistogram:
+    """
+    Histograma de latências com buckets logarítmicos (estilo HDR).
+
+    Cada bucket cobre um intervalo com erro relativo limitado por
+    ``precision``, então percentis são estimados com memória proporcional
+    ao intervalo dinâmico dos valores, não ao número de amostras.
+    """
+
+    def __init__(self, precision: float = 0.02, lowest: float = 1e-5):
+        """
+        Inicializa o histograma.
+
+        Args:
+            precision: Erro relativo máximo dos percentis (0.02 = 2%)
+            lowest: Menor valor distinguível em segundos
+        """
+        self.lowest = lowest
+        self._log_base = math.log1p(precision)
+        self.buckets: Counter[int] = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Registra uma latência em segundos."""
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        index = 0
+        if value > self.lowest:
+            index = math.ceil(math.log(value / self.lowest) / self._log_base)
+        self.buckets[index] += 1
+
+    def percentile(self, fraction: float) -> float | None:
+        """Estima o percentil (0-1) das latências registradas."""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(self.count * fraction))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                value = self.lowest * math.exp(index * self._log_base)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        """Resumo do histograma."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
 class LlmTracker:
     """Sistema de tracking para uso de LLMs."""
 
-    def __init__(self):
-        """Inicializa o tracker."""
-        self.events: list[dict[str, Any]] = []
-        self.metrics = defaultdict(int)
+    def __init__(
+        self,
+        max_events: int = 1000,
+        max_events_per_type: int = 100,
+        sample_rate: float = 1.0,
+    ):
+        """
+        Inicializa o tracker.
+
+        Args:
+            max_events: Tamanho do buffer de eventos recentes
+            max_events_per_type: Eventos recentes mantidos por tipo
+            sample_rate: Fração (0-1) dos eventos guardados nos buffers;
+                contadores e histogramas consideram todos os eventos
+        """
+        self.events: deque[dict[str, Any]] = deque(maxlen=max_events)
+        self.max_events_per_type = max_events_per_type
+        self.sample_rate = sample_rate
+        self.metrics: Counter[str] = Counter()
+        self.latencies: dict[str, LatencyHistogram] = {}
+        self.sampled_out = 0
         self.start_time = time.time()
+        self._events_by_type: dict[str, deque[dict[str, Any]]] = {}
+        # Quantos eventos de cada tipo estão hoje em ``events``
+        self._buffered_types: Counter[str] = Counter()
 
     def track_event(self, event_type: str, data: dict[str, Any]) -> None:
-        """Registra um evento no sistema."""
-        try:
-            # Prepara evento
-            event = {"type": event_type, "timestamp": time.time(), "data": data}
-
-            # Registra evento
-            self.events.append(event)
+        """
+        Registra um evento no sistema.
 
+        Se ``data`` tiver ``latency`` ou ``duration`` (em segundos), o valor
+        entra no histograma de latência do tipo do evento.
+        """
+        try:
             # Atualiza métricas
             self.metrics["total_events"] += 1
             self.metrics[f"events_{event_type}"] += 1
 
-            # Log do evento
-            logger.info(f"Evento registrado: {event_type}")
-            logger.debug(f"Dados do evento: {data}")
+            latency = data.get("latency", data.get("duration"))
+            if isinstance(latency, (int, float)):
+                self.track_latency(event_type, latency)
+
+            # Registra evento (amostrado)
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                self.sampled_out += 1
+                return
+
+            event = {"type": event_type, "timestamp": time.time(), "data": data}
+            if len(self.events) == self.events.maxlen:
+                evicted = self.events[0]["type"]
+                self._buffered_types[evicted] -= 1
+                if not self._buffered_types[evicted]:
+                    del self._buffered_types[evicted]
+            self.events.append(event)
+            self._buffered_types[event_type] += 1
+            recent = self._events_by_type.get(event_type)
+            if recent is None:
+                recent = self._events_by_type[event_type] = deque(maxlen=self.max_events_per_type)
+            recent.append(event)
+
+            logger.debug(f"Evento registrado: {event_type} {data}")
 
         except Exception as e:
             logger.error(f"Erro ao registrar evento: {str(e)}")
 
+    def track_latency(self, event_type: str, seconds: float) -> None:
+        """Registra uma latência no histograma do tipo de evento."""
+        histogram = self.latencies.get(event_type)
+        if histogram is None:
+            histogram = self.latencies[event_type] = LatencyHistogram()
+        histogram.record(seconds)
+
     def get_metrics(self) -> dict[str, Any]:
         """Retorna métricas do sistema."""
         try:
@@ -51,6 +166,9 @@ class LlmTracker:
                 "uptime_seconds": round(uptime, 2),
                 "events_per_minute": round(events_per_minute, 2),
                 "event_types": dict(self.metrics),
+                "latency": {name: hist.to_dict() for name, hist in self.latencies.items()},
+                "buffered_events": len(self.events),
+                "sampled_out": self.sampled_out,
             }
 
         except Exception as e:
@@ -58,15 +176,10 @@ class LlmTracker:
             return {}
 
     def get_recent_events(self, limit: int = 10, event_type: str = None) -> list[dict[str, Any]]:
-        """Retorna eventos recentes do sistema."""
+        """Retorna eventos recentes do sistema, do mais novo ao mais antigo."""
         try:
-            # Filtra eventos
-            filtered = self.events
-            if event_type:
-                filtered = [e for e in filtered if e["type"] == event_type]
-
-            # Retorna mais recentes
-            return sorted(filtered, key=lambda x: x["timestamp"], reverse=True)[:limit]
+            source = self.events if event_type is None else self._events_by_type.get(event_type, ())
+            return list(islice(reversed(source), limit))
 
         except Exception as e:
             logger.error(f"Erro ao recuperar eventos: {str(e)}")
@@ -75,7 +188,9 @@ class LlmTracker:
     def clear_events(self) -> None:
         """Limpa eventos antigos."""
         try:
-            self.events = []
+            self.events.clear()
+            self._events_by_type.clear()
+            self._buffered_types.clear()
             logger.info("Eventos limpos com sucesso")
 
         except Exception as e:
@@ -84,7 +199,7 @@ class LlmTracker:
     def get_event_types(self) -> list[str]:
         """Retorna tipos de eventos registrados."""
         try:
-            return list({e["type"] for e in self.events})
+            return list(self._buffered_types)
 
         except Exception as e:
             logger.error(f"Erro ao listar tipos de eventos: {str(e)}")
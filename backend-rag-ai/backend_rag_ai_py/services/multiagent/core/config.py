@@ -15,6 +15,7 @@ class AgentConfig(BaseModel):
     max_retries: int = 3
     timeout: int = 30
     batch_size: int = 10
+    max_concurrent_tasks: int = 5
 
 
 class LLMConfig(BaseModel):
@@ -54,6 +55,17 @@ def get_multiagent_config() -> MultiAgentConfig:
     return MultiAgentConfig(**config_dict)
 
 
+def get_max_concurrent_tasks() -> int:
+    """
+    Retorna o limite de agentes simultâneos (AGENT_CONFIG["max_concurrent_tasks"]).
+    Usa o valor padrão se as configurações não puderem ser carregadas.
+    """
+    try:
+        return get_multiagent_config().agent.max_concurrent_tasks
+    except Exception:
+        return AgentConfig().max_concurrent_tasks
+
+
 def update_config(updates: dict[str, Any]) -> None:
     """
     Atualiza configurações em runtime.
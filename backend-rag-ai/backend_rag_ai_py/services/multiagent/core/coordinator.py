@@ -5,8 +5,10 @@ Coordenador do sistema multiagente.
 from typing import Any, Dict, List, Optional
 
 from ..agents import AnalystAgent, ImproverAgent, ResearcherAgent, SynthesizerAgent
+from .config import get_max_concurrent_tasks
 from .interfaces import Agent, AgentResponse
 from .logging import get_multiagent_logger
+from .pipeline import PipelineDAG, PipelineStep, StepOutcome, run_pipeline
 from .providers import GeminiProvider
 
 logger = get_multiagent_logger(__name__)
@@ -15,14 +17,17 @@ logger = get_multiagent_logger(__name__)
 class AgentCoordinator:
     """Coordenador dos agentes do sistema."""
 
-    def __init__(self, provider: GeminiProvider):
+    def __init__(self, provider: GeminiProvider, max_concurrency: int | None = None):
         """
         Inicializa o coordenador.
 
         Args:
             provider: Provedor LLM para os agentes
+            max_concurrency: Máximo de agentes simultâneos numa pipeline
+                (padrão: AGENT_CONFIG["max_concurrent_tasks"])
         """
         self.provider = provider
+        self.max_concurrency = max_concurrency or get_max_concurrent_tasks()
 
         # Inicializa agentes
         self.agents = {
@@ -66,41 +71,53 @@ class AgentCoordinator:
             return AgentResponse(agent=agent_name, status="error", error=str(e))
 
     async def process_pipeline(
-        self, task: str, pipeline: list[str], context: dict[str, Any] | None = None
+        self,
+        task: str,
+        pipeline: list[str] | PipelineDAG,
+        context: dict[str, Any] | None = None,
     ) -> list[AgentResponse]:
         """
         Processa uma tarefa usando uma pipeline de agentes.
 
+        Uma lista de nomes é executada em sequência, cada agente recebendo a
+        saída do anterior. Um PipelineDAG executa em paralelo as etapas que
+        não dependem umas das outras.
+
         Args:
             task: Descrição da tarefa
-            pipeline: Lista de nomes dos agentes
+            pipeline: Lista de nomes dos agentes ou DAG de etapas
             context: Contexto opcional
 
         Returns:
             Lista com resultados do processamento
         """
-        results = []
-        current_task = task
-        current_context = context or {}
+        dag = pipeline if isinstance(pipeline, PipelineDAG) else PipelineDAG.sequential(pipeline)
 
-        # Executa cada agente na sequência
-        for agent_name in pipeline:
-            logger.info("Executando agente %s na pipeline", agent_name)
+        async def run_step(step: PipelineStep, step_task: str, step_context: dict[str, Any]):
+            result = await self.process_task(step_task, step.agent, step_context)
+            if result.status == "success" and result.result:
+                return StepOutcome(name=step.name, success=True, result=result.result)
 
-            # Processa tarefa
-            result = await self.process_task(current_task, agent_name, current_context)
+            logger.error("Erro na pipeline: %s", result.error)
+            return StepOutcome(name=step.name, success=False, result=result, error=result.error)
 
-            results.append(result)
+        outcomes = await run_pipeline(
+            dag, task, run_step, context, max_concurrency=self.max_concurrency
+        )
 
-            # Atualiza contexto e tarefa
-            if result.status == "success" and result.result:
-                current_task = result.result
-                current_context["previous_result"] = result.result
+        results = []
+        for name, outcome in outcomes.items():
+            if outcome.skipped:
+                continue
+            agent_name = dag.steps[name].agent
+            if outcome.success:
+                results.append(
+                    AgentResponse(agent=agent_name, status="success", result=outcome.result)
+                )
+            elif isinstance(outcome.result, AgentResponse):
+                results.append(outcome.result)
             else:
-                # Para execução em caso de erro
-                logger.error("Erro na pipeline: %s", result.error)
-                break
-
+                results.append(AgentResponse(agent=agent_name, status="error", error=outcome.error))
         return results
 
     def get_agent_info(self, agent_name: str) -> dict[str, Any] | None:
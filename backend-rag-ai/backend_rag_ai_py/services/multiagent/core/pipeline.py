@@ -0,0 +1,218 @@
+"""
+Execução de pipelines de agentes descritas como DAG.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from ...llm_services.context_packer import ContextPacker
+from .logging import get_multiagent_logger
+
+logger = get_multiagent_logger(__name__)
+
+
+@dataclass
+class PipelineStep:
+    """Etapa da pipeline: um agente e as etapas das quais depende."""
+
+    name: str
+    agent: str
+    inputs: list[str] = field(default_factory=list)
+
+
+@dataclass
+class StepOutcome:
+    """Resultado de uma etapa executada."""
+
+    name: str
+    success: bool
+    result: Any = None
+    error: str | None = None
+    skipped: bool = False
+
+
+StepRunner = Callable[[PipelineStep, str, dict[str, Any]], Awaitable[StepOutcome]]
+
+
+class PipelineDAG:
+    """Grafo acíclico de etapas de agentes."""
+
+    def __init__(self, steps: list[PipelineStep]):
+        """
+        Inicializa e valida o grafo.
+
+        Args:
+            steps: Etapas da pipeline
+
+        Raises:
+            ValueError: Se houver etapas duplicadas, dependências
+                desconhecidas ou ciclos
+        """
+        self.steps: dict[str, PipelineStep] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Etapa duplicada na pipeline: {step.name}")
+            self.steps[step.name] = step
+
+        for step in steps:
+            for dependency in step.inputs:
+                if dependency not in self.steps:
+                    raise ValueError(
+                        f"Etapa '{step.name}' depende de etapa inexistente '{dependency}'"
+                    )
+
+        self.order = self._topological_order()
+
+    @classmethod
+    def sequential(cls, agents: list[str]) -> "PipelineDAG":
+        """
+        Cria uma pipeline linear, onde cada agente recebe a saída do anterior.
+
+        Args:
+            agents: Nomes dos agentes na ordem de execução
+
+        Returns:
+            Grafo equivalente à pipeline sequencial
+        """
+        steps = []
+        for index, agent in enumerate(agents):
+            name = agent if agent not in agents[:index] else f"{agent}_{index}"
+            inputs = [steps[-1].name] if steps else []
+            steps.append(PipelineStep(name=name, agent=agent, inputs=inputs))
+        return cls(steps)
+
+    def _topological_order(self) -> list[str]:
+        """Ordena as etapas respeitando dependências (algoritmo de Kahn)."""
+        pending = {name: len(step.inputs) for name, step in self.steps.items()}
+        dependents: dict[str, list[str]] = {name: [] for name in self.steps}
+        for step in self.steps.values():
+            for dependency in step.inputs:
+                dependents[dependency].append(step.name)
+
+        ready = [name for name, count in pending.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in dependents[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(self.steps):
+            raise ValueError("Pipeline contém ciclo entre etapas")
+        return order
+
+
+# Cada agente trabalha sobre a saída do anterior: não há etapas independentes,
+# então o caminho crítico é a própria cadeia. Pipelines com etapas realmente
+# independentes devem declarar suas dependências num PipelineDAG próprio.
+DEFAULT_PIPELINE = PipelineDAG.sequential(["researcher", "analyst", "improver", "synthesizer"])
+
+
+def merge_inputs(
+    task: str,
+    step: PipelineStep,
+    outcomes: dict[str, StepOutcome],
+    packer: ContextPacker | None = None,
+) -> str:
+    """
+    Monta a entrada de uma etapa a partir das saídas de suas dependências.
+
+    Args:
+        task: Tarefa original
+        step: Etapa a executar
+        outcomes: Resultados das etapas já concluídas
+        packer: Limita a entrada ao orçamento de tokens, resumindo as
+            saídas mais antigas quando necessário
+
+    Returns:
+        Texto de entrada da etapa
+    """
+    if not step.inputs:
+        return packer.truncate(task, packer.max_tokens) if packer else task
+    if len(step.inputs) == 1:
+        result = str(outcomes[step.inputs[0]].result)
+        return packer.truncate(result, packer.max_tokens) if packer else result
+    if packer is not None:
+        return packer.pack_sections(
+            task, [(name, str(outcomes[name].result)) for name in step.inputs]
+        )
+
+    sections = [f"Tarefa original:\n{task}"]
+    sections.extend(f"Resultado de {name}:\n{outcomes[name].result}" for name in step.inputs)
+    return "\n\n".join(sections)
+
+
+async def run_pipeline(
+    dag: PipelineDAG,
+    task: str,
+    runner: StepRunner,
+    context: dict[str, Any] | None = None,
+    max_concurrency: int = 5,
+    packer: ContextPacker | None = None,
+) -> dict[str, StepOutcome]:
+    """
+    Executa um DAG de etapas, rodando em paralelo as etapas independentes.
+
+    Cada etapa começa assim que todas as suas dependências terminam, então
+    a latência total acompanha o caminho crítico do grafo. Etapas cujas
+    dependências falharam não são executadas.
+
+    Args:
+        dag: Grafo da pipeline
+        task: Tarefa original
+        runner: Função que executa uma etapa com (etapa, entrada, contexto)
+        context: Contexto compartilhado opcional
+        max_concurrency: Máximo de etapas executando ao mesmo tempo
+        packer: Orçamento de tokens aplicado à entrada de cada etapa
+
+    Returns:
+        Resultados por etapa, na ordem topológica
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    base_context = context or {}
+    outcomes: dict[str, StepOutcome] = {}
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def execute(step: PipelineStep) -> StepOutcome:
+        if step.inputs:
+            await asyncio.gather(*(tasks[name] for name in step.inputs))
+
+        failed = [name for name in step.inputs if not outcomes[name].success]
+        if failed:
+            outcome = StepOutcome(
+                name=step.name,
+                success=False,
+                error=f"Dependências falharam: {', '.join(failed)}",
+                skipped=True,
+            )
+        else:
+            step_context = {
+                **base_context,
+                "inputs": {name: outcomes[name].result for name in step.inputs},
+            }
+            if step.inputs:
+                step_context["previous_result"] = outcomes[step.inputs[-1]].result
+
+            async with semaphore:
+                logger.info("Executando etapa %s (agente %s)", step.name, step.agent)
+                try:
+                    outcome = await runner(
+                        step, merge_inputs(task, step, outcomes, packer), step_context
+                    )
+                except Exception as e:
+                    logger.error("Erro na etapa %s: %s", step.name, e)
+                    outcome = StepOutcome(name=step.name, success=False, error=str(e))
+
+        outcomes[step.name] = outcome
+        return outcome
+
+    # A ordem topológica garante que as dependências já possuem task criada
+    for name in dag.order:
+        tasks[name] = asyncio.create_task(execute(dag.steps[name]))
+
+    await asyncio.gather(*tasks.values())
+    return {name: outcomes[name] for name in dag.order}
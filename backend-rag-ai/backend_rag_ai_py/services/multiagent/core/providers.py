@@ -2,10 +2,14 @@
 Provedores de modelos de linguagem.
 """
 
+from collections.abc import AsyncIterator
 from typing import Any, Dict, Optional
 
 import google.generativeai as genai
 
+from ...llm_services import async_calls
+from ...llm_services.rate_limiter import LlmScheduler, Priority, estimate_tokens, get_llm_scheduler
+from ...llm_services.response_cache import ResponseCache
 from .logging import get_multiagent_logger
 
 logger = get_multiagent_logger(__name__)
@@ -14,17 +18,29 @@ logger = get_multiagent_logger(__name__)
 class GeminiProvider:
     """Provedor do modelo Gemini."""
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        cache: ResponseCache | None = None,
+        scheduler: LlmScheduler | None = None,
+        priority: Priority = Priority.NORMAL,
+    ):
         """
         Inicializa o provedor.
 
         Args:
             api_key: Chave de API do Google
+            cache: Cache opcional de respostas
+            scheduler: Agendador de chamadas (padrão: o compartilhado)
+            priority: Prioridade das chamadas deste provedor
         """
         if not api_key:
             raise ValueError("API key não pode estar vazia")
 
         self.api_key = api_key
+        self.cache = cache
+        self.scheduler = scheduler or get_llm_scheduler()
+        self.priority = priority
         genai.configure(api_key=api_key)
 
         # Configura modelo
@@ -41,8 +57,41 @@ class GeminiProvider:
             Conteúdo gerado
         """
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self._generate_text(prompt)
+
+        except Exception as e:
+            logger.error(f"Erro ao gerar conteúdo: {e}")
+            raise
+
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Gera conteúdo de forma incremental.
+
+        Args:
+            prompt: Prompt para geração
+
+        Yields:
+            Trechos do conteúdo gerado
+        """
+
+        def call() -> AsyncIterator[str]:
+            return self.scheduler.stream(
+                "gemini",
+                lambda: async_calls.stream_content(self.model, prompt),
+                estimate_tokens(prompt),
+                self.priority,
+                self.api_key,
+            )
+
+        try:
+            if self.cache is None:
+                async for delta in call():
+                    yield delta
+            else:
+                async for delta in self.cache.stream_or_call(
+                    self.model.model_name, prompt, {}, call
+                ):
+                    yield delta
 
         except Exception as e:
             logger.error(f"Erro ao gerar conteúdo: {e}")
@@ -60,13 +109,35 @@ class GeminiProvider:
         """
         try:
             prompt = f"Analise o seguinte conteúdo:\n\n{content}"
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self._generate_text(prompt)
 
         except Exception as e:
             logger.error(f"Erro ao analisar conteúdo: {e}")
             raise
 
+    async def _generate_text(self, prompt: str) -> str:
+        """
+        Gera texto sem bloquear o event loop.
+
+        Consulta o cache, se houver; chamadas ao modelo passam pelo agendador
+        (cotas, prioridade e backoff em 429).
+        """
+
+        async def request() -> str:
+            response = await async_calls.generate_content(self.model, prompt)
+            return response.text
+
+        async def call() -> str:
+            text = await self.scheduler.run(
+                "gemini", request, estimate_tokens(prompt), self.priority, self.api_key
+            )
+            self.scheduler.record_usage("gemini", estimate_tokens(text), self.api_key)
+            return text
+
+        if self.cache is None:
+            return await call()
+        return await self.cache.get_or_call(self.model.model_name, prompt, {}, call)
+
     def get_config(self) -> dict[str, Any]:
         """
         Retorna configuração do provedor.
@@ -1,25 +1,42 @@
+import hashlib
 import json
 import logging
 import os
 import shutil
 import uuid
+import zipfile
 from datetime import datetime
 from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Manifesto gravado em cada backup e estado local do último backup
+MANIFEST_NAME = "MANIFEST.json"
+STATE_FILE = "backup_state.json"
+
+
+def _file_sha256(path: str) -> str:
+    """Calcula o SHA-256 de um arquivo em blocos"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class EmbatesStorage:
-    def __init__(self, storage_dir: str, backup_dir: str = None):
+    def __init__(self, storage_dir: str, backup_dir: str = None, full_backup_every: int = 20):
         """
         Inicializa o sistema de armazenamento
 
         Args:
             storage_dir: Diretório principal para armazenamento
             backup_dir: Diretório para backups (opcional)
+            full_backup_every: Backups entre dois backups completos
         """
         self.storage_dir = storage_dir
         self.backup_dir = backup_dir or os.path.join(storage_dir, "backup")
+        self.full_backup_every = full_backup_every
 
         # Cria diretórios se não existirem
         os.makedirs(self.storage_dir, exist_ok=True)
@@ -80,38 +97,195 @@ class EmbatesStorage:
         files = os.listdir(self.storage_dir)
         return [f.replace(".json", "") for f in files if f.endswith(".json")]
 
-    def create_backup(self) -> str:
+    def _scan_files(self, previous: dict[str, dict]) -> dict[str, dict]:
         """
-        Cria backup de todos os embates
+        Calcula o hash dos arquivos de embates, reaproveitando o anterior
+        quando tamanho e mtime não mudaram
+
+        Args:
+            previous: Estado do último backup ({arquivo: {sha256, size, mtime}})
+
+        Returns:
+            Estado atual no mesmo formato
+        """
+        current = {}
+        for entry in os.scandir(self.storage_dir):
+            if not (entry.is_file() and entry.name.endswith(".json")):
+                continue
+            stat = entry.stat()
+            known = previous.get(entry.name)
+            if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime_ns:
+                current[entry.name] = known
+            else:
+                current[entry.name] = {
+                    "sha256": _file_sha256(entry.path),
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime_ns,
+                }
+        return current
+
+    def _load_state(self) -> dict:
+        """Carrega o estado do último backup, se a cadeia ainda existir"""
+        path = os.path.join(self.backup_dir, STATE_FILE)
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"last_backup": None, "since_full": 0, "files": {}}
+
+        last = state.get("last_backup")
+        if not last or not os.path.exists(os.path.join(self.backup_dir, last)):
+            return {"last_backup": None, "since_full": 0, "files": {}}
+        return state
+
+    def _save_state(self, state: dict) -> None:
+        """Grava o estado do backup de forma atômica"""
+        path = os.path.join(self.backup_dir, STATE_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def create_backup(self, full: bool = False) -> str:
+        """
+        Cria backup incremental dos embates
+
+        Só os arquivos alterados desde o último backup são gravados, direto
+        no zip; o manifesto guarda o hash de todos os arquivos, então cada
+        backup representa o estado completo naquele instante.
+
+        Args:
+            full: Força um backup completo
 
         Returns:
             Caminho do arquivo de backup
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"backup_{timestamp}"
+        state = self._load_state()
+        base = state["last_backup"]
+        depth = state["since_full"] + 1
+        if full or base is None or depth >= self.full_backup_every:
+            base, depth = None, 0
+            state["files"] = {}
+
+        previous = state["files"]
+        current = self._scan_files(previous)
+        changed = sorted(
+            name
+            for name, info in current.items()
+            if previous.get(name, {}).get("sha256") != info["sha256"]
+        )
+        deleted = sorted(set(previous) - set(current))
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        backup_name = f"backup_{timestamp}.zip"
         backup_path = os.path.join(self.backup_dir, backup_name)
+        manifest = {
+            "version": 1,
+            "created_at": datetime.now().isoformat(),
+            "base": base,
+            "depth": depth,
+            "files": {name: info["sha256"] for name, info in current.items()},
+            "changed": changed,
+            "deleted": deleted,
+        }
+
+        # Grava num arquivo temporário e renomeia, para não deixar zip parcial
+        tmp_path = f"{backup_path}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name in changed:
+                archive.write(os.path.join(self.storage_dir, name), name)
+            archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+        os.replace(tmp_path, backup_path)
+
+        self._save_state(
+            {
+                "last_backup": backup_name,
+                "since_full": depth,
+                "files": current,
+            }
+        )
+
+        kind = "incremental" if base else "completo"
+        logger.info(f"Backup {kind} criado: {backup_path} ({len(changed)} alterados)")
+        return backup_path
+
+    @staticmethod
+    def _read_manifest(archive: zipfile.ZipFile) -> dict:
+        """Lê o manifesto do backup; backups antigos são tratados como completos"""
+        try:
+            return json.loads(archive.read(MANIFEST_NAME))
+        except KeyError:
+            names = [n for n in archive.namelist() if n.endswith(".json")]
+            return {"base": None, "files": {os.path.basename(n): None for n in names}}
 
-        # Cria diretório de backup
-        os.makedirs(backup_path, exist_ok=True)
+    def list_backups(self) -> list[dict]:
+        """
+        Lista os backups disponíveis, do mais antigo ao mais recente
 
-        # Copia todos os arquivos
-        for filename in os.listdir(self.storage_dir):
-            if filename.endswith(".json"):
-                src = os.path.join(self.storage_dir, filename)
-                dst = os.path.join(backup_path, filename)
-                shutil.copy2(src, dst)
+        Returns:
+            Lista com path, created_at, base e número de arquivos de cada backup
+        """
+        backups = []
+        for f in os.listdir(self.backup_dir):
+            if not (f.startswith("backup_") and f.endswith(".zip")):
+                continue
+            path = os.path.join(self.backup_dir, f)
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    manifest = self._read_manifest(archive)
+            except zipfile.BadZipFile:
+                logger.warning(f"Backup corrompido ignorado: {path}")
+                continue
+            created_at = manifest.get("created_at") or datetime.fromtimestamp(
+                os.path.getmtime(path)
+            ).isoformat()
+            backups.append(
+                {
+                    "path": path,
+                    "created_at": created_at,
+                    "base": manifest.get("base"),
+                    "files": len(manifest["files"]),
+                }
+            )
+        return sorted(backups, key=lambda b: b["created_at"])
+
+    def read_backup(self, backup_path: str) -> dict[str, bytes]:
+        """
+        Reconstrói o estado de um backup, percorrendo a cadeia de incrementos
 
-        # Compacta backup
-        shutil.make_archive(backup_path, "zip", backup_path)
-        shutil.rmtree(backup_path)  # Remove diretório temporário
+        Args:
+            backup_path: Caminho do arquivo de backup
 
-        logger.info(f"Backup criado: {backup_path}.zip")
-        return f"{backup_path}.zip"
+        Returns:
+            Conteúdo de cada arquivo de embate naquele instante
+        """
+        with zipfile.ZipFile(backup_path) as archive:
+            wanted = self._read_manifest(archive)["files"]
+
+        contents: dict[str, bytes] = {}
+        path = backup_path
+        while path and len(contents) < len(wanted):
+            with zipfile.ZipFile(path) as archive:
+                manifest = self._read_manifest(archive)
+                for name in archive.namelist():
+                    key = os.path.basename(name)
+                    if key in wanted and key not in contents and name != MANIFEST_NAME:
+                        contents[key] = archive.read(name)
+            base = manifest.get("base")
+            path = os.path.join(os.path.dirname(backup_path), base) if base else None
+
+        missing = set(wanted) - set(contents)
+        if missing:
+            raise FileNotFoundError(f"Cadeia de backup incompleta, faltam: {sorted(missing)}")
+        return contents
 
     def restore_backup(self, backup_path: str) -> bool:
         """
         Restaura backup
 
+        O estado é montado num diretório ao lado do atual e os diretórios são
+        trocados por rename; se algo falhar, o armazenamento fica intacto.
+
         Args:
             backup_path: Caminho do arquivo de backup
 
@@ -122,35 +296,80 @@ class EmbatesStorage:
             logger.error(f"Backup não encontrado: {backup_path}")
             return False
 
-        # Cria diretório temporário
-        temp_dir = os.path.join(self.backup_dir, "temp_restore")
-        os.makedirs(temp_dir, exist_ok=True)
+        storage_dir = os.path.abspath(self.storage_dir)
+        staging_dir = f"{storage_dir}.restore"
+        old_dir = f"{storage_dir}.old"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
 
         try:
-            # Extrai backup
-            shutil.unpack_archive(backup_path, temp_dir)
-
-            # Limpa diretório atual
-            for f in os.listdir(self.storage_dir):
-                if f.endswith(".json"):
-                    os.remove(os.path.join(self.storage_dir, f))
-
-            # Copia arquivos do backup
-            for f in os.listdir(temp_dir):
-                if f.endswith(".json"):
-                    src = os.path.join(temp_dir, f)
-                    dst = os.path.join(self.storage_dir, f)
-                    shutil.copy2(src, dst)
+            with zipfile.ZipFile(backup_path) as archive:
+                manifest = self._read_manifest(archive)
+            contents = self.read_backup(backup_path)
+
+            os.makedirs(staging_dir)
+            for name, data in contents.items():
+                with open(os.path.join(staging_dir, name), "wb") as f:
+                    f.write(data)
+
+            # Preserva o que não é embate (ex.: diretório de backup interno)
+            for entry in os.listdir(storage_dir):
+                if not entry.endswith(".json"):
+                    os.rename(os.path.join(storage_dir, entry), os.path.join(staging_dir, entry))
+
+            os.rename(storage_dir, old_dir)
+            os.rename(staging_dir, storage_dir)
+            shutil.rmtree(old_dir)
+
+            # O próximo backup é incremental sobre o restaurado, comparando hashes
+            backup_name = os.path.basename(backup_path)
+            in_chain = os.path.exists(os.path.join(self.backup_dir, backup_name))
+            self._save_state(
+                {
+                    "last_backup": backup_name if in_chain else None,
+                    "since_full": manifest.get("depth", 0),
+                    "files": {
+                        name: {"sha256": digest, "size": -1, "mtime": -1}
+                        for name, digest in manifest["files"].items()
+                        if digest
+                    },
+                }
+            )
 
             logger.info(f"Backup restaurado: {backup_path}")
             return True
 
         except Exception as e:
             logger.error(f"Erro ao restaurar backup: {str(e)}")
+            # Desfaz a troca e devolve o que já tinha sido movido para o staging
+            if not os.path.isdir(storage_dir) and os.path.isdir(old_dir):
+                os.rename(old_dir, storage_dir)
+            if os.path.isdir(staging_dir):
+                for entry in os.listdir(staging_dir):
+                    if not entry.endswith(".json"):
+                        os.rename(
+                            os.path.join(staging_dir, entry), os.path.join(storage_dir, entry)
+                        )
             return False
 
         finally:
-            shutil.rmtree(temp_dir)  # Limpa diretório temporário
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def restore_to(self, when: datetime) -> bool:
+        """
+        Restaura o estado do último backup feito até um instante
+
+        Args:
+            when: Instante desejado
+
+        Returns:
+            True se restaurado com sucesso
+        """
+        candidates = [b for b in self.list_backups() if b["created_at"] <= when.isoformat()]
+        if not candidates:
+            logger.error(f"Nenhum backup anterior a {when.isoformat()}")
+            return False
+        return self.restore_backup(candidates[-1]["path"])
 
     def delete_embate(self, embate_id: str) -> bool:
         """
@@ -176,19 +395,25 @@ class EmbatesStorage:
         """
         Remove backups antigos mantendo apenas os N mais recentes
 
+        Backups usados como base por algum dos mantidos também são mantidos.
+
         Args:
             max_backups: Número máximo de backups a manter
         """
-        backups = []
-        for f in os.listdir(self.backup_dir):
-            if f.startswith("backup_") and f.endswith(".zip"):
-                path = os.path.join(self.backup_dir, f)
-                backups.append((os.path.getmtime(path), path))
-
-        # Ordena por data (mais recente primeiro)
-        backups.sort(reverse=True)
+        backups = self.list_backups()
+        recent = backups[-max_backups:] if max_backups > 0 else []
+        keep = {os.path.basename(b["path"]) for b in recent}
+        bases = {os.path.basename(b["path"]): b["base"] for b in backups}
+
+        pending = list(keep)
+        while pending:
+            base = bases.get(pending.pop())
+            if base and base not in keep:
+                keep.add(base)
+                pending.append(base)
 
         # Remove backups excedentes
-        for _, path in backups[max_backups:]:
-            os.remove(path)
-            logger.info(f"Backup antigo removido: {path}")
+        for backup in backups:
+            if os.path.basename(backup["path"]) not in keep:
+                os.remove(backup["path"])
+                logger.info(f"Backup antigo removido: {backup['path']}")
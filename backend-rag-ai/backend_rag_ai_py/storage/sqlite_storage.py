@@ -0,0 +1,536 @@
+"""
+Armazenamento de embates em SQLite.
+
+Mesma API de ``EmbatesStorage``, mas com os embates numa tabela SQLite em
+modo WAL: campos escalares em colunas indexadas (status, tipo, datas) e
+argumentos/metadata em colunas JSON consultáveis com as funções JSON1.
+Listar e filtrar milhares de embates não exige abrir um arquivo por embate.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+import zipfile
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .embates_storage import MANIFEST_NAME, EmbatesStorage
+
+logger = logging.getLogger(__name__)
+
+_PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+# Diretórios JSON legados importados por ``import_json_dirs``
+DEFAULT_IMPORT_DIRS = (
+    str(_PACKAGE_ROOT / "data" / "embates"),
+    str(_PACKAGE_ROOT / "storage" / "embates"),
+)
+
+# Campos guardados em colunas próprias; o restante vai para ``extra``
+_COLUMNS = ("titulo", "tipo", "status", "data_inicio", "data_fim")
+_JSON_COLUMNS = ("argumentos", "metadata")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embates (
+    id TEXT PRIMARY KEY,
+    titulo TEXT,
+    tipo TEXT,
+    status TEXT,
+    data_inicio TEXT,
+    data_fim TEXT,
+    argumentos TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(argumentos)),
+    metadata TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(metadata)),
+    extra TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(extra)),
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_embates_status ON embates (status, data_inicio);
+CREATE INDEX IF NOT EXISTS idx_embates_tipo ON embates (tipo, data_inicio);
+CREATE INDEX IF NOT EXISTS idx_embates_data_inicio ON embates (data_inicio);
+CREATE INDEX IF NOT EXISTS idx_embates_updated_at ON embates (updated_at);
+"""
+
+_INSERT = """
+INSERT INTO embates (
+    id, titulo, tipo, status, data_inicio, data_fim, argumentos, metadata, extra, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, json(?), json(?), json(?), ?)
+"""
+
+_UPSERT = _INSERT + """ON CONFLICT (id) DO UPDATE SET
+    titulo = excluded.titulo,
+    tipo = excluded.tipo,
+    status = excluded.status,
+    data_inicio = excluded.data_inicio,
+    data_fim = excluded.data_fim,
+    argumentos = excluded.argumentos,
+    metadata = excluded.metadata,
+    extra = excluded.extra,
+    updated_at = excluded.updated_at
+"""
+
+_ORDERABLE = {"data_inicio", "data_fim", "updated_at", "titulo", "id"}
+
+
+class SQLiteEmbatesStorage(EmbatesStorage):
+    def __init__(
+        self,
+        storage_dir: str,
+        backup_dir: str = None,
+        db_name: str = "embates.db",
+        full_backup_every: int = 20,
+    ):
+        """
+        Inicializa o armazenamento SQLite
+
+        Args:
+            storage_dir: Diretório onde fica o banco
+            backup_dir: Diretório para backups (opcional)
+            db_name: Nome do arquivo do banco
+            full_backup_every: Backups entre dois backups completos
+        """
+        super().__init__(storage_dir, backup_dir, full_backup_every)
+        self.db_path = os.path.join(self.storage_dir, db_name)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        logger.info(f"Banco SQLite de embates: {self.db_path}")
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Executa o bloco numa transação (BEGIN IMMEDIATE ... COMMIT/ROLLBACK)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_row(embate: dict) -> tuple:
+        """Converte um embate nos parâmetros do upsert"""
+        extra = {
+            key: value
+            for key, value in embate.items()
+            if key != "id" and key not in _COLUMNS and key not in _JSON_COLUMNS
+        }
+        return (
+            embate["id"],
+            *(embate.get(column) for column in _COLUMNS),
+            json.dumps(embate.get("argumentos") or [], ensure_ascii=False),
+            json.dumps(embate.get("metadata") or {}, ensure_ascii=False),
+            json.dumps(extra, ensure_ascii=False),
+            datetime.now().isoformat(),
+        )
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> dict:
+        """Reconstrói o embate a partir de uma linha"""
+        embate = json.loads(row["extra"])
+        for column in _COLUMNS:
+            if row[column] is not None:
+                embate[column] = row[column]
+        embate["argumentos"] = json.loads(row["argumentos"])
+        embate["metadata"] = json.loads(row["metadata"])
+        embate["id"] = row["id"]
+        return embate
+
+    def save_embate(self, embate: dict) -> str:
+        """
+        Salva um embate no armazenamento
+
+        Args:
+            embate: Dicionário com dados do embate
+
+        Returns:
+            ID do embate salvo
+        """
+        embate_id = embate.get("id", str(uuid.uuid4()))
+        embate["id"] = embate_id
+
+        with self._transaction() as conn:
+            conn.execute(_UPSERT, self._to_row(embate))
+
+        logger.info(f"Embate salvo: {embate_id}")
+        return embate_id
+
+    def save_embates(self, embates: Iterable[dict]) -> list[str]:
+        """
+        Salva vários embates numa única transação
+
+        Args:
+            embates: Embates a salvar
+
+        Returns:
+            IDs dos embates salvos
+        """
+        rows = []
+        for embate in embates:
+            embate.setdefault("id", str(uuid.uuid4()))
+            rows.append(self._to_row(embate))
+
+        with self._transaction() as conn:
+            conn.executemany(_UPSERT, rows)
+
+        logger.info(f"{len(rows)} embates salvos")
+        return [row[0] for row in rows]
+
+    def load_embate(self, embate_id: str) -> dict | None:
+        """
+        Carrega um embate do armazenamento
+
+        Args:
+            embate_id: ID do embate
+
+        Returns:
+            Dicionário com dados do embate ou None se não encontrado
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM embates WHERE id = ?", (embate_id,)).fetchone()
+
+        if row is None:
+            logger.warning(f"Embate não encontrado: {embate_id}")
+            return None
+        return self._from_row(row)
+
+    def list_embates(self) -> list[str]:
+        """
+        Lista todos os IDs de embates armazenados
+
+        Returns:
+            Lista de IDs dos embates
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT id FROM embates ORDER BY id")]
+
+    def delete_embate(self, embate_id: str) -> bool:
+        """
+        Remove um embate do armazenamento
+
+        Args:
+            embate_id: ID do embate
+
+        Returns:
+            True se removido com sucesso
+        """
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM embates WHERE id = ?", (embate_id,)).rowcount
+
+        if not deleted:
+            logger.warning(f"Embate não encontrado para remoção: {embate_id}")
+            return False
+        logger.info(f"Embate removido: {embate_id}")
+        return True
+
+    @staticmethod
+    def _where(
+        status: str | None,
+        tipo: str | None,
+        desde: str | None,
+        ate: str | None,
+        tag: str | None,
+        autor: str | None,
+    ) -> tuple[str, list[Any]]:
+        """Monta a cláusula WHERE dos filtros"""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if tipo:
+            clauses.append("tipo = ?")
+            params.append(tipo)
+        if desde:
+            clauses.append("data_inicio >= ?")
+            params.append(desde)
+        if ate:
+            clauses.append("data_inicio <= ?")
+            params.append(ate)
+        if tag:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM json_each(embates.metadata, '$.tags') WHERE value = ?)"
+            )
+            params.append(tag)
+        if autor:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM json_each(embates.argumentos) "
+                "WHERE json_extract(value, '$.autor') = ?)"
+            )
+            params.append(autor)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query_embates(
+        self,
+        status: str | None = None,
+        tipo: str | None = None,
+        desde: str | None = None,
+        ate: str | None = None,
+        tag: str | None = None,
+        autor: str | None = None,
+        order_by: str = "data_inicio",
+        descending: bool = True,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict]:
+        """
+        Busca embates filtrando pelos índices
+
+        Args:
+            status: Status exato
+            tipo: Tipo exato
+            desde: Data de início mínima (ISO 8601)
+            ate: Data de início máxima (ISO 8601)
+            tag: Tag presente em metadata.tags
+            autor: Autor de algum argumento
+            order_by: Coluna de ordenação
+            descending: Ordem decrescente
+            limit: Máximo de resultados
+            offset: Resultados a pular
+
+        Returns:
+            Lista de embates
+        """
+        if order_by not in _ORDERABLE:
+            raise ValueError(f"Ordenação não suportada: {order_by}")
+
+        where, params = self._where(status, tipo, desde, ate, tag, autor)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT * FROM embates{where} ORDER BY {order_by} {direction}, id {direction}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def count_embates(
+        self,
+        status: str | None = None,
+        tipo: str | None = None,
+        desde: str | None = None,
+        ate: str | None = None,
+        tag: str | None = None,
+        autor: str | None = None,
+    ) -> int:
+        """
+        Conta embates com os mesmos filtros de ``query_embates``
+
+        Returns:
+            Número de embates
+        """
+        where, params = self._where(status, tipo, desde, ate, tag, autor)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM embates{where}", params).fetchone()[0]
+
+    def count_by(self, column: str) -> dict[str, int]:
+        """
+        Conta embates agrupados por status ou tipo
+
+        Args:
+            column: "status" ou "tipo"
+
+        Returns:
+            Contagem por valor
+        """
+        if column not in ("status", "tipo"):
+            raise ValueError(f"Agrupamento não suportado: {column}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {column}, COUNT(*) FROM embates GROUP BY {column}"
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    @staticmethod
+    def _read_json_dir(directory: str) -> Iterator[dict]:
+        """Lê os embates de um diretório de arquivos JSON"""
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    embate = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Arquivo ignorado na importação: {path} ({e})")
+                continue
+            if not isinstance(embate, dict):
+                logger.warning(f"Arquivo ignorado na importação: {path} (não é um objeto)")
+                continue
+            embate.setdefault("id", filename[: -len(".json")])
+            yield embate
+
+    def import_json_dirs(
+        self, directories: Iterable[str] = DEFAULT_IMPORT_DIRS, overwrite: bool = False
+    ) -> int:
+        """
+        Importa embates de diretórios JSON numa única transação
+
+        Args:
+            directories: Diretórios com arquivos ``<id>.json``
+            overwrite: Substitui embates já existentes no banco
+
+        Returns:
+            Número de embates importados
+        """
+        embates: dict[str, dict] = {}
+        for directory in directories:
+            if not os.path.isdir(directory):
+                logger.warning(f"Diretório de importação não encontrado: {directory}")
+                continue
+            for embate in self._read_json_dir(directory):
+                embates.setdefault(embate["id"], embate)
+
+        rows = [self._to_row(embate) for embate in embates.values()]
+        sql = _UPSERT if overwrite else _INSERT + "ON CONFLICT (id) DO NOTHING"
+
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(sql, rows)
+            imported = conn.total_changes - before
+
+        logger.info(f"{imported} embates importados de {len(rows)} arquivos")
+        return imported
+
+    def create_backup(self, full: bool = False) -> str:
+        """
+        Cria backup incremental dos embates
+
+        O arquivo tem o mesmo formato do backup em JSON (um ``<id>.json`` por
+        embate e o manifesto com a cadeia de bases), então ``read_backup`` e
+        ``restore_to`` funcionam igual e backups são intercambiáveis entre os
+        dois storages. Só embates cujo conteúdo mudou desde o último backup
+        são gravados; ``updated_at`` evita serializar os que não mudaram.
+
+        Args:
+            full: Força um backup completo
+
+        Returns:
+            Caminho do arquivo de backup
+        """
+        state = self._load_state()
+        base = state["last_backup"]
+        depth = state["since_full"] + 1
+        if full or base is None or depth >= self.full_backup_every:
+            base, depth = None, 0
+            state["files"] = {}
+
+        previous = state["files"]
+        with self._lock:
+            stamps = self._conn.execute("SELECT id, updated_at FROM embates").fetchall()
+            # Embates com o mesmo updated_at do último backup reaproveitam o hash
+            current = {
+                f"{row['id']}.json": previous[f"{row['id']}.json"]
+                for row in stamps
+                if previous.get(f"{row['id']}.json", {}).get("updated_at") == row["updated_at"]
+            }
+            stale = [row["id"] for row in stamps if f"{row['id']}.json" not in current]
+            rows = self._conn.execute(
+                "SELECT * FROM embates WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(stale),),
+            ).fetchall()
+
+        contents: dict[str, bytes] = {}
+        for row in rows:
+            name = f"{row['id']}.json"
+            data = json.dumps(self._from_row(row), indent=2).encode()
+            current[name] = {
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "updated_at": row["updated_at"],
+            }
+            if previous.get(name, {}).get("sha256") != current[name]["sha256"]:
+                contents[name] = data
+        changed = sorted(contents)
+        deleted = sorted(set(previous) - set(current))
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        backup_name = f"backup_{timestamp}.zip"
+        backup_path = os.path.join(self.backup_dir, backup_name)
+        manifest = {
+            "version": 1,
+            "created_at": datetime.now().isoformat(),
+            "base": base,
+            "depth": depth,
+            "files": {name: info["sha256"] for name, info in current.items()},
+            "changed": changed,
+            "deleted": deleted,
+        }
+
+        tmp_path = f"{backup_path}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name in changed:
+                archive.writestr(name, contents[name])
+            archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+        os.replace(tmp_path, backup_path)
+
+        self._save_state({"last_backup": backup_name, "since_full": depth, "files": current})
+
+        kind = "incremental" if base else "completo"
+        logger.info(f"Backup {kind} criado: {backup_path} ({len(changed)} alterados)")
+        return backup_path
+
+    def restore_backup(self, backup_path: str) -> bool:
+        """
+        Restaura backup substituindo todos os embates numa única transação
+
+        Args:
+            backup_path: Caminho do arquivo de backup
+
+        Returns:
+            True se restaurado com sucesso
+        """
+        if not os.path.exists(backup_path):
+            logger.error(f"Backup não encontrado: {backup_path}")
+            return False
+
+        try:
+            rows = []
+            for name, data in self.read_backup(backup_path).items():
+                embate = json.loads(data)
+                embate.setdefault("id", name[: -len(".json")])
+                rows.append(self._to_row(embate))
+
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM embates")
+                conn.executemany(_UPSERT, rows)
+
+            # O próximo backup é incremental sobre o restaurado, comparando hashes
+            with zipfile.ZipFile(backup_path) as archive:
+                manifest = self._read_manifest(archive)
+            backup_name = os.path.basename(backup_path)
+            in_chain = os.path.exists(os.path.join(self.backup_dir, backup_name))
+            self._save_state(
+                {
+                    "last_backup": backup_name if in_chain else None,
+                    "since_full": manifest.get("depth", 0),
+                    "files": {
+                        name: {"sha256": digest, "updated_at": None}
+                        for name, digest in manifest["files"].items()
+                        if digest
+                    },
+                }
+            )
+
+            logger.info(f"Backup restaurado: {backup_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Erro ao restaurar backup: {str(e)}")
+            return False
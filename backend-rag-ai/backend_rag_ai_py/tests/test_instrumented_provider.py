@@ -0,0 +1,92 @@
+"""
+Testes dos spans emitidos pelo InstrumentedProvider.
+"""
+import pytest
+
+from backend_rag_ai_py.services.llm_services.context_packer import count_tokens
+from backend_rag_ai_py.services.llm_services.providers.instrumented_provider import (
+    InMemorySpanExporter,
+    InstrumentedProvider,
+    SpanExporter,
+)
+from backend_rag_ai_py.services.llm_services.providers.mock import (
+    MockProvider,
+    MockProviderError,
+)
+
+
+def test_span_exporter_is_abstract():
+    """Um exportador precisa implementar ``export``."""
+    with pytest.raises(TypeError):
+        SpanExporter()
+
+
+def test_spans_record_call_fields_and_usage_tokens():
+    """O span traz provider, modelo, latência e os tokens informados pelo provider."""
+    exporter = InMemorySpanExporter()
+    provider = InstrumentedProvider(MockProvider("mock-model"), [exporter], export_batch_size=1)
+
+    provider.generate("um dois três")
+    provider.chat([{"role": "user", "content": "quatro cinco"}])
+
+    generate, chat = exporter.get_finished_spans()
+    assert generate.name == "generate"
+    assert generate.provider == "MockProvider"
+    assert generate.model == "mock-model"
+    assert generate.prompt_tokens == 3
+    assert generate.completion_tokens == 4  # "[mock-model] um dois três"
+    assert generate.latency >= 0
+    assert generate.error is None
+    assert generate.cache_hit is False
+    assert generate.attributes == {}
+
+    assert chat.name == "chat"
+    assert chat.prompt_tokens == 2
+    assert chat.completion_tokens == 3
+
+
+def test_failed_call_exports_error_span_with_local_token_count():
+    """Uma falha gera span com o erro e tokens do prompt contados localmente."""
+    exporter = InMemorySpanExporter()
+    provider = InstrumentedProvider(
+        MockProvider("mock-model", failure_rate=1.0), [exporter], export_batch_size=1
+    )
+
+    with pytest.raises(MockProviderError):
+        provider.generate("prompt que falha")
+
+    (span,) = exporter.get_finished_spans()
+    assert span.error.startswith("MockProviderError")
+    assert span.prompt_tokens == count_tokens("prompt que falha")
+    assert span.completion_tokens == 0
+    assert span.model is None
+
+
+def test_spans_are_exported_in_batches_and_flushed():
+    """Spans só são exportados em lotes completos ou no flush."""
+    exporter = InMemorySpanExporter()
+    provider = InstrumentedProvider(MockProvider(), [exporter], export_batch_size=2)
+
+    provider.generate("a")
+    assert exporter.get_finished_spans() == []
+
+    provider.generate("b")
+    assert len(exporter.get_finished_spans()) == 2
+
+    provider.generate("c")
+    provider.flush()
+    assert len(exporter.get_finished_spans()) == 3
+    assert len(provider.get_calls()) == 3
+
+
+def test_prompts_are_captured_only_when_enabled():
+    """Prompt e resposta só entram nos atributos com ``capture_prompts``."""
+    exporter = InMemorySpanExporter()
+    provider = InstrumentedProvider(
+        MockProvider("m"), [exporter], export_batch_size=1, capture_prompts=True
+    )
+
+    provider.generate("olá")
+
+    (span,) = exporter.get_finished_spans()
+    assert span.attributes == {"prompt": "olá", "completion": "[m] olá"}
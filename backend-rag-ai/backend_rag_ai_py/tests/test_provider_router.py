@@ -0,0 +1,153 @@
+"""
+Testes do roteador de providers (offline, com MockProvider).
+"""
+import asyncio
+import time
+
+from backend_rag_ai_py.services.llm_services.providers.mock import MockProvider
+from backend_rag_ai_py.services.llm_services.providers.router import (
+    CircuitState,
+    ProviderHealth,
+    ProviderRouter,
+)
+
+
+def test_failover_to_next_provider():
+    """Uma falha no backend principal é repetida no próximo."""
+    router = ProviderRouter(
+        {"a": MockProvider("a", failure_rate=1.0), "b": MockProvider("b")},
+        hedge_after=10,
+    )
+
+    result = router.generate("oi")
+
+    assert result["provider"] == "b"
+    assert router.stats["failovers"] == 1
+    assert router.get_stats()["providers"]["a"]["consecutive_failures"] == 1
+    router.close()
+
+
+def test_all_providers_failing_raises():
+    """Sem nenhum backend bem-sucedido a requisição falha."""
+    router = ProviderRouter(
+        {"a": MockProvider("a", failure_rate=1.0), "b": MockProvider("b", failure_rate=1.0)}
+    )
+
+    try:
+        router.generate("oi")
+    except RuntimeError as e:
+        assert "Todos os providers falharam" in str(e)
+    else:
+        raise AssertionError("esperava RuntimeError")
+    assert router.stats["failures"] == 1
+    router.close()
+
+
+def test_hedging_returns_fastest_response():
+    """Um backend lento dispara uma segunda chamada, e vence a mais rápida."""
+    slow, fast = MockProvider("slow", latency=0.5), MockProvider("fast", latency=0.01)
+    router = ProviderRouter({"slow": slow, "fast": fast}, hedge_after=0.05)
+
+    start = time.perf_counter()
+    result = router.generate("oi")
+
+    assert result["provider"] == "fast"
+    assert time.perf_counter() - start < 0.4
+    assert router.stats["hedged"] == 1
+    router.close()
+
+
+def test_async_generate_hedges_without_nested_pools():
+    """``agenerate`` aplica as mesmas decisões esperando no event loop."""
+    slow, fast = MockProvider("slow", latency=0.5), MockProvider("fast", latency=0.01)
+    router = ProviderRouter({"slow": slow, "fast": fast}, hedge_after=0.05)
+
+    result = asyncio.run(router.agenerate("oi"))
+
+    assert result["provider"] == "fast"
+    assert router.stats["hedged"] == 1
+    router.close()
+
+
+def test_circuit_opens_and_skips_provider():
+    """Falhas consecutivas abrem o circuito e o backend deixa de ser chamado."""
+    broken = MockProvider("broken", failure_rate=1.0)
+    router = ProviderRouter(
+        {"broken": broken, "ok": MockProvider("ok")},
+        failure_threshold=2,
+        error_rate_threshold=1.0,
+        cooldown=60,
+        hedge_after=10,
+    )
+
+    router.generate("1")
+    router.generate("2")
+    assert router.health["broken"].state == CircuitState.OPEN
+
+    router.generate("3")
+    assert broken.calls == 2
+    assert router.ranked_providers() == ["ok"]
+    router.close()
+
+
+def test_ranking_does_not_change_circuit_state():
+    """Consultar o ranking não passa um circuito aberto para HALF_OPEN."""
+    router = ProviderRouter({"a": MockProvider("a")}, failure_threshold=1, cooldown=0)
+    router.health["a"].record(0.0, success=False)
+
+    assert router.ranked_providers() == ["a"]
+    assert router.health["a"].state == CircuitState.OPEN
+    router.close()
+
+
+def test_half_open_allows_a_single_probe():
+    """Após o cooldown só uma requisição de teste passa até ela terminar."""
+    health = ProviderHealth(window_size=10, failure_threshold=1, cooldown=0.05)
+    health.record(0.0, success=False)
+    assert health.state == CircuitState.OPEN
+    assert not health.try_acquire()
+
+    time.sleep(0.06)
+    assert health.try_acquire()
+    assert health.state == CircuitState.HALF_OPEN
+    assert not health.try_acquire()
+
+    health.record(0.01, success=True)
+    assert health.state == CircuitState.CLOSED
+    assert health.try_acquire() and health.try_acquire()
+
+
+def test_failed_probe_reopens_circuit():
+    """Uma requisição de teste que falha reabre o circuito."""
+    health = ProviderHealth(window_size=10, failure_threshold=3, cooldown=0.0)
+    for _ in range(3):
+        health.record(0.0, success=False)
+
+    assert health.try_acquire()
+    health.record(0.0, success=False)
+
+    assert health.state == CircuitState.OPEN
+    assert not health.probing
+
+
+def test_probe_recovers_provider_through_router():
+    """O backend volta ao ranking depois de uma requisição de teste bem-sucedida."""
+    flaky = MockProvider("flaky", failure_rate=1.0)
+    router = ProviderRouter(
+        {"flaky": flaky, "ok": MockProvider("ok", latency=0.01)},
+        failure_threshold=1,
+        error_rate_threshold=1.0,
+        cooldown=0.05,
+        hedge_after=10,
+    )
+
+    router.generate("1")
+    assert router.health["flaky"].state == CircuitState.OPEN
+
+    time.sleep(0.06)
+    flaky.failure_rate = 0.0
+    result = router.generate("2")
+
+    assert result["provider"] == "flaky"
+    assert router.health["flaky"].state == CircuitState.CLOSED
+    router.close()
@@ -0,0 +1,126 @@
+"""
+Testes do barramento de eventos em Redis Streams (com fakeredis).
+"""
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from backend_rag_ai_py.cli.embates.events import EmbateEvent, EmbateEventManager
+from backend_rag_ai_py.embates.events.event_manager import EventManager, EventType
+from backend_rag_ai_py.embates.events.redis_event_bus import RedisStreamEventBus
+
+
+def make_bus(server, consumer, **kwargs):
+    """Cria um barramento ligado ao servidor fake compartilhado."""
+    bus = RedisStreamEventBus(
+        consumer=consumer, flush_interval=0.01, block_ms=10, **kwargs
+    )
+    redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return bus, redis
+
+
+async def wait_for(condition, timeout=2.0):
+    """Aguarda até a condição ser verdadeira ou o timeout."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def test_every_worker_receives_events_from_the_others():
+    """Cada worker recebe todos os eventos dos outros e nenhum dos seus."""
+
+    async def run():
+        server = fakeredis.FakeServer()
+        received = {"a": [], "b": [], "c": []}
+        buses = []
+        for name in received:
+            bus, redis = make_bus(server, name)
+
+            async def handler(event, topic, name=name):
+                received[name].append(event["n"])
+
+            await bus.start(remote_handler=handler, redis=redis)
+            buses.append(bus)
+
+        for n in range(10):
+            buses[0].append({"n": n}, "embate_started")
+        await buses[0].flush()
+
+        ok = await wait_for(lambda: len(received["b"]) == 10 and len(received["c"]) == 10)
+        for bus in buses:
+            await bus.stop()
+        return ok, received
+
+    ok, received = asyncio.run(run())
+    assert ok
+    assert received["a"] == []
+    assert received["b"] == list(range(10))
+    assert received["c"] == list(range(10))
+
+
+def test_groups_are_per_worker_by_default():
+    """Sem ``shared_group`` o grupo leva o nome do consumidor."""
+    assert RedisStreamEventBus(consumer="w1").group == "embates:w1"
+    assert RedisStreamEventBus(consumer="w1", shared_group=True).group == "embates"
+
+
+def test_history_is_shared_and_filtered_by_topic_and_type():
+    """O histórico reflete todos os workers e pode ser filtrado."""
+
+    async def run():
+        server = fakeredis.FakeServer()
+        bus_a, redis_a = make_bus(server, "a")
+        bus_b, redis_b = make_bus(server, "b")
+        await bus_a.start(redis=redis_a)
+        await bus_b.start(redis=redis_b)
+
+        bus_a.append({"n": 1}, "embate_started", topic="e1")
+        bus_b.append({"n": 2}, "embate_completed", topic="e1")
+        bus_b.append({"n": 3}, "embate_started", topic="e2")
+        await bus_a.flush()
+        await bus_b.flush()
+
+        result = (
+            await bus_a.get_history(),
+            await bus_a.get_history(topic="e1"),
+            await bus_b.get_history(event_type="embate_started"),
+            await bus_b.get_history(limit=1),
+        )
+        await bus_a.stop()
+        await bus_b.stop()
+        return result
+
+    everything, topic, by_type, limited = asyncio.run(run())
+    assert [e["n"] for e in everything] == [1, 2, 3]
+    assert [e["n"] for e in topic] == [1, 2]
+    assert [e["n"] for e in by_type] == [1, 3]
+    assert [e["n"] for e in limited] == [3]
+
+
+def test_cli_manager_reads_events_from_both_managers():
+    """``get_eventos_distribuidos`` entende os formatos dos dois gerenciadores."""
+
+    async def run():
+        server = fakeredis.FakeServer()
+        bus, redis = make_bus(server, "a")
+        await bus.start(redis=redis)
+
+        event_manager = EventManager(backend=bus)
+        await event_manager.publish(EventType.EMBATE_STARTED, {"embate_id": "e1"}, topic="e1")
+        await event_manager.shutdown()
+
+        cli_manager = EmbateEventManager(backend=bus)
+        await cli_manager.dispatch(EmbateEvent("embate_completed", {"embate_id": "e1"}))
+
+        eventos = await cli_manager.get_eventos_distribuidos(embate_id="e1")
+        await bus.stop()
+        return eventos
+
+    eventos = asyncio.run(run())
+    assert [e.tipo for e in eventos] == ["embate_started", "embate_completed"]
+    assert [e.dados for e in eventos] == [{"embate_id": "e1"}, {"embate_id": "e1"}]
@@ -0,0 +1,144 @@
+"""
+Hash canônico de conteúdo para chaves de cache.
+
+Dois dados com o mesmo conteúdo geram o mesmo hash independentemente da
+ordem das chaves, de tipos equivalentes (tupla/lista, 1/1.0) e de campos
+voláteis do envelope, como IDs de requisição e timestamps. Objetos sem uma
+identidade estável levantam ``UncacheableValueError``: nesse caso o chamador
+não deve usar cache.
+"""
+
+import dataclasses
+import hashlib
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional
+
+# Campos que variam entre execuções sem mudar o trabalho a ser feito
+VOLATILE_FIELDS = frozenset(
+    {
+        "embate_id",
+        "request_id",
+        "trace_id",
+        "session_id",
+        "created_at",
+        "updated_at",
+        "timestamp",
+        "data_criacao",
+        "data_atualizacao",
+    }
+)
+
+
+class UncacheableValueError(TypeError):
+    """Valor sem representação estável para compor uma chave de cache."""
+
+
+def canonicalize(value: Any, volatile: Iterable[str] = VOLATILE_FIELDS) -> Any:
+    """
+    Converte um valor numa estrutura JSON canônica.
+
+    Args:
+        value: Valor a normalizar
+        volatile: Chaves removidas do dicionário de primeiro nível (o
+            envelope); em níveis internos elas fazem parte do conteúdo
+
+    Returns:
+        Estrutura serializável e estável
+
+    Raises:
+        UncacheableValueError: Se algum objeto não tiver identidade estável
+    """
+    if isinstance(value, dict):
+        volatile = frozenset(volatile)
+        return {
+            str(key): _canonical(item) for key, item in value.items() if str(key) not in volatile
+        }
+    return _canonical(value)
+
+
+def _canonical(value: Any) -> Any:
+    """Forma canônica de um valor, sem remover campos."""
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        items = [_canonical(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, Enum):
+        return _canonical(value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return {"__type__": _qualified_name(value), "state": _canonical(_object_state(value))}
+
+
+def _qualified_name(value: Any) -> str:
+    """Módulo e nome qualificado do tipo do valor."""
+    return f"{type(value).__module__}.{type(value).__qualname__}"
+
+
+def _object_state(value: Any) -> Any:
+    """
+    Estado de um objeto que define sua identidade para o cache.
+
+    Usa, nesta ordem, ``cache_key`` (atributo ou método), ``model_dump``
+    (pydantic), ``to_dict`` ou os campos de um dataclass. Sem nenhum deles
+    o objeto (ex.: um agente com configuração interna) não tem chave estável.
+    """
+    for attribute in ("cache_key", "model_dump", "to_dict"):
+        state = getattr(value, attribute, None)
+        if state is not None:
+            return state() if callable(state) else state
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            field.name: getattr(value, field.name) for field in dataclasses.fields(value)
+        }
+    raise UncacheableValueError(
+        f"{_qualified_name(value)} não tem identidade estável para cache "
+        "(defina cache_key, model_dump ou to_dict)"
+    )
+
+
+def content_hash(value: Any, volatile: Iterable[str] = VOLATILE_FIELDS) -> str:
+    """Retorna o SHA-256 da forma canônica do valor."""
+    serialized = json.dumps(
+        canonicalize(value, volatile), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def embate_cache_key(
+    strategy_name: str,
+    parameters: Dict[str, Any],
+    model_config: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Chave de cache de um embate derivada do trabalho a executar.
+
+    Args:
+        strategy_name: Nome da estratégia
+        parameters: Parâmetros do embate (campos voláteis de primeiro nível são ignorados)
+        model_config: Configuração do modelo usado
+
+    Returns:
+        Hash hexadecimal
+
+    Raises:
+        UncacheableValueError: Se os parâmetros contiverem objetos sem identidade estável
+    """
+    return content_hash(
+        {
+            "strategy": strategy_name,
+            "parameters": canonicalize(parameters),
+            "model": canonicalize(model_config or {}, volatile=()),
+        },
+        volatile=(),
+    )
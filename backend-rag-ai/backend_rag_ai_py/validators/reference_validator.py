@@ -1,6 +1,9 @@
 import json
 import logging
 import os
+import re
+import time
+from collections import deque
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
@@ -16,19 +19,106 @@ class ReferenceValidationError(Exception):
 class ReferenceValidator:
     """Validador de referências entre embates"""
 
-    def __init__(self, embates_dir: str):
+    def __init__(self, embates_dir: str, refresh_interval: float = 0.0):
         """
         Inicializa o validador
 
         Args:
             embates_dir: Diretório base dos embates
+            refresh_interval: Intervalo mínimo (segundos) entre verificações de
+                mtime; por padrão toda consulta verifica (só um stat por arquivo)
         """
         self.embates_dir = Path(embates_dir)
-        self._cache = {}  # Cache de embates carregados
+        self.refresh_interval = refresh_interval
+        self._cache = {}  # Cache de embates carregados (id -> dados)
+        self._paths: dict[str, Path] = {}  # id -> arquivo
+        self._forward: dict[str, set[str]] = {}  # id -> ids referenciados
+        self._reverse: dict[str, set[str]] = {}  # id -> ids que o referenciam
+        # arquivo -> (mtime_ns, tamanho, dados, referências)
+        self._files: dict[Path, tuple[int, int, dict | None, set[str]]] = {}
+        self._last_refresh = 0.0
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Atualiza o índice de embates e o grafo de referências
+
+        Só os arquivos com mtime ou tamanho alterados são relidos; os mapas
+        são reconstruídos a partir dos dados já carregados.
+
+        Args:
+            force: Ignora o intervalo mínimo entre verificações
+        """
+        now = time.monotonic()
+        if not force and self._files and now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+
+        changed = False
+        seen = set()
+        for file in sorted(self.embates_dir.glob("**/*.json")):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            seen.add(file)
+            known = self._files.get(file)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                continue
+
+            data = None
+            try:
+                with open(file) as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Erro ao ler arquivo {file}: {str(e)}")
+            if not isinstance(data, dict):
+                data = None
+            refs = self.get_references(data) if data else set()
+            self._files[file] = (stat.st_mtime_ns, stat.st_size, data, refs)
+            changed = True
+
+        for file in set(self._files) - seen:
+            del self._files[file]
+            changed = True
+
+        if changed:
+            self._rebuild_graph()
+
+    def _rebuild_graph(self) -> None:
+        """Reconstrói o mapa id -> arquivo e as listas de adjacência"""
+        self._cache = {}
+        self._paths = {}
+        self._forward = {}
+        self._reverse = {}
+        for file in sorted(self._files):
+            _, _, data, refs = self._files[file]
+            if not data or "id" not in data or data["id"] in self._paths:
+                continue  # Em IDs repetidos vale o primeiro arquivo
+            embate_id = data["id"]
+            self._cache[embate_id] = data
+            self._paths[embate_id] = file
+            self._forward[embate_id] = refs
+
+        for embate_id, refs in self._forward.items():
+            for ref_id in refs:
+                self._reverse.setdefault(ref_id, set()).add(embate_id)
+
+    def get_path(self, embate_id: str) -> Path | None:
+        """
+        Retorna o arquivo de um embate
+
+        Args:
+            embate_id: ID do embate
+
+        Returns:
+            Caminho do arquivo ou None se não encontrar
+        """
+        self.refresh()
+        return self._paths.get(embate_id)
 
     def _load_embate(self, embate_id: str) -> dict | None:
         """
-        Carrega um embate do disco
+        Carrega um embate do índice
 
         Args:
             embate_id: ID do embate
@@ -37,22 +127,12 @@ class ReferenceValidator:
             Dicionário com dados do embate ou None se não encontrar
         """
         try:
-            # Verifica cache
-            if embate_id in self._cache:
-                return self._cache[embate_id]
-
-            # Procura arquivo
-            for file in self.embates_dir.glob("**/*.json"):
-                try:
-                    with open(file) as f:
-                        data = json.load(f)
-                        if data.get("id") == embate_id:
-                            self._cache[embate_id] = data
-                            return data
-                except Exception as e:
-                    logger.warning(f"Erro ao ler arquivo {file}: {str(e)}")
-
-            return None
+            self.refresh()
+            if embate_id not in self._cache:
+                # Com intervalo > 0 o arquivo pode ter sido criado desde a
+                # última verificação; confirma antes de dar como ausente
+                self.refresh(force=True)
+            return self._cache.get(embate_id)
 
         except Exception as e:
             logger.error(f"Erro ao carregar embate {embate_id}: {str(e)}")
@@ -68,8 +148,6 @@ class ReferenceValidator:
         Returns:
             Conjunto de IDs encontrados
         """
-        import re
-
         # Padrão: #ID ou [ID] ou (ID)
         pattern = r"(?:^|\s)(?:#|\[|\()([a-f0-9-]{36})(?:\]|\)|\s|$)"
 
@@ -109,22 +187,13 @@ class ReferenceValidator:
         Returns:
             Lista de embates que referenciam o ID
         """
-        references = []
-
         try:
-            # Procura em todos os arquivos
-            for file in self.embates_dir.glob("**/*.json"):
-                try:
-                    with open(file) as f:
-                        data = json.load(f)
-                        if data.get("id") != embate_id:  # Ignora auto-referência
-                            refs = self.get_references(data)
-                            if embate_id in refs:
-                                references.append(data)
-                except Exception as e:
-                    logger.warning(f"Erro ao ler arquivo {file}: {str(e)}")
-
-            return references
+            self.refresh()
+            return [
+                self._cache[source_id]
+                for source_id in sorted(self._reverse.get(embate_id, ()))
+                if source_id != embate_id  # Ignora auto-referência
+            ]
 
         except Exception as e:
             logger.error(f"Erro ao buscar referências reversas para {embate_id}: {str(e)}")
@@ -158,7 +227,7 @@ class ReferenceValidator:
                     continue  # Referências a embates fechados são sempre válidas
 
                 # Valida ciclo
-                if embate.get("id") in self.get_references(ref_embate):
+                if embate.get("id") in self._forward.get(ref_id, ()):
                     errors.append(
                         f"Referência cíclica detectada entre " f"{embate.get('id')} e {ref_id}"
                     )
@@ -179,20 +248,11 @@ class ReferenceValidator:
         problems = []
 
         try:
-            # Mapeia todos os embates
-            embates = {}
-            for file in self.embates_dir.glob("**/*.json"):
-                try:
-                    with open(file) as f:
-                        data = json.load(f)
-                        if "id" in data:
-                            embates[data["id"]] = data
-                except Exception as e:
-                    logger.warning(f"Erro ao ler arquivo {file}: {str(e)}")
+            self.refresh()
+            embates = self._cache
 
             # Verifica referências
-            for embate_id, embate in embates.items():
-                references = self.get_references(embate)
+            for embate_id, references in self._forward.items():
                 for ref_id in references:
                     if ref_id not in embates:
                         problems.append(
@@ -216,12 +276,12 @@ class ReferenceValidator:
                                 break
 
                             visited.add(current)
-                            next_refs = self.get_references(embates[current])
+                            next_refs = self._forward.get(current)
 
                             if not next_refs:
                                 break
 
-                            current = next(iter(next_refs))
+                            current = min(next_refs)
 
             return problems
 
@@ -240,21 +300,16 @@ class ReferenceValidator:
             Dicionário com estrutura do grafo
         """
         try:
+            self.refresh()
             graph = {"nodes": [], "edges": []}
 
-            visited = set()
-            queue = [(embate_id, None)]  # (id, parent_id)
+            visited = {embate_id}
+            queue = deque([(embate_id, None)])  # (id, parent_id)
 
             while queue:
-                current_id, parent_id = queue.pop(0)
-
-                if current_id in visited:
-                    continue
+                current_id, parent_id = queue.popleft()
 
-                visited.add(current_id)
-
-                # Carrega embate
-                embate = self._load_embate(current_id)
+                embate = self._cache.get(current_id)
                 if not embate:
                     continue
 
@@ -273,9 +328,9 @@ class ReferenceValidator:
                     graph["edges"].append({"source": parent_id, "target": current_id})
 
                 # Adiciona referências à fila
-                references = self.get_references(embate)
-                for ref_id in references:
+                for ref_id in sorted(self._forward.get(current_id, ())):
                     if ref_id not in visited:
+                        visited.add(ref_id)
                         queue.append((ref_id, current_id))
 
             return graph